@@ -10,11 +10,108 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = ""
     SUPABASE_URL: str = ""
     SUPABASE_SERVICE_KEY: str = ""
+    DATABASE_URL: str = ""  # direct Postgres connection, only for the COPY bulk loader
     GUARDIAN_API_KEY: str = ""
     LANGSMITH_API_KEY: str = ""
     LANGSMITH_TRACING: str = "false"
     TAVILY_API_KEY: str = ""
 
+    # Agent tool execution: tool calls of one AI message running at once, and per-tool timeouts (seconds) that start
+    # when the tool starts running and also bound each of its HTTP requests
+    TOOL_CALL_MAX_WORKERS: int = 4
+    GUARDIAN_TOOL_TIMEOUT: float = 30.0
+    TAVILY_TOOL_TIMEOUT: float = 20.0
+
+    # Tool result cache (seconds / entries)
+    GUARDIAN_CACHE_TTL: float = 900.0
+    TAVILY_CACHE_TTL: float = 600.0
+    TOOL_CACHE_MAX_ENTRIES: int = 256
+
+    # Model routing per agent stage (Ollama models, empty = default LLM): a small model picks tools for a new question,
+    # a stronger one writes the answer from tool results; small talk skips tools and goes to the conversation model
+    # Every stage uses the default LLM until a model is set, e.g. TOOL_SELECTION_MODEL=llama3.2:1b
+    TOOL_SELECTION_MODEL: str = ""
+    SYNTHESIS_MODEL: str = ""
+    CONVERSATION_MODEL: str = ""
+    CONVERSATIONAL_SHORT_CIRCUIT: bool = True
+    STAGE_LATENCY_WINDOW: int = 1000  # latest calls per stage in ModelRouter.latency_stats()
+
+    # Conversation compaction (num_ctx is 8192, the rest is left for the answer)
+    CONTEXT_TOKEN_BUDGET: int = 6000
+    CONTEXT_KEEP_RECENT_TURNS: int = 2
+    CONTEXT_CHARS_PER_TOKEN: float = 4.0
+    CONTEXT_TOOL_PREVIEW_CHARS: int = 300
+
+    # News tool: vector store first, Guardian API on a miss
+    GUARDIAN_TOOL_MATCH_COUNT: int = 15  # candidate chunks, ContextPacker keeps what fits its token budget
+    GUARDIAN_TOOL_SIMILARITY_THRESHOLD: float = 0.6
+    GUARDIAN_TOOL_RECENT_DAYS: int = 60  # search recent partitions first, whole corpus only when they have no match (0 = off)
+    INGESTION_QUEUE_SIZE: int = 500
+    # Speculative retrieval: the vector store lookup for the user's query runs alongside the first LLM call and is
+    # served to a matching news tool call; with the Guardian option a vector store miss also prefetches from the API
+    SPECULATIVE_RETRIEVAL: bool = True
+    SPECULATIVE_GUARDIAN_SEARCH: bool = False  # spends Guardian quota on turns that may not need it
+
+    # Guardian show-fields: only what extract_article_text() reads ('all' also returns HTML body, main, ...)
+    GUARDIAN_SHOW_FIELDS: str = "bodyText,wordcount,charCount"
+
+    # Retrieved context packing: overlap stitching + MMR (1.0 = relevance only) under a token budget
+    CONTEXT_PACKING_TOKEN_BUDGET: int = 1500
+    CONTEXT_PACKING_MMR_LAMBDA: float = 0.7
+
+    # Articles (with their chunks) per upsert_articles_with_chunks round trip
+    BULK_UPSERT_BATCH_SIZE: int = 100
+
+    # Chunk storage: 'offsets' keeps only (start, end) into the article text, 'text' also stores the chunk text
+    CHUNK_STORAGE_MODE: str = "offsets"
+
+    # Embedding versions: active version re-read every N seconds; re-embedding batch size (chunks) and pause between batches
+    EMBEDDING_VERSION_REFRESH_SECONDS: float = 60.0
+    REEMBED_BATCH_SIZE: int = 256
+    REEMBED_PAUSE_SECONDS: float = 1.0
+
+    # Embedding transport to Supabase: 'json', 'float32' or 'float16' (base64 packed, decoded by decode_embedding() in SQL)
+    # json stays the default: the binary encodings are smaller on the wire, but decode_embedding() unpacks them one
+    # element at a time in SQL; switch only after benchmarking ingestion and search against your database
+    EMBEDDING_WIRE_ENCODING: str = "json"
+
+    # Query embedding micro-batching: concurrent embed_query calls arriving within the window (seconds) share one
+    # embed_documents request of at most N texts (window 0 = every query is its own request)
+    QUERY_EMBED_BATCH_WINDOW: float = 0.005
+    QUERY_EMBED_MAX_BATCH: int = 32
+
+    # Semantic answer cache (query similarity, seconds)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+    ANSWER_CACHE_TTL: float = 3600.0
+
+    # Historical backfill: concurrent date windows, halved while they have more result pages than the limit
+    BACKFILL_MAX_WORKERS: int = 4
+    BACKFILL_WINDOW_DAYS: int = 30
+    BACKFILL_MAX_PAGES_PER_WINDOW: int = 10
+
+    # API request scheduling: token bucket per API key (requests/second, burst), daily quota (0 = unlimited)
+    # The daily quota is counted in memory per process; restarts and other processes sharing a key start from zero
+    # Guardian developer keys allow 1 call/second and 500 calls/day, Tavily development keys 100 requests/minute
+    GUARDIAN_RATE_PER_SECOND: float = 1.0
+    GUARDIAN_BURST: int = 1
+    GUARDIAN_DAILY_QUOTA: int = 500
+    TAVILY_RATE_PER_SECOND: float = 1.5
+    TAVILY_BURST: int = 5
+    TAVILY_DAILY_QUOTA: int = 0
+    # Retries on 429/5xx/transient errors, exponential backoff with full jitter (seconds), Retry-After wins up to REQUEST_BACKOFF_MAX
+    REQUEST_MAX_RETRIES: int = 4
+    REQUEST_BACKOFF_BASE: float = 1.0
+    REQUEST_BACKOFF_MAX: float = 60.0
+
+    # Serving: agent runs allowed at once per process, other sessions wait for a free slot
+    MAX_CONCURRENT_AGENT_RUNS: int = 4
+
+    # Profiling of ingestion, retrieval and graph nodes: 'off', 'cprofile' (deterministic, .prof) or 'sampling'
+    # (stacks of every thread every N seconds, .folded for flamegraphs); results go to OUTPUT/profiles
+    PROFILING_MODE: str = "off"
+    PROFILING_SAMPLE_INTERVAL: float = 0.005
+
     OUTPUT: str = os.path.join(ENV_FILE_DIR, 'out')
     TIME_ZONE: datetime.timezone = datetime.timezone(offset=datetime.timedelta(hours=3), name='UTC+3')
 
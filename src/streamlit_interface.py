@@ -1,47 +1,60 @@
 import streamlit as st
+import asyncio
 import sys
 import os
 
 # Add src to Python path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from vector_press import LLMManager
-from vector_press.agent import VectorPressAgent, AgentState, should_continue
-from langgraph.graph import StateGraph, START, END
+from vector_press import LLMManager, SupabaseVectorStore
+from vector_press.event_loop import run_sync
+from vector_press.db import SemanticAnswerCache
+from vector_press.agent import VectorPressAgent, create_initial_state, build_graph
 
 from config import settings
 
 @st.cache_resource
 def initialize_components():
-    """Initialize agent components with caching"""
+    """
+    Initialize process-wide agent components with caching
+
+    Only stateless, thread-safe resources (LLM, embedder, Supabase, Guardian, Tavily clients and the compiled graph)
+    are shared between sessions. Conversation state lives in st.session_state, see create_initial_state().
+    """
     # Initialize LLM manager
     llm_manager = LLMManager()
 
-    # Create initial state
-    initial_state: AgentState = {
-        "messages": [],
-        "query": ""
-    }
+    # Initialize vector store (optional, news tool falls back to the Guardian API without it)
+    try:
+        vector_store = SupabaseVectorStore(llm_manager)
+    except Exception as e:
+        print(f"⚠️ [DEBUG] Vector store unavailable, news searches will use the Guardian API only: {e}")
+        vector_store = None
+
+    # Semantic answer cache shares the vector store's Supabase clients and embedding model
+    answer_cache = SemanticAnswerCache(vector_store) if vector_store and settings.ANSWER_CACHE_ENABLED else None
 
     # Initialize agent
-    vectorpress_agent = VectorPressAgent(llm_manager, initial_state)
+    vectorpress_agent = VectorPressAgent(llm_manager, vector_store=vector_store, answer_cache=answer_cache)
 
     # Create and compile LangGraph
-    graph = StateGraph(AgentState)
-    graph.add_node('llm_call', vectorpress_agent.llm_call)
-    graph.add_node('tools_call', vectorpress_agent.tools_call)
+    agent_app = build_graph(vectorpress_agent)
+
+    # Limits concurrent agent runs across all sessions of this process, awaited on the shared event loop
+    run_slots = asyncio.Semaphore(settings.MAX_CONCURRENT_AGENT_RUNS)
+
+    return agent_app, run_slots
 
-    graph.add_edge(start_key=START, end_key='llm_call')
-    graph.add_conditional_edges(
-        source='llm_call',
-        path=should_continue,
-        path_map={'continue': 'tools_call', 'end': END}
-    )
-    graph.add_edge('tools_call', 'llm_call')
 
-    agent_app = graph.compile()
+async def run_turn(agent_app, run_slots: asyncio.Semaphore, state: dict) -> dict:
+    """
+    Run one agent turn with app.ainvoke(), waiting for a free slot when the process is busy
 
-    return agent_app, initial_state
+    Every session's script thread hands its turn to the same event loop (vector_press.event_loop.run_sync), so
+    sessions share tool calls, timeouts and speculative lookups on one loop instead of queueing for worker threads.
+    """
+    async with run_slots:
+        return await agent_app.ainvoke(state)
 
 
 def main():
@@ -53,11 +66,11 @@ def main():
     st.markdown("Ask questions about Guardian articles!")
 
     # Initialize components
-    agent_app, initial_state = initialize_components()
+    agent_app, run_slots = initialize_components()
 
-    # Initialize session state
+    # Initialize session state, every session owns its own message history
     if "state" not in st.session_state:
-        st.session_state.state = initial_state.copy()
+        st.session_state.state = create_initial_state()
 
     if "chat_messages" not in st.session_state:
         st.session_state.chat_messages = []
@@ -80,8 +93,8 @@ def main():
                 # Update state with user query
                 st.session_state.state["query"] = user_input
 
-                # Process through agent
-                result_state = agent_app.invoke(st.session_state.state)
+                # Process through agent on the shared event loop
+                result_state = run_sync(run_turn(agent_app, run_slots, st.session_state.state))
 
                 # Get AI response from the result
                 ai_response = result_state["messages"][-1].content
@@ -111,7 +124,7 @@ def main():
 
         if st.button("🗑️ Clear Chat"):
             st.session_state.chat_messages = []
-            st.session_state.state = initial_state.copy()
+            st.session_state.state = create_initial_state()
             st.rerun()
 
         # Show some stats
@@ -1,9 +1,14 @@
 from .llm_embedding_initializer import LLMManager
 from vector_press.agent.agent import AgentState
 from .db.supabase_db import SupabaseVectorStore
+from .profiling import profiled, profile_run
+from .embedding_batcher import QueryEmbeddingBatcher
 
 __all__ = [
     'LLMManager',
     'AgentState',
     'SupabaseVectorStore',
+    'profiled',
+    'profile_run',
+    'QueryEmbeddingBatcher',
 ]
\ No newline at end of file
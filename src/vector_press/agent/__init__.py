@@ -1,25 +1,66 @@
 # Main agent classes
-from .agent import VectorPressAgent, AgentState, should_continue
+from .agent import VectorPressAgent, AgentState, SourcedResult, should_continue, answer_cache_route, create_initial_state, build_graph
 
 # API clients
-from .api_clients import GuardianAPIClient, BaseAPIClient, extract_article_text
+from .api_clients import GuardianAPIClient, BaseAPIClient, ExtractedArticle, ArticleMetadata, extract_article_text
 
 # Validation models
 from .tools_validation import TavilySearchRequest, GuardianSearchRequest
 
+# Tool result cache
+from .tool_cache import ToolResultCache, shared_tool_cache
+
+# Conversation compaction
+from .context_compaction import ContextCompactor
+
+# Retrieved context packing
+from .context_packing import ContextPacker
+
+# API request scheduling
+from .request_scheduler import RequestScheduler, Priority, QuotaExceededError, get_scheduler
+
+# Tiered model routing
+from .model_router import ModelRouter, is_conversational
+
 # Export all public classes and functions
 __all__ = [
     # Agent classes
     "VectorPressAgent",
     "AgentState",
+    "SourcedResult",
     "should_continue",
+    "answer_cache_route",
+    "create_initial_state",
+    "build_graph",
 
     # API clients
     "GuardianAPIClient",
     "BaseAPIClient",
+    "ExtractedArticle",
+    "ArticleMetadata",
     "extract_article_text",
 
     # Validation models
     "TavilySearchRequest",
     "GuardianSearchRequest",
+
+    # Tool result cache
+    "ToolResultCache",
+    "shared_tool_cache",
+
+    # Conversation compaction
+    "ContextCompactor",
+
+    # Retrieved context packing
+    "ContextPacker",
+
+    # API request scheduling
+    "RequestScheduler",
+    "Priority",
+    "QuotaExceededError",
+    "get_scheduler",
+
+    # Tiered model routing
+    "ModelRouter",
+    "is_conversational",
 ]
\ No newline at end of file
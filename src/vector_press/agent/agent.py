@@ -1,14 +1,28 @@
-from langchain_core.messages import HumanMessage, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph.message import add_messages
 from langgraph.graph import StateGraph, START, END
-from typing import TypedDict, Annotated
+from typing import Any, TypedDict, Annotated, NotRequired
 from datetime import datetime
 import datetime
+import asyncio
+import time
+import re
 from vector_press.agent.api_clients import GuardianAPIClient
 from vector_press.agent.tools_validation import TavilySearchRequest, GuardianSearchRequest
+from vector_press.agent.tool_cache import ToolResultCache, shared_tool_cache
+from vector_press.agent.context_compaction import ContextCompactor
+from vector_press.agent.context_packing import ContextPacker
+from vector_press.agent.request_scheduler import Priority, RequestScheduler, get_scheduler
+from vector_press.agent.model_router import ModelRouter
 from vector_press.llm_embedding_initializer import LLMManager
+from vector_press.profiling import profiled
+from vector_press.event_loop import run_sync
+from vector_press.db.supabase_db import SupabaseVectorStore
+from vector_press.db.ingestion_queue import BackgroundIngestionQueue
+from vector_press.db.answer_cache import SemanticAnswerCache
 from config import settings
-from tavily import TavilyClient
+from tavily import AsyncTavilyClient
 
 INSTRUCTIONS = """You are a smart and helpful news assistant. Your name is Big Brother.
 
@@ -50,86 +64,419 @@ class AgentState(TypedDict):
     """State class for LangGraph conversation flow"""
     messages: Annotated[list[BaseMessage], add_messages]  # keeps every type of message with BaseMessage
     query: str
+    cache_hit: NotRequired[bool]  # True when the current turn was answered from the semantic answer cache
+    speculation: NotRequired[Any]  # speculative news lookup of the current turn (asyncio.Task), see allm_call
+
+def create_initial_state() -> AgentState:
+    """Build a fresh, unshared conversation state that starts with the system INSTRUCTIONS"""
+    return {
+        "messages": [SystemMessage(content=INSTRUCTIONS)],
+        "query": "",
+        "cache_hit": False,
+        "speculation": None,
+    }
+
+def _query_words(text: str) -> set[str]:
+    return set(re.findall(r'\w+', text.casefold()))
+
+class SourcedResult(list):
+    """Tool output (list of texts for the LLM) that also carries the sources it was built from"""
+
+    def __init__(self, texts: list[str], sources: list[dict]):
+        super().__init__(texts)
+        self.sources = sources  # [{'title', 'section', 'url', 'publication_date'}], stored as ToolMessage.artifact
 
 class VectorPressAgent:
     """Handles Agent's processing and response generation"""
 
-    def __init__(self, llm_manager: LLMManager, state: AgentState):
-        """Initialize with LLM manager, Supabase vector store, and add INSTRUCTIONS to state"""
+    def __init__(self, llm_manager: LLMManager, state: AgentState = None, tool_cache: ToolResultCache = shared_tool_cache,
+                 vector_store: SupabaseVectorStore = None, answer_cache: SemanticAnswerCache = None,
+                 context_packer: ContextPacker = None, async_tavily_client: AsyncTavilyClient = None,
+                 tavily_scheduler: RequestScheduler = None,
+                 guardian_client: GuardianAPIClient = None):
+        """
+        Initialize with LLM manager and Supabase vector store
+
+        The agent holds no conversation state, so one instance can serve many sessions; use
+        create_initial_state() per conversation. A passed state gets INSTRUCTIONS appended for backwards compatibility.
+        Tavily and Guardian backends default to the real clients; load_test.py passes stubs.
+        """
         self.llm = llm_manager.get_llm()  # Get LLM from manager
-        self.tavily_client = TavilyClient(api_key=settings.TAVILY_API_KEY)
-        self.guardian_client = GuardianAPIClient()
-
-        tools = [self.tavily_web_search, self.search_guardian_articles]
-        self.structured_llm = self.llm.bind_tools(tools=tools)
-        state['messages'].append(SystemMessage(content=INSTRUCTIONS))
+        self.async_tavily_client = async_tavily_client or AsyncTavilyClient(api_key=settings.TAVILY_API_KEY)
+        self.tavily_scheduler = tavily_scheduler or get_scheduler('tavily', settings.TAVILY_API_KEY)
+        self.guardian_client = guardian_client or GuardianAPIClient()
+        self.tool_cache = tool_cache
 
+        # Without a vector store the news tool always goes to the Guardian API
+        self.vector_store = vector_store
+        self.ingestion_queue = BackgroundIngestionQueue(vector_store) if vector_store else None
+        self.answer_cache = answer_cache
+        self.context_packer = context_packer or ContextPacker()
 
-    def llm_call(self, state: AgentState) -> AgentState:
-        """LLM call that handles both initial user input and continuation after tools"""
+        tools = [self.tavily_web_search, self.search_guardian_articles]
+        # Stage models: small one picks tools, strong one writes the answer, small talk skips tools
+        self.router = ModelRouter(llm_manager, tools)
+        if state is not None:
+            state['messages'].append(SystemMessage(content=INSTRUCTIONS))
+
+        self._tool_timeouts = {
+            'search_guardian_articles': settings.GUARDIAN_TOOL_TIMEOUT,
+            'tavily_web_search': settings.TAVILY_TOOL_TIMEOUT,
+        }
+
+        # Speculative news lookups: tasks started with the first LLM call of a turn, served to a matching tool call
+        self.speculation_stats = {'started': 0, 'served': 0, 'unused': 0, 'cancelled': 0}
+        self._background_tasks: set[asyncio.Task] = set()  # answer cache writes, referenced until they finish
+
+    async def allm_call(self, state: AgentState) -> AgentState:
+        """
+        LLM call that handles both initial user input and continuation after tools
+
+        The model is picked per stage by self.router: tool selection for a new question, synthesis after tool
+        results, conversation (no tools) for small talk. On a new question the news lookup for the query starts as a
+        task next to the model call (settings.SPECULATIVE_RETRIEVAL); it is kept in state['speculation'] for
+        atools_call and cancelled if the model answers without tools.
+        """
         user_input = state.get('query', '')
 
         if not state['messages'] or not isinstance(state['messages'][-1], ToolMessage):   #IF (messages list is empty) OR (last message is NOT a ToolMessage)
             state['messages'].append(HumanMessage(content=user_input))
+        stage = self.router.stage_for(state['messages'], user_input)
+        if stage == 'tool_selection' and self._should_speculate(user_input):
+            state['speculation'] = asyncio.create_task(self._aspeculative_search(user_input))
+            self.speculation_stats['started'] += 1
 
-        response = self.structured_llm.invoke(state['messages'])  #state AIMessage
+        try:
+            response = await self.router.ainvoke(stage, state['messages'])  #state AIMessage
+        except BaseException:
+            self._discard_speculation(state)
+            raise
         state['messages'].append(response)
+        if not response.tool_calls:
+            self._discard_speculation(state)
         return state
 
-    def tools_call(self, state: AgentState) -> AgentState:
-        """Execute tool calls and add results as ToolMessages"""
-        for tool_call in state['messages'][-1].tool_calls:
-            tool_name = tool_call["name"]
-            args = tool_call.get("args", {})
-
-            if tool_name == "search_guardian_articles":
-                # Extract nested validation data if present
-                validation_args = args.get('validation', args)
-                validation = GuardianSearchRequest(**validation_args)
-                tool_result = self.search_guardian_articles(validation)
-
-            elif tool_name == "tavily_web_search":
-                # Extract nested validation data if present
-                validation_args = args.get('validation', args)
-                validation = TavilySearchRequest(**validation_args)
-                tool_result = self.tavily_web_search(validation)
-            else:
-                continue
-
-            # Add tool response
+    def llm_call(self, state: AgentState) -> AgentState:
+        """Sync wrapper of allm_call() for app.invoke(), runs on the shared event loop"""
+        return run_sync(self.allm_call(state))
+
+    def _should_speculate(self, query: str) -> bool:
+        return (settings.SPECULATIVE_RETRIEVAL and bool(query.strip())
+                and (self.vector_store is not None or settings.SPECULATIVE_GUARDIAN_SEARCH))
+
+    async def _aspeculative_search(self, query: str) -> tuple[str, SourcedResult | None]:
+        """
+        News lookup for the user's query, run alongside the first LLM call of a turn
+
+        Returns:
+            (source, result): 'vector_store' with the packed chunks (None on a miss), or 'guardian' with the articles
+            of a default GuardianSearchRequest when SPECULATIVE_GUARDIAN_SEARCH is on and the vector store missed
+        """
+        try:
+            result = await self._avector_store_search(query) if self.vector_store else None
+            if result or not settings.SPECULATIVE_GUARDIAN_SEARCH:
+                return 'vector_store', result
+            return 'guardian', await self._aguardian_api_search(GuardianSearchRequest(query=query))
+        except Exception as e:
+            print(f"⚠️ [DEBUG] Speculative news lookup failed: {e}")
+            return 'vector_store', None
+
+    def _take_speculation(self, state: AgentState, tool_calls: list[dict]) -> tuple[Any, str | None]:
+        """
+        Remove the turn's speculative lookup from state and pick the tool call it answers
+
+        A search_guardian_articles call matches when it has no section filter and every word of its query appears in
+        the user's query (the model usually shortens the question to keywords).
+
+        Returns:
+            (speculation, id of the matching tool call), the id is None when no call matches
+        """
+        speculation = state.get('speculation')
+        state['speculation'] = None
+        if speculation is None:
+            return None, None
+
+        user_words = _query_words(state.get('query', ''))
+        for tool_call in tool_calls:
+            args = tool_call.get('args', {})
+            args = args.get('validation', args)
+            tool_words = _query_words(str(args.get('query', '')))
+            if (tool_call['name'] == 'search_guardian_articles' and not args.get('section')
+                    and tool_words and tool_words <= user_words):
+                return speculation, tool_call['id']
+        return speculation, None
+
+    def _discard_speculation(self, state: AgentState, speculation: asyncio.Task = None, matched: bool = False) -> None:
+        """
+        Cancel the turn's speculative lookup once no tool call can use it any more
+
+        Only lookups still running are cancelled (and counted as such); 'unused' counts every lookup no tool call
+        matched, whether it was cancelled or had already finished.
+        """
+        if speculation is None:
+            speculation = state.get('speculation')
+        state['speculation'] = None
+        if speculation is None:
+            return
+        cancelled = speculation.cancel()  # False once the lookup has finished
+        if cancelled:
+            self.speculation_stats['cancelled'] += 1
+        if not matched:
+            self.speculation_stats['unused'] += 1
+            print(f"🗑️ [DEBUG] Speculative news lookup unused, " + ("cancelled" if cancelled else "already finished"))
+
+    def _serve_speculation(self, source: str, result, validation: GuardianSearchRequest):
+        """Result of a finished speculative lookup if it can answer the request, None otherwise"""
+        # Guardian API results depend on every request field, vector store results only on query and section
+        if not result or (source == 'guardian' and validation != GuardianSearchRequest(query=validation.query)):
+            return None
+        self.speculation_stats['served'] += 1
+        print(f"⚡ [DEBUG] Answering news search from the speculative {source} lookup")
+        return result
+
+    async def _arun_tool(self, tool_name: str, args: dict, speculation: asyncio.Task = None):
+        """Validate arguments and execute a single tool, returns None for unknown tools"""
+        # Extract nested validation data if present
+        validation_args = args.get('validation', args)
+        timeout = self._tool_timeouts[tool_name]
+
+        if tool_name == "search_guardian_articles":
+            validation = GuardianSearchRequest(**validation_args)
+            return await self.tool_cache.aget_or_compute(
+                tool_name, validation, lambda: self.asearch_guardian_articles(validation, speculation, timeout))
+
+        elif tool_name == "tavily_web_search":
+            validation = TavilySearchRequest(**validation_args)
+            return await self.tool_cache.aget_or_compute(tool_name, validation,
+                                                         lambda: self.atavily_web_search(validation, timeout))
+
+        return None
+
+    async def _arun_tool_with_timeout(self, tool_name: str, args: dict, slots: asyncio.Semaphore,
+                                      speculation: asyncio.Task = None):
+        """
+        Run one tool under its timeout, turning timeouts and failures into tool output
+
+        The deadline starts once the tool holds one of the turn's slots, so waiting for a slot doesn't count against
+        it. On timeout the tool's task is cancelled, which also aborts its HTTP requests.
+        """
+        timeout = self._tool_timeouts[tool_name]
+        async with slots:
+            try:
+                return await asyncio.wait_for(self._arun_tool(tool_name, args, speculation), timeout=timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️ [DEBUG] Tool {tool_name} timed out after {timeout:g} seconds")
+                return f"Tool {tool_name} timed out after {timeout:g} seconds"
+            except Exception as e:
+                print(f"🔥 [DEBUG] Tool {tool_name} failed: {e}")
+                return f"Tool {tool_name} failed: {str(e)}"
+
+    async def atools_call(self, state: AgentState) -> AgentState:
+        """Execute tool calls concurrently on the event loop and add results as ToolMessages in the original order"""
+        tool_calls = [tool_call for tool_call in state['messages'][-1].tool_calls
+                      if tool_call["name"] in self._tool_timeouts]
+        speculation, speculation_call_id = self._take_speculation(state, tool_calls)
+
+        start_time = time.time()
+        slots = asyncio.Semaphore(settings.TOOL_CALL_MAX_WORKERS)  # tool calls of this message running at once
+        tool_results = await asyncio.gather(
+            *(self._arun_tool_with_timeout(tool_call["name"], tool_call.get("args", {}), slots,
+                                           speculation if tool_call["id"] == speculation_call_id else None)
+              for tool_call in tool_calls)
+        )
+        self._discard_speculation(state, speculation, matched=speculation_call_id is not None)
+
+        for tool_call, tool_result in zip(tool_calls, tool_results):
             state['messages'].append(ToolMessage(
                 content=tool_result,
-                name=tool_name,
-                tool_call_id=tool_call["id"]
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+                artifact=getattr(tool_result, 'sources', None),
             ))
 
+        print(f"⏱️ [DEBUG] atools_call ran {len(tool_calls)} tool(s) in {time.time() - start_time:.2f} seconds")
         return state
 
+    def tools_call(self, state: AgentState) -> AgentState:
+        """Sync wrapper of atools_call() for app.invoke(), runs on the shared event loop"""
+        return run_sync(self.atools_call(state))
+
+    # Tool definitions bound to the models: name, signature and docstring form the schema the LLM sees, calls from
+    # atools_call go straight to the async implementations
     def tavily_web_search(self, validation: TavilySearchRequest) -> str:
+        return run_sync(self.atavily_web_search(validation))
 
+    def search_guardian_articles(self, validation: GuardianSearchRequest):
+        """
+        Answer from the vector store when possible, otherwise fetch from the Guardian API and ingest in background
+
+        Args:
+            validation: Validated tool arguments
+        """
+        return run_sync(self.asearch_guardian_articles(validation))
+
+    async def atavily_web_search(self, validation: TavilySearchRequest, timeout: float = settings.TAVILY_TOOL_TIMEOUT):
+        """
+        Web search through Tavily, returns the result contents with their sources or an error string
+
+        Args:
+            validation: Validated tool arguments
+            timeout: Seconds per HTTP request
+        """
         try:
-            response = self.tavily_client.search(
+            response = await self.tavily_scheduler.acall(lambda: self.async_tavily_client.search(
                 query=validation.query,
-                max_results= validation.max_results,
-                topic= validation.topic,
-            )
-
-            # Extract all content values
-            contents = [result['content'] for result in response['results']]
-            return contents
+                max_results=validation.max_results,
+                topic=validation.topic,
+                timeout=timeout,
+            ), Priority.INTERACTIVE)
+            return SourcedResult([result['content'] for result in response['results']], self._tavily_sources(response))
 
         except Exception as e:
             print(f"Couldn't retrieve any chunk: {datetime.datetime.now().astimezone(tz=settings.TIME_ZONE)}")
             return f"Web search failed: {str(e)}"
 
-    def search_guardian_articles(self, validation: GuardianSearchRequest):
-            return self.guardian_client.search_articles(
-                query=validation.query,
-                section=validation.section,
-                max_pages= validation.max_pages,
-                page_size= validation.page_size,
-                order_by=validation.order_by,
-                )
+    async def asearch_guardian_articles(self, validation: GuardianSearchRequest, speculation: asyncio.Task = None,
+                                        timeout: float = settings.GUARDIAN_TOOL_TIMEOUT):
+        """
+        Answer from the vector store when possible, otherwise fetch from the Guardian API and ingest in background
+
+        Args:
+            validation: Validated tool arguments
+            speculation: The turn's speculative lookup (see allm_call), its result is used when it can answer the request
+            timeout: Seconds per Guardian API request
+        """
+        if speculation is not None and not speculation.cancelled():
+            served = self._serve_speculation(*await speculation, validation)
+            if served is not None:
+                return served
+
+        if self.vector_store:
+            result = await self._avector_store_search(validation.query, validation.section)
+            if result:
+                return result
+
+        return await self._aguardian_api_search(validation, timeout)
+
+    async def _avector_store_search(self, query: str, section: str = None) -> SourcedResult | None:
+        """Packed chunks for the query from the recent partitions, then the whole corpus, None on a miss"""
+        try:
+            embedded_query = await self.vector_store.aembed_query(query)  # one embedding for every window
+        except Exception as e:
+            print(f"🔥 [DEBUG] Error embedding query: {e}")
+            return None
+
+        chunks = None
+        for from_date in self._retrieval_windows():
+            chunks = await self.vector_store.aretrieve_relevant_chunks(
+                query=query,
+                match_count=settings.GUARDIAN_TOOL_MATCH_COUNT,
+                section_filter=section,
+                similarity_threshold=settings.GUARDIAN_TOOL_SIMILARITY_THRESHOLD,
+                include_embeddings=True,
+                from_date=from_date,
+                embedded_query=embedded_query,
+            )
+            if chunks:
+                break
+        if not chunks:
+            return None
+        print(f"⚡ [DEBUG] Answering news search from vector store ({len(chunks)} chunks)")
+        return self._format_chunks(self.context_packer.pack(chunks))
+
+    async def _aguardian_api_search(self, validation: GuardianSearchRequest,
+                                    timeout: float = settings.GUARDIAN_TOOL_TIMEOUT) -> SourcedResult | None:
+        """Fetch from the Guardian API and queue the articles for background ingestion"""
+        extracted_articles = await self.guardian_client.asearch_articles(
+            query=validation.query,
+            section=validation.section,
+            max_pages=validation.max_pages,
+            page_size=validation.page_size,
+            order_by=validation.order_by,
+            timeout=timeout,
+        )
+
+        return self._ingest_and_format(extracted_articles)
+
+    def _retrieval_windows(self) -> list[str | None]:
+        """Publication lower bounds to search in turn: recent partitions first, then the whole corpus"""
+        if settings.GUARDIAN_TOOL_RECENT_DAYS <= 0:
+            return [None]
+        recent = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=settings.GUARDIAN_TOOL_RECENT_DAYS)
+        return [recent.isoformat(), None]
+
+    def _tavily_sources(self, response: dict) -> list[dict]:
+        return [{'title': result.get('title', ''), 'section': None, 'url': result.get('url', ''),
+                 'publication_date': result.get('published_date')} for result in response['results']]
+
+    def _format_chunks(self, chunks: list[dict]) -> SourcedResult:
+        """Render retrieved chunks (or packed passages) with their source for the LLM"""
+        texts = [f"{chunk['title']} ({chunk['section']}, {chunk['publication_date']})\n{chunk['content']}"
+                 for chunk in chunks]
+        sources = [{key: chunk[key] for key in ('title', 'section', 'url', 'publication_date')} for chunk in chunks]
+        return SourcedResult(texts, sources)
+
+    def _ingest_and_format(self, extracted_articles: list[dict] | None) -> SourcedResult | None:
+        """Queue fetched articles for background storage and return their text for the LLM"""
+        if not extracted_articles:
+            return extracted_articles
+
+        if self.ingestion_queue:
+            for extracted_article in extracted_articles:
+                self.ingestion_queue.submit(extracted_article)
+
+        texts = [extracted_article['content'] for extracted_article in extracted_articles]
+        sources = [{key: extracted_article['metadata'][key] for key in ('title', 'section', 'url', 'publication_date')}
+                   for extracted_article in extracted_articles]
+        return SourcedResult(texts, sources)
+
+    def _cache_hit_update(self, state: AgentState, hit: dict | None) -> dict:
+        """State update for answer_cache_lookup: the query and cached answer (with sources) on a hit"""
+        if not hit:
+            return {'cache_hit': False}
+
+        answer = hit['answer']
+        if hit['sources']:
+            answer += "\n\nSources:\n" + "\n".join(f"- {source['title']} ({source['url']})" for source in hit['sources'])
+
+        return {
+            'messages': [HumanMessage(content=state.get('query', '')), AIMessage(content=answer)],
+            'cache_hit': True,
+        }
+
+    def _current_turn_sources(self, state: AgentState) -> list[dict]:
+        """Sources attached to the ToolMessages since the last HumanMessage, de-duplicated by URL"""
+        sources, seen_urls = [], set()
+        for message in reversed(state['messages']):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, ToolMessage) and message.artifact:
+                for source in message.artifact:
+                    if source['url'] not in seen_urls:
+                        seen_urls.add(source['url'])
+                        sources.append(source)
+        return sources
+
+    async def aanswer_cache_lookup(self, state: AgentState) -> dict:
+        """Graph node: answer from the semantic answer cache when an equivalent question was answered recently"""
+        return self._cache_hit_update(state, await self.answer_cache.alookup(state.get('query', '')))
+
+    def answer_cache_lookup(self, state: AgentState) -> dict:
+        """Sync wrapper of aanswer_cache_lookup()"""
+        return run_sync(self.aanswer_cache_lookup(state))
+
+    async def aanswer_cache_store(self, state: AgentState) -> dict:
+        """Graph node: cache the final answer of a tool-backed turn in a background task, without delaying the response"""
+        sources = self._current_turn_sources(state)
+        if sources:
+            task = asyncio.create_task(self.answer_cache.astore(state.get('query', ''), state['messages'][-1].content, sources))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        return {}
+
+    def answer_cache_store(self, state: AgentState) -> dict:
+        """Sync wrapper of aanswer_cache_store(), the write keeps running on the shared event loop"""
+        return run_sync(self.aanswer_cache_store(state))
 
 
 def should_continue(state: AgentState):
@@ -140,30 +487,70 @@ def should_continue(state: AgentState):
     else:
         return 'end'
 
-def main():
+def answer_cache_route(state: AgentState):
+    """Determine whether the semantic answer cache already answered the turn"""
+    return 'hit' if state.get('cache_hit') else 'miss'
 
-    print("\nStarting (type 'exit' to quit)...")
-    state: AgentState = {
-        "messages": [],
-        "query": ""
-    }
+def build_graph(vectorpress_agent: VectorPressAgent, context_compactor: ContextCompactor = None):
+    """
+    Build and compile the agent StateGraph
 
-    llm_manager = LLMManager()
-    vectorpress_agent = VectorPressAgent(llm_manager, state)
+    Nodes are async; their sync wrappers run them on the shared event loop (vector_press.event_loop), so app.invoke()
+    from any thread and app.ainvoke()/app.astream() execute the same code.
+    When the agent has an answer cache, the loop is wrapped in answer_cache_lookup / answer_cache_store.
+    With settings.PROFILING_MODE set, every node run is profiled as node.<name>.
+    """
+    context_compactor = context_compactor or ContextCompactor()
+
+    def node(name: str, func, afunc=None):
+        profile = profiled(f"node.{name}")
+        return RunnableLambda(profile(func), afunc=profile(afunc)) if afunc else profile(func)
 
     graph = StateGraph(AgentState)
-    graph.add_node('llm_call', vectorpress_agent.llm_call)
-    graph.add_node('tools_call', vectorpress_agent.tools_call)
+    graph.add_node('compact_context', node('compact_context', context_compactor.compact_context))
+    graph.add_node('llm_call', node('llm_call', vectorpress_agent.llm_call, vectorpress_agent.allm_call))
+    graph.add_node('tools_call', node('tools_call', vectorpress_agent.tools_call, vectorpress_agent.atools_call))
+
+    if vectorpress_agent.answer_cache:
+        graph.add_node('answer_cache_lookup', node('answer_cache_lookup', vectorpress_agent.answer_cache_lookup,
+                                                   vectorpress_agent.aanswer_cache_lookup))
+        graph.add_node('answer_cache_store', node('answer_cache_store', vectorpress_agent.answer_cache_store,
+                                                  vectorpress_agent.aanswer_cache_store))
+
+        graph.add_edge(start_key=START, end_key='answer_cache_lookup')
+        graph.add_conditional_edges(source='answer_cache_lookup', path=answer_cache_route,
+                                    path_map={'hit': END, 'miss': 'compact_context'})
+        graph.add_conditional_edges(source='llm_call',path= should_continue, path_map={'continue':'tools_call', 'end':'answer_cache_store'})
+        graph.add_edge('answer_cache_store', END)
+    else:
+        graph.add_edge(start_key=START,end_key= 'compact_context')
+        graph.add_conditional_edges(source='llm_call',path= should_continue, path_map={'continue':'tools_call', 'end':END})
+
+    graph.add_edge('compact_context', 'llm_call')
+    graph.add_edge('tools_call', 'compact_context')
+
+    return graph.compile()
+
+async def amain():
+
+    print("\nStarting (type 'exit' to quit)...")
+    state = create_initial_state()
+
+    llm_manager = LLMManager()
 
+    try:
+        vector_store = SupabaseVectorStore(llm_manager)
+    except Exception as e:
+        print(f"⚠️ [DEBUG] Vector store unavailable, news searches will use the Guardian API only: {e}")
+        vector_store = None
 
-    graph.add_edge(start_key=START,end_key= 'llm_call')
-    graph.add_conditional_edges(source='llm_call',path= should_continue, path_map={'continue':'tools_call', 'end':END})
-    graph.add_edge('tools_call', 'llm_call')
+    answer_cache = SemanticAnswerCache(vector_store) if vector_store and settings.ANSWER_CACHE_ENABLED else None
 
-    app = graph.compile()
+    vectorpress_agent = VectorPressAgent(llm_manager, vector_store=vector_store, answer_cache=answer_cache)
+    app = build_graph(vectorpress_agent)
 
     while True:
-        user_input = input("\nYou: ").strip()
+        user_input = (await asyncio.to_thread(input, "\nYou: ")).strip()
         if user_input.lower() == "exit":
             print("\nGoodbye!")
             break
@@ -171,10 +558,14 @@ def main():
         # Store user input in query field for process_query to access
         state["query"] = user_input
 
-        state = app.invoke(state)
+        state = await app.ainvoke(state)
 
         if state['messages']:
             print(f"\nBig Brother: {state['messages'][-1].content}")
 
+def main():
+    """Sync entry point for the terminal chat, runs amain() on a fresh event loop"""
+    asyncio.run(amain())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,95 +1,80 @@
 from abc import ABC, abstractmethod
 
-from typing import Dict
+from typing import Dict, Iterator, AsyncIterator, TypedDict
 from datetime import datetime
 import time
-import requests
+import json
+import httpx
+
+try:
+    import orjson
+except ImportError:  # optional 'fast-json' extra, responses are decoded with the standard library json module without it
+    orjson = None
 
 from config import settings
 
+from vector_press.agent.request_scheduler import Priority, QuotaExceededError, get_scheduler
+from vector_press.event_loop import iterate_sync, run_sync
 
-def extract_article_text(article_data: Dict) -> Dict | None:
-    """
-    Extract and clean text from Guardian API article response
 
-    Args:
-        article_data: Article data dictionary from Guardian API response
+class ArticleMetadata(TypedDict):
+    """guardian_articles row of an extracted article, as stored by _process_extracted_article()"""
+    article_id: str  # Guardian API ID (e.g. "world/2022/oct/21/russia-ukraine-war-latest...")
+    title: str
+    section: str  # section id (e.g. 'world') so it matches GuardianSearchRequest.section filters
+    publication_date: str
+    url: str
+    body_text: str
+    word_count: int
+    char_count: int
+    fetch_time: str
 
-    Returns:
-        Dictionary containing:
-            - metadata: Article metadata (ID, title, publication date, etc.)
-            - content: Combined full text content
-        Returns None if extraction fails
-    """
-    print(f"\n🔍 [DEBUG] Extracting text from article...")
 
-    import time
-    start_time = time.time()
+class ExtractedArticle(TypedDict):
+    """Article returned by extract_article_text(); a plain dict, so checkpoint pages stay JSON"""
+    metadata: ArticleMetadata
+    content: str  # title and body text, the text that is chunked and embedded
 
-    try:
-        # Basic article info
-        article_id = article_data.get("id", "")
-        title = article_data.get("webTitle", "")
-        url = article_data.get("webUrl", "")
-        publication_date = article_data.get("webPublicationDate", "")
-        section_name = article_data.get("sectionName", "")
 
-        print(f"🔍 [DEBUG] Article ID: {article_id}")
+def _decode_json(raw: bytes) -> Dict:
+    """Decode a response body with orjson when it is installed"""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-        # Extract fields if available
-        fields = article_data.get("fields", {})
 
-        # Get different text content - convert strings to integers
-        #word_count = int(fields.get("wordcount", "0") or 0)
-        #char_count = int(fields.get("charCount", "0") or 0)
-        #standfirst = fields.get("standfirst", "")  # Summary/subtitle
-        body_text = fields.get("bodyText", "")
-        #trail_text = fields.get("trailText", "")  # Preview text
-
-        #print(f"🔍 [DEBUG] Standfirst length: {len(standfirst)} chars")
-        print(f"🔍 [DEBUG] Body text length: {len(body_text)} chars")
-        #print(f"🔍 [DEBUG] Trail text length: {len(trail_text)} chars")
-
-        # Combine all text content
-        full_text_parts = []
-        if title:
-            full_text_parts.append(title)
-       # if standfirst:
-        #    full_text_parts.append(standfirst)
-        if body_text:
-            full_text_parts.append(body_text)
-        #elif trail_text:  # Fallback if no body text
-        #    full_text_parts.append(trail_text)
-
-        full_text = "\n\n".join(full_text_parts)
-
-        print(f"🔍 [DEBUG] Combined text length: {len(full_text)} chars")
-        print(f"🔍 [DEBUG] Text preview (first 200 chars): {full_text[:200]}...")
-
-        # Create structured metadata
-        meta_data = {
-            "article_id": article_id,
-            # Guardian API ID as article_id (e.g., "world/2022/oct/21/russia-ukraine-war-latest...")
-            "title": title,
-            "section": section_name,
-            "publication_date": publication_date,
-            "url": url,
-            #"summary": standfirst,
-            "body_text": body_text,
-           # "trail_text": trail_text,
-           # "word_count": word_count,
-           # "char_count": char_count,
-            "fetch_time": datetime.now().isoformat()
-        }
+def extract_article_text(article_data: Dict, fetch_time: str = None) -> ExtractedArticle | None:
+    """
+    Extract the text and metadata of a Guardian API search result
 
-        print(f"✅ [DEBUG] Article extraction completed!")
-        #print(f"✅ [DEBUG] Final word count: {meta_data['word_count']} words")
-        print(f"⏱️ [DEBUG] extract_article_text took {time.time() - start_time:.4f} seconds")
+    Only webTitle and the bodyText, wordcount and charCount fields (settings.GUARDIAN_SHOW_FIELDS) are read.
+    Runs once per article on every fetched page, so it does no logging of its own.
 
-        return full_text
-            #'metadata': meta_data
+    Args:
+        article_data: Article data dictionary from Guardian API response
+        fetch_time: ISO timestamp of the page request, defaults to now
 
+    Returns:
+        ExtractedArticle with the article metadata and the combined title and body text,
+        None if extraction fails
+    """
+    try:
+        title = article_data.get("webTitle", "")
+        fields = article_data.get("fields") or {}
+        body_text = fields.get("bodyText", "")
 
+        return {
+            'metadata': {
+                "article_id": article_data.get("id", ""),
+                "title": title,
+                "section": article_data.get("sectionId", ""),
+                "publication_date": article_data.get("webPublicationDate", ""),
+                "url": article_data.get("webUrl", ""),
+                "body_text": body_text,
+                "word_count": int(fields.get("wordcount") or 0) or len(body_text.split()),
+                "char_count": int(fields.get("charCount") or 0) or len(body_text),
+                "fetch_time": fetch_time or datetime.now().isoformat(),
+            },
+            'content': "\n\n".join(part for part in (title, body_text) if part),
+        }
 
     except Exception as e:
         print(f"🔥 [DEBUG] Error extracting article text: {e}")
@@ -105,28 +90,31 @@ class BaseAPIClient(ABC):   # ABC = Abstract Base Class, ABC prevents creating i
         pass
 
 class GuardianAPIClient(BaseAPIClient):
-    def __init__(self):
+    def __init__(self, priority: Priority = Priority.INTERACTIVE):
+        """
+        Args:
+            priority: Scheduling lane of this client's requests, BATCH for ingestion clients
+        """
         super().__init__(
             api_key=settings.GUARDIAN_API_KEY,
             base_url="https://content.guardianapis.com"
         )
+        # Shared with every other client of the same key: rate limit, daily quota and retries
+        self.scheduler = get_scheduler('guardian', self.api_key)
+        self.priority = priority
 
         print(f"🔧 [DEBUG] Guardian API Client initialized")
 
-    def search_articles(self,
-                        query: str = None,
-                        section: str = None,
-                        page_size: int = 2,
-                        from_date : str = None,
-                        show_fields: str = "all",
-                        order_by: str = None,
-                        max_pages: int = 2) -> list[Dict] | None:
-
-        print(f"\n📡 [DEBUG] Starting API search for {max_pages} page(s)...")
-
-        # Build API endpoint
-        endpoint = f"{self.base_url}/search"
-
+    def _build_search_params(self,
+                             query: str = None,
+                             section: str = None,
+                             page_size: int = 2,
+                             from_date: str = None,
+                             show_fields: str = settings.GUARDIAN_SHOW_FIELDS,
+                             order_by: str = None,
+                             max_pages: int = 2,
+                             to_date: str = None) -> Dict:
+        """Build Guardian /search query parameters"""
         # Build base parameters
         base_params = {
             "api-key": self.api_key
@@ -142,6 +130,9 @@ class GuardianAPIClient(BaseAPIClient):
         if from_date:
             base_params["from-date"] = from_date
 
+        if to_date:
+            base_params["to-date"] = to_date
+
         if page_size:
             base_params["page-size"] = page_size
 
@@ -154,67 +145,187 @@ class GuardianAPIClient(BaseAPIClient):
         if max_pages:
             base_params["max-pages"] = max_pages
 
-        # Collect articles from all pages
-        all_extracted_articles = []
-        total_start_time = time.time()
-        page = 0  # Initialize page counter
+        return base_params
+
+    def _extract_page(self, page: int, payload: Dict) -> tuple[list[ExtractedArticle], int]:
+        """
+        Extract the articles of a decoded /search response
+
+        Returns:
+            (extracted articles, total number of result pages reported by the API)
+        """
+        response = payload.get('response', {})
+        articles_data = response.get('results', [])
+
+        fetch_time = datetime.now().isoformat()
+        extracted_articles = [extracted for extracted in (extract_article_text(article_data, fetch_time)
+                                                          for article_data in articles_data) if extracted]
+
+        failed = len(articles_data) - len(extracted_articles)
+        print(f"[DEBUG] Extracted {len(extracted_articles)} articles from page {page}"
+              + (f", {failed} failed" if failed else ""))
+        return extracted_articles, response.get('pages', page)
+
+    async def acount_results(self, base_params: Dict) -> int | None:
+        """
+        Total number of results for the search, with a single one-result request without fields
+
+        Args:
+            base_params: Parameters from _build_search_params()
+
+        Returns:
+            Result count, None if the API answered with an error
+        """
+        params = {key: value for key, value in base_params.items() if key != "show-fields"}
+        params.update({"page": 1, "page-size": 1})
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await self.scheduler.acall(lambda: client.get(f"{self.base_url}/search", params=params),
+                                                  self.priority)
+        if response.status_code != 200:
+            print(f"❌ [DEBUG] Result count failed with status {response.status_code}: {response.text}")
+            return None
+
+        return _decode_json(response.content).get('response', {}).get('total', 0)
+
+    def count_results(self, base_params: Dict) -> int | None:
+        """Sync wrapper of acount_results() for ingestion threads"""
+        return run_sync(self.acount_results(base_params))
+
+    async def afetch_page(self, page: int, base_params: Dict, client: httpx.AsyncClient = None) -> list[ExtractedArticle] | None:
+        """
+        Fetch and extract a single result page
+
+        Args:
+            page: 1-based page number
+            base_params: Parameters from _build_search_params()
+            client: Optional client to reuse the connection across pages
+
+        Returns:
+            Extracted articles (empty list past the last page), None if the API answered with an error
+            Raises httpx.HTTPError on connection problems once retries are exhausted
+            and QuotaExceededError when the daily quota is used up
+        """
+        extracted_page = await self._afetch_page(page, base_params, client)
+        return None if extracted_page is None else extracted_page[0]
+
+    def fetch_page(self, page: int, base_params: Dict) -> list[ExtractedArticle] | None:
+        """Sync wrapper of afetch_page() for ingestion threads"""
+        return run_sync(self.afetch_page(page, base_params))
+
+    async def _afetch_page(self, page: int, base_params: Dict, client: httpx.AsyncClient = None) -> tuple[list[ExtractedArticle], int] | None:
+        """afetch_page() that also returns the total page count"""
+        if client is None:
+            async with httpx.AsyncClient(timeout=30) as client:
+                return await self._afetch_page(page, base_params, client)
+
+        params = {**base_params, "page": page}
+
+        page_start_time = time.time()
+        response = await self.scheduler.acall(lambda: client.get(f"{self.base_url}/search", params=params),
+                                              self.priority)
+        print(f"[DEBUG] Page {page} request took {time.time() - page_start_time:.2f} seconds")
+
+        if response.status_code != 200:
+            print(f"❌ [DEBUG] Page {page} failed with status {response.status_code}: {response.text}")
+            return None
+
+        return self._extract_page(page, _decode_json(response.content))
+
+    async def aiter_articles(self,
+                             query: str = None,
+                             section: str = None,
+                             page_size: int = 2,
+                             from_date: str = None,
+                             show_fields: str = settings.GUARDIAN_SHOW_FIELDS,
+                             order_by: str = None,
+                             max_pages: int = 2,
+                             max_results: int = None,
+                             timeout: float = 30) -> AsyncIterator[ExtractedArticle]:
+        """
+        Lazily yield extracted articles, fetching the next page only once the current one is consumed
+
+        Pagination stops at max_pages, at the last page reported by the API, after max_results articles,
+        on an API error or as soon as the caller stops iterating. Only one page is held in memory.
+
+        Args:
+            query: Search query
+            section: Guardian section id (e.g. technology)
+            page_size: Number of articles per request
+            from_date: Date filter (YYYY-MM-DD format)
+            show_fields: Guardian show-fields value, only the fields extract_article_text() reads by default
+            order_by: Sort order for articles (e.g. relevance, newest, oldest)
+            max_pages: Upper limit for page number
+            max_results: Optional upper bound on yielded articles
+            timeout: Seconds per HTTP request (connect, read, write and pool wait each)
+
+        Yields:
+            ExtractedArticle records from extract_article_text()
+        """
+        base_params = self._build_search_params(query=query, section=section, page_size=page_size,
+                                                from_date=from_date, show_fields=show_fields,
+                                                order_by=order_by, max_pages=max_pages)
+        yielded = 0
 
         try:
-            for page in range(1, max_pages + 1):
-                print(f"\n📄 [DEBUG] Fetching page {page}/{max_pages}...")
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                for page in range(1, max_pages + 1):
+                    print(f"\n📄 [DEBUG] Fetching page {page}/{max_pages}...")
 
-                # Add page parameter
-                params = {**base_params, "page": page}
+                    fetched = await self._afetch_page(page, base_params, client)
+                    if fetched is None:
+                        return
 
-                page_start_time = time.time()
-                response = requests.get(endpoint, params=params, timeout=30)
-                page_end_time = time.time()
+                    extracted_page, total_pages = fetched
+                    if not extracted_page:
+                        print(f"[DEBUG] No articles found on page {page}. Stopping pagination.")
+                        return
 
-                print(f"[DEBUG] Page {page} request took {page_end_time - page_start_time:.2f} seconds")
+                    for extracted in extracted_page:
+                        yield extracted
+                        yielded += 1
+                        if max_results is not None and yielded >= max_results:
+                            return
 
-                if response.status_code == 200:
-                    api_data = response.json()
-                    # to see raw response
-                    articles_data = api_data.get('response', {}).get('results', [])
+                    if page >= total_pages:
+                        return
 
-                    if not articles_data:
-                        print(f"[DEBUG] No articles found on page {page}. Stopping pagination.")
-                        break
-                    print(f"[DEBUG] Found {len(articles_data)} articles on page {page}")
-
-                    if not articles_data:
-                        print(f"[DEBUG] All articles on page {page} already exist. Skipping to next page.")
-                        continue
-
-                    print(
-                        f"[DEBUG] Processing {len(articles_data)} new articles from page {page} (after duplicate check)")
-
-                    # Process each article using the extraction function
-                    for i, article_data in enumerate(articles_data):
-                        print(f"[DEBUG] Processing article {i + 1}/{len(articles_data)} from page {page}")
-                        extracted = extract_article_text(article_data)
-                        if extracted:
-                            all_extracted_articles.append(extracted)
-                        else:
-                            print(f"[DEBUG] Failed to extract article {i + 1} from page {page}")
-
-                else:
-                    print(f"❌ [DEBUG] Page {page} failed with status {response.status_code}: {response.text}")
-                    if page == 1:  # If first page fails, return None
-                        return None
-                    else:  # If later page fails, continue with what we have
-                        break
-
-            total_end_time = time.time()
-            total_time = total_end_time - total_start_time
-
-            print(f"\n🎉 [DEBUG] Pagination completed!")
-            print(f"📊 [DEBUG] Total pages fetched: {min(page, max_pages)}")
-            print(f"📊 [DEBUG] Total articles extracted: {len(all_extracted_articles)}")
-            print(f"📊 [DEBUG] Total time: {total_time:.2f} seconds")
-
-            return all_extracted_articles if all_extracted_articles else None
-
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"🔥 [DEBUG] Request exception occurred: {e}")
-            return None
\ No newline at end of file
+        except QuotaExceededError as e:
+            print(f"🔥 [DEBUG] {e}")
+
+    def iter_articles(self, **search_params) -> Iterator[ExtractedArticle]:
+        """Sync wrapper of aiter_articles(), each page is fetched on the shared event loop"""
+        return iterate_sync(self.aiter_articles(**search_params))
+
+    async def asearch_articles(self,
+                               query: str = None,
+                               section: str = None,
+                               page_size: int = 2,
+                               from_date : str = None,
+                               show_fields: str = settings.GUARDIAN_SHOW_FIELDS,
+                               order_by: str = None,
+                               max_pages: int = 2,
+                               max_results: int = None,
+                               timeout: float = 30) -> list[ExtractedArticle] | None:
+        """
+        Collect the articles of aiter_articles() into a list
+
+        Returns:
+            Extracted articles, None if nothing could be fetched
+        """
+        print(f"\n📡 [DEBUG] Starting API search for {max_pages} page(s)...")
+        total_start_time = time.time()
+
+        all_extracted_articles = [extracted async for extracted in self.aiter_articles(
+            query=query, section=section, page_size=page_size, from_date=from_date, show_fields=show_fields,
+            order_by=order_by, max_pages=max_pages, max_results=max_results, timeout=timeout)]
+
+        print(f"📊 [DEBUG] Search extracted {len(all_extracted_articles)} articles in {time.time() - total_start_time:.2f} seconds")
+
+        return all_extracted_articles if all_extracted_articles else None
+
+    def search_articles(self, **search_params) -> list[ExtractedArticle] | None:
+        """Sync wrapper of asearch_articles()"""
+        return run_sync(self.asearch_articles(**search_params))
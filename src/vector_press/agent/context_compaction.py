@@ -0,0 +1,160 @@
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, RemoveMessage
+
+from config import settings
+
+
+def estimate_tokens(message: BaseMessage, chars_per_token: float) -> int:
+    """
+    Cheap token estimate for a message (content plus serialized tool call arguments)
+
+    Args:
+        message: Any LangChain message
+        chars_per_token: Average characters per token for the chat model
+
+    Returns:
+        Estimated token count, at least 1 per message to account for role/formatting overhead
+    """
+    text = message.content if isinstance(message.content, str) else str(message.content)
+    tool_calls = getattr(message, 'tool_calls', None)
+    if tool_calls:
+        text += str(tool_calls)
+    return int(len(text) / chars_per_token) + 1
+
+
+class ContextCompactor:
+    """
+    Keeps AgentState['messages'] under a token budget by compacting old tool outputs and dropping old turns
+
+    When the recent turns alone are over budget (e.g. one turn with large tool outputs), their tool outputs are
+    trimmed as well, just enough to fit.
+    """
+
+    def __init__(self,
+                 token_budget: int = settings.CONTEXT_TOKEN_BUDGET,
+                 keep_recent_turns: int = settings.CONTEXT_KEEP_RECENT_TURNS,
+                 chars_per_token: float = settings.CONTEXT_CHARS_PER_TOKEN,
+                 tool_preview_chars: int = settings.CONTEXT_TOOL_PREVIEW_CHARS):
+        """
+        Args:
+            token_budget: Maximum estimated prompt tokens sent to the LLM
+            keep_recent_turns: Number of latest turns (HumanMessage and everything after it) kept verbatim
+            chars_per_token: Characters per token used by the estimator
+            tool_preview_chars: Characters kept from a compacted tool output
+        """
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.chars_per_token = chars_per_token
+        self.tool_preview_chars = tool_preview_chars
+
+    def _split_turns(self, messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+        """Group messages into turns, each starting with a HumanMessage; leading system messages are never part of a turn"""
+        turns = []
+        for message in messages:
+            if isinstance(message, HumanMessage):
+                turns.append([message])
+            elif turns:
+                turns[-1].append(message)
+        return turns
+
+    def _compacted_tool_message(self, message: ToolMessage, keep_chars: int = None, label: str = 'compacted') -> ToolMessage:
+        """
+        Replace a tool output with its first keep_chars characters (default: the preview length)
+
+        id, tool_call_id and artifact (the sources) are kept, so add_messages updates the message in place.
+        """
+        text = message.content if isinstance(message.content, str) else str(message.content)
+        preview = text[:self.tool_preview_chars if keep_chars is None else keep_chars]
+        return ToolMessage(
+            content=f"[{label} {message.name} output, {len(text)} chars] {preview}...",
+            name=message.name,
+            tool_call_id=message.tool_call_id,
+            id=message.id,
+            artifact=message.artifact,
+        )
+
+    def compact_context(self, state) -> dict:
+        """
+        Graph node: returns add_messages updates (replacements and RemoveMessage) that bring the history under budget
+
+        Args:
+            state: Current AgentState
+
+        Returns:
+            Partial state update, empty when the history already fits
+        """
+        messages = state['messages']
+        tokens = [estimate_tokens(message, self.chars_per_token) for message in messages]
+        total = sum(tokens)
+
+        # llm_call appends the pending query as a HumanMessage when the turn starts
+        if not messages or not isinstance(messages[-1], ToolMessage):
+            total += int(len(state.get('query', '')) / self.chars_per_token) + 1
+
+        print(f"🧮 [DEBUG] Context size: ~{total} tokens (budget {self.token_budget})")
+        if total <= self.token_budget:
+            return {}
+
+        token_of = {id(message): count for message, count in zip(messages, tokens)}
+        turns = self._split_turns(messages)
+        old_turns = turns[:-self.keep_recent_turns] if self.keep_recent_turns else turns
+        recent_turns = turns[len(old_turns):]
+
+        updates = []
+
+        # Pass 1: shrink tool outputs of old turns, oldest first
+        for turn in old_turns:
+            for message in turn:
+                if total <= self.token_budget:
+                    break
+                if isinstance(message, ToolMessage) and not str(message.content).startswith("[compacted"):
+                    compacted = self._compacted_tool_message(message)
+                    compacted_tokens = estimate_tokens(compacted, self.chars_per_token)
+                    total -= token_of[id(message)] - compacted_tokens
+                    token_of[id(message)] = compacted_tokens
+                    updates.append(compacted)
+
+        # Pass 2: drop whole old turns so tool calls and their ToolMessages never get separated
+        dropped = 0
+        for turn in old_turns:
+            if total <= self.token_budget:
+                break
+            for message in turn:
+                updates.append(RemoveMessage(id=message.id))
+                total -= token_of[id(message)]
+            dropped += 1
+
+        # Pass 3: older turns are exhausted, trim the tool outputs of the recent turns (oldest turn first), within a
+        # turn in proportion to their size and never below the preview length
+        trimmed = 0
+        for turn in recent_turns:
+            if total <= self.token_budget:
+                break
+            sizes = {id(message): len(str(message.content)) for message in turn
+                     if isinstance(message, ToolMessage) and len(str(message.content)) > self.tool_preview_chars}
+            turn_chars = sum(sizes.values())
+            excess_chars = (total - self.token_budget) * self.chars_per_token
+            for message in turn:
+                if id(message) not in sizes:
+                    continue
+                size = sizes[id(message)]
+                header_chars = len(f"[trimmed {message.name} output, {size} chars] ...")
+                keep_chars = max(self.tool_preview_chars, int(size - excess_chars * size / turn_chars) - header_chars)
+                shortened = self._compacted_tool_message(message, keep_chars, label='trimmed')
+                shortened_tokens = estimate_tokens(shortened, self.chars_per_token)
+                if shortened_tokens >= token_of[id(message)]:
+                    continue
+                total -= token_of[id(message)] - shortened_tokens
+                token_of[id(message)] = shortened_tokens
+                updates.append(shortened)
+                trimmed += 1
+
+        # Replacements for messages that were removed afterwards are pointless
+        removed_ids = {update.id for update in updates if isinstance(update, RemoveMessage)}
+        updates = [update for update in updates if isinstance(update, RemoveMessage) or update.id not in removed_ids]
+
+        print(f"🧮 [DEBUG] Compacted context to ~{total} tokens ({dropped} old turn(s) dropped, "
+              f"{trimmed} recent tool output(s) trimmed)")
+        if total > self.token_budget:
+            print(f"⚠️ [DEBUG] Recent turns alone exceed the token budget of {self.token_budget}")
+
+        return {'messages': updates}
@@ -0,0 +1,130 @@
+import numpy as np
+
+from config import settings
+
+from vector_press.db.embedded_chunks import CHUNK_SIZE, CHUNK_OVERLAP
+
+CHUNK_STEP = CHUNK_SIZE - CHUNK_OVERLAP  # chunk n starts at n * CHUNK_STEP in its article
+
+
+def _overlap(previous_content: str) -> int:
+    """Characters the chunk after previous_content repeats from it (less than CHUNK_OVERLAP for a short last chunk)"""
+    return max(0, len(previous_content) - CHUNK_STEP)
+
+
+class ContextPacker:
+    """
+    Turns retrieved chunks into a compact prompt context
+
+    Candidates are picked by maximal marginal relevance (query similarity against similarity to the chunks already
+    picked) until the token budget is full, then consecutive chunk_numbers of one article are stitched into a single
+    passage with the repeated overlap removed.
+    """
+
+    def __init__(self,
+                 token_budget: int = settings.CONTEXT_PACKING_TOKEN_BUDGET,
+                 mmr_lambda: float = settings.CONTEXT_PACKING_MMR_LAMBDA,
+                 chars_per_token: float = settings.CONTEXT_CHARS_PER_TOKEN):
+        """
+        Args:
+            token_budget: Maximum estimated tokens of the packed passages
+            mmr_lambda: 1.0 ranks by relevance only, lower values favor diversity
+            chars_per_token: Characters per token used by the estimator
+        """
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.chars_per_token = chars_per_token
+
+    def _mmr_order(self, chunks: list[dict]) -> list[int]:
+        """Indices of chunks in maximal marginal relevance order"""
+        relevance = np.array([chunk['similarity'] for chunk in chunks], dtype=np.float32)
+        if any(chunk.get('embedding') is None for chunk in chunks):
+            return np.argsort(-relevance, kind='stable').tolist()
+
+        embeddings = np.stack([chunk['embedding'] for chunk in chunks]).astype(np.float32, copy=False)
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        pairwise = embeddings @ embeddings.T
+
+        order = []
+        max_similarity = np.full(len(chunks), -np.inf, dtype=np.float32)
+        available = np.ones(len(chunks), dtype=bool)
+        for _ in range(len(chunks)):
+            redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+            scores = np.where(available, self.mmr_lambda * relevance - (1 - self.mmr_lambda) * redundancy, -np.inf)
+            picked = int(np.argmax(scores))
+            order.append(picked)
+            available[picked] = False
+            max_similarity = np.maximum(max_similarity, pairwise[:, picked])
+        return order
+
+    def _stitch(self, selected: list[dict]) -> list[dict]:
+        """Merge runs of consecutive chunk_numbers per article, dropping the overlap each chunk repeats"""
+        by_article: dict[str, list[dict]] = {}
+        for chunk in selected:
+            by_article.setdefault(chunk['article_id'], []).append(chunk)
+
+        passages = []
+        for article_chunks in by_article.values():
+            article_chunks.sort(key=lambda chunk: chunk['chunk_number'])
+            run = [article_chunks[0]]
+            for chunk in article_chunks[1:] + [None]:
+                if chunk is not None and chunk['chunk_number'] == run[-1]['chunk_number'] + 1:
+                    run.append(chunk)
+                    continue
+
+                content = run[0]['content']
+                for previous, following in zip(run, run[1:]):
+                    content += following['content'][_overlap(previous['content']):]
+                passages.append({
+                    **{key: run[0][key] for key in ('article_id', 'title', 'url', 'section', 'publication_date')},
+                    'chunk_numbers': [part['chunk_number'] for part in run],
+                    'content': content,
+                    'similarity': max(part['similarity'] for part in run),
+                })
+                run = [chunk]
+
+        passages.sort(key=lambda passage: passage['similarity'], reverse=True)
+        return passages
+
+    def pack(self, chunks: list[dict]) -> list[dict]:
+        """
+        Select and stitch chunks within the token budget
+
+        Args:
+            chunks: Rows from retrieve_relevant_chunks(), with 'chunk_number' and ideally 'embedding'
+
+        Returns:
+            Passages with article metadata, 'chunk_numbers', stitched 'content' and best 'similarity', best first
+        """
+        if not chunks:
+            return []
+
+        selected, used_chars = [], 0
+        selected_keys: dict[tuple[str, int], dict] = {}
+        budget_chars = self.token_budget * self.chars_per_token
+
+        for index in self._mmr_order(chunks):
+            chunk = chunks[index]
+            key = (chunk['article_id'], chunk['chunk_number'])
+            if key in selected_keys:
+                continue
+
+            # A neighbour that is already selected absorbs the shared overlap
+            cost = len(chunk['content'])
+            previous = selected_keys.get((chunk['article_id'], chunk['chunk_number'] - 1))
+            if previous is not None:
+                cost -= min(cost, _overlap(previous['content']))
+            if (chunk['article_id'], chunk['chunk_number'] + 1) in selected_keys:
+                cost -= min(cost, _overlap(chunk['content']))
+
+            if used_chars + cost > budget_chars:
+                continue
+            used_chars += cost
+            selected.append(chunk)
+            selected_keys[key] = chunk
+
+        passages = self._stitch(selected)
+        raw_chars = sum(len(chunk['content']) for chunk in chunks)
+        print(f"📦 [DEBUG] Packed {len(selected)}/{len(chunks)} chunks into {len(passages)} passage(s), "
+              f"~{int(used_chars / self.chars_per_token)} tokens (candidates ~{int(raw_chars / self.chars_per_token)})")
+        return passages
@@ -0,0 +1,336 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout, nullcontext
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+import threading
+import asyncio
+import random
+import json
+import uuid
+import time
+import gc
+import os
+import sys
+
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from config import settings
+
+from vector_press.agent.agent import VectorPressAgent, build_graph, create_initial_state
+from vector_press.agent.api_clients import extract_article_text
+from vector_press.agent.request_scheduler import RequestScheduler
+from vector_press.agent.tool_cache import ToolResultCache
+from vector_press.event_loop import run_sync
+
+NEWS_TOPICS = ['climate policy', 'premier league', 'interest rates', 'AI regulation', 'elections', 'housing market',
+               'energy prices', 'space exploration', 'public health', 'tech layoffs']
+WEB_TOPICS = ['python asyncio', 'index funds', 'sourdough starter', 'postgres vacuum', 'marathon training']
+
+
+def _query(session_index: int, turn: int) -> str:
+    """Turn queries of a synthetic conversation: news questions, web questions and both at once"""
+    news = NEWS_TOPICS[(session_index + turn) % len(NEWS_TOPICS)]
+    web = WEB_TOPICS[(session_index * 3 + turn) % len(WEB_TOPICS)]
+    kind = (session_index + 2 * turn) % 3
+    if kind == 0:
+        return f"latest news on {news}"
+    if kind == 1:
+        return f"how does {web} work"
+    return f"news on {news} and {web}"
+
+
+class _Backend:
+    """Latency model and call counter shared by the stubs"""
+
+    def __init__(self, latency: float, jitter: float, seed: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            return max(0.0, self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+
+
+class StubChatModel(_Backend):
+    """
+    Tool-calling chat model stand-in
+
+    A new question gets a tool call (Guardian for 'news', Tavily otherwise, both for mixed questions), tool results
+    get a final answer. Every tool call it requests is counted by name, so the report doesn't depend on what
+    context compaction keeps in the final states.
+    """
+
+    def __init__(self, latency: float, jitter: float, seed: int):
+        super().__init__(latency, jitter, seed)
+        self.tool_calls: Counter = Counter()
+
+    def bind_tools(self, tools):
+        return self
+
+    def _respond(self, messages) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            results = [message for message in messages[-3:] if isinstance(message, ToolMessage)]
+            return AIMessage(content=f"Answer built from {len(results)} tool result(s) "
+                                     f"({sum(len(str(message.content)) for message in results)} chars)")
+
+        query = str(last.content)
+        tool_calls = []
+        if 'news' in query:
+            tool_calls.append({'name': 'search_guardian_articles', 'args': {'query': query[:50]},
+                               'id': uuid.uuid4().hex, 'type': 'tool_call'})
+        if 'news' not in query or ' and ' in query:
+            tool_calls.append({'name': 'tavily_web_search', 'args': {'query': query[:50]},
+                               'id': uuid.uuid4().hex, 'type': 'tool_call'})
+        with self._lock:
+            self.tool_calls.update(tool_call['name'] for tool_call in tool_calls)
+        return AIMessage(content='', tool_calls=tool_calls)
+
+    async def ainvoke(self, messages) -> AIMessage:
+        await asyncio.sleep(self._delay())
+        return self._respond(messages)
+
+
+class StubLLMManager:
+    """LLMManager stand-in handing out a StubChatModel"""
+
+    def __init__(self, llm: StubChatModel):
+        self.llm = llm
+
+    def get_llm(self):
+        return self.llm
+
+    def get_stage_llm(self, stage: str):
+        return self.llm
+
+
+class StubAsyncTavilyClient(_Backend):
+    """AsyncTavilyClient stand-in"""
+
+    def _results(self, query: str, max_results: int) -> Dict:
+        return {'results': [{'title': f"{query} ({i})", 'url': f"https://example.com/{uuid.uuid4().hex}",
+                             'content': f"Web result {i} about {query}. " * 20, 'published_date': None}
+                            for i in range(max_results)]}
+
+    async def search(self, query: str, max_results: int = 5, topic: str = 'general', timeout: float = 60) -> Dict:
+        await asyncio.sleep(self._delay())
+        return self._results(query, max_results)
+
+
+class StubGuardianClient(_Backend):
+    """GuardianAPIClient stand-in, articles go through the real extract_article_text()"""
+
+    def _articles(self, query: str, section: str | None, page_size: int) -> List[Dict]:
+        now = datetime.now().astimezone().isoformat()
+        raw_articles = [{
+            'id': f"loadtest/{uuid.uuid4().hex}",
+            'webTitle': f"{query.title()} report {i}",
+            'webUrl': f"https://www.theguardian.com/loadtest/{i}",
+            'webPublicationDate': now,
+            'sectionId': section or 'world',
+            'fields': {'bodyText': f"Reporting on {query}. " * 150},
+        } for i in range(page_size)]
+        return [article for article in map(extract_article_text, raw_articles) if article]
+
+    async def asearch_articles(self, query: str = None, section: str = None, max_pages: int = 1, page_size: int = 2,
+                               order_by: str = None, **kwargs) -> List[Dict]:
+        await asyncio.sleep(self._delay())
+        return self._articles(query, section, page_size)
+
+
+def _rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class AgentLoadTest:
+    """
+    Concurrent-session load generator for the agent graph
+
+    Builds the same graph as agent.main() / streamlit_interface.initialize_components() with stub LLM, Tavily and
+    Guardian backends of configurable latency (no vector store or answer cache), then drives sessions multi-turn
+    conversations at once: as asyncio tasks with app.ainvoke() like the terminal chat, or as one thread per session
+    handing its turns to the shared event loop with run_sync() like the Streamlit script threads. Both modes wait
+    for a run slot (asyncio.Semaphore) per turn.
+    """
+
+    def __init__(self,
+                 sessions: int = 20,
+                 turns: int = 3,
+                 mode: str = 'async',
+                 llm_latency: float = 0.8,
+                 tavily_latency: float = 0.6,
+                 guardian_latency: float = 0.9,
+                 jitter: float = 0.25,
+                 max_concurrent_runs: int = settings.MAX_CONCURRENT_AGENT_RUNS,
+                 quiet: bool = True,
+                 seed: int = 0):
+        """
+        Args:
+            sessions: Concurrent conversations
+            turns: Questions per conversation
+            mode: 'async' (ainvoke from asyncio tasks) or 'threads' (ainvoke via run_sync, one thread per session)
+            llm_latency: Mean seconds per LLM call
+            tavily_latency: Mean seconds per Tavily search
+            guardian_latency: Mean seconds per Guardian search
+            jitter: Relative latency spread, 0.25 = +-25%
+            max_concurrent_runs: Graph runs allowed at once, 0 for unlimited (queueing counts as turn latency)
+            quiet: Silence the agent's debug prints during the run
+            seed: Seed of the latency jitter
+        """
+        if mode not in ('async', 'threads'):
+            raise ValueError(f"Unknown mode {mode!r}, expected 'async' or 'threads'")
+        self.sessions = sessions
+        self.turns = turns
+        self.mode = mode
+        self.max_concurrent_runs = max_concurrent_runs
+        self.quiet = quiet
+
+        self.llm = StubChatModel(llm_latency, jitter, seed)
+        self.tavily = StubAsyncTavilyClient(tavily_latency, jitter, seed + 1)
+        self.guardian = StubGuardianClient(guardian_latency, jitter, seed + 3)
+
+    def _build_app(self):
+        agent = VectorPressAgent(
+            StubLLMManager(self.llm),
+            tool_cache=ToolResultCache(ttls={}, max_entries=settings.TOOL_CACHE_MAX_ENTRIES),
+            async_tavily_client=self.tavily,
+            tavily_scheduler=RequestScheduler('tavily-stub', rate_per_second=1e9, burst=1_000_000),
+            guardian_client=self.guardian,
+        )
+        return agent, build_graph(agent)
+
+    async def _arun_turn(self, app, state: Dict, run_slots: asyncio.Semaphore | None) -> Dict:
+        async with run_slots or nullcontext():
+            return await app.ainvoke(state)
+
+    async def _arun_session(self, app, session_index: int, run_slots: asyncio.Semaphore | None,
+                            latencies: List[float]) -> Dict:
+        state = create_initial_state()
+        for turn in range(self.turns):
+            state['query'] = _query(session_index, turn)
+            start_time = time.perf_counter()
+            state = await self._arun_turn(app, state, run_slots)
+            latencies.append(time.perf_counter() - start_time)
+        return state
+
+    def _run_session(self, app, session_index: int, run_slots: asyncio.Semaphore | None,
+                     latencies: List[float]) -> Dict:
+        state = create_initial_state()
+        for turn in range(self.turns):
+            state['query'] = _query(session_index, turn)
+            start_time = time.perf_counter()
+            state = run_sync(self._arun_turn(app, state, run_slots))
+            latencies.append(time.perf_counter() - start_time)
+        return state
+
+    def _drive(self, app, latencies: List[float]) -> List[Dict]:
+        run_slots = asyncio.Semaphore(self.max_concurrent_runs) if self.max_concurrent_runs else None
+        if self.mode == 'threads':
+            with ThreadPoolExecutor(max_workers=self.sessions, thread_name_prefix='vector-press-session') as executor:
+                futures = [executor.submit(self._run_session, app, i, run_slots, latencies) for i in range(self.sessions)]
+                return [future.result() for future in futures]
+
+        async def drive_all():
+            return await asyncio.gather(*(self._arun_session(app, i, run_slots, latencies) for i in range(self.sessions)))
+        return asyncio.run(drive_all())
+
+    def run(self) -> Dict:
+        """
+        Run every session to completion
+
+        Returns:
+            Report with throughput, turn latency percentiles (seconds), memory growth and call counts
+        """
+        agent, app = self._build_app()
+        latencies: List[float] = []
+
+        gc.collect()
+        rss_before = _rss_bytes()
+        start_time = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull) if self.quiet else nullcontext():
+            states = self._drive(app, latencies)
+        duration = time.perf_counter() - start_time
+        gc.collect()
+        rss_after = _rss_bytes()  # every session's state is still referenced here
+
+        latency_array = np.array(latencies) if latencies else np.zeros(1)
+        report = {
+            'mode': self.mode,
+            'sessions': self.sessions,
+            'turns_per_session': self.turns,
+            'max_concurrent_runs': self.max_concurrent_runs,
+            'turns_completed': len(latencies),
+            'duration_seconds': round(duration, 3),
+            'throughput_turns_per_second': round(len(latencies) / duration, 3) if duration else 0.0,
+            'latency_seconds': {
+                'mean': round(float(latency_array.mean()), 3),
+                'p50': round(float(np.percentile(latency_array, 50)), 3),
+                'p95': round(float(np.percentile(latency_array, 95)), 3),
+                'p99': round(float(np.percentile(latency_array, 99)), 3),
+                'max': round(float(latency_array.max()), 3),
+            },
+            'rss_growth_bytes': rss_after - rss_before,
+            'rss_growth_per_session_bytes': (rss_after - rss_before) // max(1, self.sessions),
+            'messages_per_session': round(sum(len(state['messages']) for state in states) / max(1, len(states)), 1),
+            'llm_calls': self.llm.calls,
+            'llm_stages': agent.router.latency_stats(),
+            'tool_calls': dict(self.llm.tool_calls),
+            'backend_calls': {'tavily': self.tavily.calls, 'guardian': self.guardian.calls},
+            'tool_cache': {'hits': agent.tool_cache.hits, 'misses': agent.tool_cache.misses},
+        }
+        return report
+
+
+def _write_report(report: Dict) -> str:
+    directory = os.path.join(settings.OUTPUT, 'load_tests')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S}-{report['mode']}-{report['sessions']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def main():
+    """Usage: python load_test.py [sessions] [turns] [--threads] [--verbose]"""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if any(not arg.isdigit() for arg in args):
+        print(main.__doc__)
+        return
+
+    load_test = AgentLoadTest(sessions=int(args[0]) if args else 20,
+                              turns=int(args[1]) if len(args) > 1 else 3,
+                              mode='threads' if "--threads" in sys.argv else 'async',
+                              quiet="--verbose" not in sys.argv)
+    print(f"🏁 Load test: {load_test.sessions} sessions x {load_test.turns} turns ({load_test.mode}, "
+          f"{load_test.max_concurrent_runs or 'unlimited'} concurrent runs)")
+    report = load_test.run()
+
+    latency = report['latency_seconds']
+    print(f"📊 Throughput: {report['throughput_turns_per_second']:.2f} turns/s "
+          f"({report['turns_completed']} turns in {report['duration_seconds']:.1f}s)")
+    print(f"📊 Turn latency: p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s, p99 {latency['p99']:.2f}s, "
+          f"max {latency['max']:.2f}s")
+    print(f"📊 Memory: +{report['rss_growth_bytes'] / 1024**2:.1f} MB RSS, "
+          f"{report['rss_growth_per_session_bytes'] / 1024:.0f} KB per session")
+    print(f"📊 Calls: {report['llm_calls']} LLM, tools {report['tool_calls']}, backends {report['backend_calls']}")
+    print(f"📊 Tool cache: {report['tool_cache']['hits']} hits, {report['tool_cache']['misses']} misses")
+    for stage, stats in report['llm_stages'].items():
+        if stats['calls']:
+            print(f"📊 LLM {stage}: {stats['calls']} calls, p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s")
+    print(f"💾 Report written to {_write_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from collections import deque
+from typing import Dict
+import threading
+import time
+import re
+
+import numpy as np
+
+from config import settings
+
+STAGES = ('tool_selection', 'synthesis', 'conversation')
+
+# Whole inputs that need no tool: greetings, thanks, acknowledgements and questions about the assistant itself
+# Bare yes/no/ok/sure are left out, they usually answer a question of the assistant ("Want the latest articles?")
+CONVERSATIONAL_PATTERN = re.compile(
+    r"(hi|hello|hey|yo|hiya|howdy|good (morning|afternoon|evening|night)|thanks?( you)?( (so|very) much)?|thx|ty|"
+    r"cheers|cool|great|nice|perfect|got it|bye|goodbye|see you|how are you( doing)?|"
+    r"who are you|what('s| is) your name|what can you do)"
+    r"( (big brother|there|again|mate))?"
+)
+
+
+def is_conversational(text: str) -> bool:
+    """True for small talk that is answered without tools, e.g. 'hi', 'thanks!' or 'who are you?'"""
+    normalized = " ".join(re.sub(r"[^\w\s']", " ", text.casefold()).split())
+    return bool(normalized) and CONVERSATIONAL_PATTERN.fullmatch(normalized) is not None
+
+
+def _asked_question(messages: list[BaseMessage]) -> bool:
+    """True when the latest AI answer asks the user something, so a short reply may need tools"""
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            return '?' in str(message.content)
+    return False
+
+
+class ModelRouter:
+    """
+    Picks the chat model of every LLM call in the agent loop and records per-stage latency
+
+    - tool_selection: first call of a turn, decides on tool calls (small, fast model)
+    - synthesis: calls after tool results, writes the answer (stronger model, tools stay bound for follow-ups)
+    - conversation: small talk (see is_conversational()), answered without tools and without a tool-selection call,
+      unless the previous answer asked the user a question
+
+    A turn that needs tools costs one small and one strong call instead of two strong ones. Models come from
+    LLMManager.get_stage_llm(), so a stage without its own model uses the default LLM.
+    """
+
+    def __init__(self, llm_manager, tools: list,
+                 short_circuit: bool = settings.CONVERSATIONAL_SHORT_CIRCUIT,
+                 latency_window: int = settings.STAGE_LATENCY_WINDOW):
+        """
+        Args:
+            llm_manager: LLMManager (or a stand-in with get_stage_llm)
+            tools: Tools bound to the tool selection and synthesis models
+            short_circuit: Route conversational inputs to the conversation stage
+            latency_window: Latest calls per stage kept for the latency percentiles
+        """
+        self.short_circuit = short_circuit
+        self.stage_models = {stage: llm_manager.get_stage_llm(stage) for stage in STAGES}
+        self._runnables = {
+            'tool_selection': self.stage_models['tool_selection'].bind_tools(tools=tools),
+            'synthesis': self.stage_models['synthesis'].bind_tools(tools=tools),
+            'conversation': self.stage_models['conversation'],
+        }
+        self._latencies = {stage: deque(maxlen=latency_window) for stage in STAGES}
+        self._calls = dict.fromkeys(STAGES, 0)
+        self._lock = threading.Lock()
+
+    def stage_for(self, messages: list[BaseMessage], query: str) -> str:
+        """Stage of the next LLM call for the conversation so far"""
+        if messages and isinstance(messages[-1], ToolMessage):
+            return 'synthesis'
+        if self.short_circuit and is_conversational(query) and not _asked_question(messages):
+            return 'conversation'
+        return 'tool_selection'
+
+    def _record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies[stage].append(seconds)
+            self._calls[stage] += 1
+
+    async def ainvoke(self, stage: str, messages: list[BaseMessage]):
+        start_time = time.perf_counter()
+        try:
+            return await self._runnables[stage].ainvoke(messages)
+        finally:
+            self._record(stage, time.perf_counter() - start_time)
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        """
+        Per-stage model and latency (seconds) over the latest calls, for tuning the stage settings
+
+        Returns:
+            {stage: {'model', 'calls', 'mean', 'p50', 'p95', 'max'}}, latencies are None for stages without calls
+        """
+        with self._lock:
+            snapshot = {stage: (self._calls[stage], np.array(self._latencies[stage])) for stage in STAGES}
+
+        stats = {}
+        for stage, (calls, latencies) in snapshot.items():
+            model = self.stage_models[stage]
+            stats[stage] = {
+                'model': getattr(model, 'model', None) or getattr(model, 'model_name', None) or type(model).__name__,
+                'calls': calls,
+                'mean': None, 'p50': None, 'p95': None, 'max': None,
+            }
+            if latencies.size:
+                stats[stage].update({
+                    'mean': round(float(latencies.mean()), 3),
+                    'p50': round(float(np.percentile(latencies, 50)), 3),
+                    'p95': round(float(np.percentile(latencies, 95)), 3),
+                    'max': round(float(latencies.max()), 3),
+                })
+        return stats
@@ -0,0 +1,238 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+from enum import IntEnum
+import threading
+import hashlib
+import asyncio
+import bisect
+import random
+import time
+
+import httpx
+
+from config import settings
+
+
+class Priority(IntEnum):
+    """Scheduling lane, lower values are served first"""
+    INTERACTIVE = 0  # agent tool calls, a user is waiting
+    BATCH = 1        # ingestion / backfill
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when the daily request quota of an API key is used up"""
+
+
+# Responses worth retrying: throttled or transient server errors
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), None if absent or invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Rate-limit errors raised by SDK clients that hide the response (e.g. Tavily)"""
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message or 'too many requests' in message
+
+
+def _is_retryable_error(error: Exception) -> bool:
+    """Connection problems, timeouts and rate-limit errors"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    return _is_rate_limit_error(error)
+
+
+class RequestScheduler:
+    """
+    Thread- and asyncio-safe request scheduler for one API key
+
+    Requests take a token from a token bucket (steady rate + burst), count against a daily quota and are retried on
+    429/5xx responses and transient errors with exponential backoff and full jitter. A Retry-After header (capped at
+    backoff_max) pauses the whole bucket, so concurrent callers don't keep hitting a throttled key. The daily quota is
+    counted in memory, per process: other processes using the same key and restarts are not accounted for. Waiting requests are served by priority
+    lane first and arrival order second, so interactive calls overtake queued batch calls.
+    """
+
+    def __init__(self, name: str,
+                 rate_per_second: float,
+                 burst: int = 1,
+                 daily_quota: int = 0,
+                 max_retries: int = settings.REQUEST_MAX_RETRIES,
+                 backoff_base: float = settings.REQUEST_BACKOFF_BASE,
+                 backoff_max: float = settings.REQUEST_BACKOFF_MAX):
+        """
+        Args:
+            name: API name used in log lines
+            rate_per_second: Sustained request rate
+            burst: Bucket capacity, requests allowed back to back after an idle period
+            daily_quota: Requests per UTC day from this process, 0 for unlimited
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff ceiling in seconds, doubled per retry
+            backoff_max: Upper bound of a single backoff, including Retry-After pauses
+        """
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.daily_quota = daily_quota
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._quota_day = datetime.now(timezone.utc).date()
+        self._quota_used = 0
+
+        self._waiting: list[tuple[int, int]] = []  # sorted (priority, ticket) of callers waiting for a token
+        self._next_ticket = 0
+        self._lock = threading.Lock()
+
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0}
+
+    def _enqueue(self, priority: Priority) -> tuple[int, int]:
+        with self._lock:
+            waiter = (int(priority), self._next_ticket)
+            self._next_ticket += 1
+            bisect.insort(self._waiting, waiter)
+            return waiter
+
+    def _dequeue(self, waiter: tuple[int, int]) -> None:
+        with self._lock:
+            index = bisect.bisect_left(self._waiting, waiter)
+            if index < len(self._waiting) and self._waiting[index] == waiter:
+                del self._waiting[index]
+
+    def _try_acquire(self, waiter: tuple[int, int]) -> float:
+        """Take a token for waiter if it is first in line, otherwise return the seconds to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+            self._refilled_at = now
+
+            today = datetime.now(timezone.utc).date()
+            if today != self._quota_day:
+                self._quota_day, self._quota_used = today, 0
+            if self.daily_quota and self._quota_used >= self.daily_quota:
+                raise QuotaExceededError(f"{self.name} daily quota of {self.daily_quota} requests is used up")
+
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            token_wait = max(0.0, (1.0 - self._tokens) / self.rate_per_second)
+            if self._waiting[0] != waiter:
+                # Someone with a better lane (or an earlier ticket) goes first
+                return max(token_wait, 0.005)
+            if self._tokens < 1.0:
+                return token_wait
+
+            self._tokens -= 1.0
+            self._quota_used += 1
+            self.stats['requests'] += 1
+            del self._waiting[0]
+            return 0.0
+
+    async def aacquire(self, priority: Priority = Priority.BATCH) -> None:
+        """Wait without blocking the event loop until a request may be sent, raises QuotaExceededError when the daily quota is used up"""
+        waiter = self._enqueue(priority)
+        try:
+            while (wait := self._try_acquire(waiter)) > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._dequeue(waiter)
+            raise
+
+    def _retry_delay(self, attempt: int, response: Any = None) -> float:
+        """Backoff before the next attempt; a Retry-After header wins (up to backoff_max) and pauses every caller of this key"""
+        retry_after = _parse_retry_after(getattr(response, 'headers', {}).get('Retry-After')) if response is not None else None
+        if retry_after is not None:
+            # A daily-quota 429 can ask for hours, never hold a caller longer than one backoff
+            retry_after = min(retry_after, self.backoff_max)
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _should_retry(self, attempt: int, response: Any = None, error: Exception = None) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if error is not None:
+            return _is_retryable_error(error)
+        return getattr(response, 'status_code', None) in RETRYABLE_STATUS
+
+    def _log_retry(self, attempt: int, delay: float, response: Any = None, error: Exception = None) -> None:
+        status = getattr(response, 'status_code', None)
+        with self._lock:
+            if status == 429 or (error is not None and _is_rate_limit_error(error)):
+                self.stats['throttled'] += 1
+            self.stats['retries'] += 1
+        reason = f"status {status}" if error is None else f"{type(error).__name__}: {error}"
+        print(f"⏳ [DEBUG] {self.name} request failed ({reason}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+
+    async def acall(self, arequest: Callable[[], Awaitable[Any]], priority: Priority = Priority.BATCH) -> Any:
+        """
+        Send a request through the scheduler
+
+        Args:
+            arequest: Coroutine function performing one attempt, returns a response (with status_code/headers) or raises
+            priority: Scheduling lane
+
+        Returns:
+            The response of the last attempt, which may still be a retryable status once retries are exhausted
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.aacquire(priority)
+            try:
+                response = await arequest()
+            except Exception as e:
+                if not self._should_retry(attempt, error=e):
+                    raise
+                delay = self._retry_delay(attempt)
+                self._log_retry(attempt, delay, error=e)
+            else:
+                if not self._should_retry(attempt, response=response):
+                    return response
+                delay = self._retry_delay(attempt, response)
+                self._log_retry(attempt, delay, response=response)
+            await asyncio.sleep(delay)
+
+
+_schedulers: dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(api_name: str, api_key: str) -> RequestScheduler:
+    """
+    Process-wide scheduler of an API key, shared by every client, agent and ingestion run using that key
+
+    Args:
+        api_name: 'guardian' or 'tavily', selects the limits from settings
+        api_key: Key the limits apply to
+    """
+    key = f"{api_name}:{hashlib.sha1(api_key.encode('utf-8')).hexdigest()}"
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            if api_name == 'guardian':
+                scheduler = RequestScheduler('Guardian', settings.GUARDIAN_RATE_PER_SECOND, settings.GUARDIAN_BURST,
+                                             settings.GUARDIAN_DAILY_QUOTA)
+            elif api_name == 'tavily':
+                scheduler = RequestScheduler('Tavily', settings.TAVILY_RATE_PER_SECOND, settings.TAVILY_BURST,
+                                             settings.TAVILY_DAILY_QUOTA)
+            else:
+                raise ValueError(f"Unknown API: {api_name}")
+            _schedulers[key] = scheduler
+        return scheduler
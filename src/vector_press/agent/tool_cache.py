@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable
+import threading
+import asyncio
+import json
+import time
+
+from pydantic import BaseModel
+
+from config import settings
+
+
+def normalize_request(tool_name: str, validation: BaseModel) -> str:
+    """
+    Build a stable cache key from a validated tool request
+
+    Args:
+        tool_name: Name of the tool the request belongs to
+        validation: Validated pydantic request (GuardianSearchRequest, TavilySearchRequest)
+
+    Returns:
+        Canonical JSON string, identical for requests that only differ in query casing/whitespace
+    """
+    # Every declared field, including those excluded from model_dump() (e.g. TavilySearchRequest.topic)
+    payload = {name: getattr(validation, name) for name in type(validation).model_fields}
+    if isinstance(payload.get('query'), str):
+        payload['query'] = " ".join(payload['query'].split()).casefold()
+
+    return json.dumps({'tool': tool_name, 'args': payload}, sort_keys=True, default=str)
+
+
+class ToolResultCache:
+    """Thread-safe TTL + LRU cache for tool results with in-flight de-duplication"""
+
+    def __init__(self, ttls: dict[str, float], max_entries: int = 256, default_ttl: float = 300.0):
+        """
+        Args:
+            ttls: Time-to-live in seconds per tool name
+            max_entries: Upper bound on cached results, least recently used entries are evicted first
+            default_ttl: TTL used for tools without an explicit entry in ttls
+        """
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()  # key -> (expires_at, result)
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _claim(self, tool_name: str, key: str) -> tuple[bool, Any, Future | None, bool]:
+        """
+        Look up key and register an in-flight computation on a miss
+
+        Returns:
+            (hit, cached_result, in_flight_future, owner) - owner is True when the caller must compute the result
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    print(f"⚡ [DEBUG] Tool cache hit for {tool_name}")
+                    return True, result, None, False
+                del self._entries[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                print(f"⚡ [DEBUG] Waiting on identical in-flight {tool_name} call")
+                return False, None, in_flight, False
+
+            in_flight = Future()
+            self._in_flight[key] = in_flight
+            self.misses += 1
+            return False, None, in_flight, True
+
+    def _release(self, tool_name: str, key: str, in_flight: Future, result: Any = None, error: BaseException = None) -> None:
+        """Store a computed result (lists only) and wake up every caller waiting on it"""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if error is None and isinstance(result, list):
+                self._entries[key] = (time.monotonic() + self.ttls.get(tool_name, self.default_ttl), result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        if error is not None:
+            in_flight.set_exception(error)
+        else:
+            in_flight.set_result(result)
+
+    async def aget_or_compute(self, tool_name: str, validation: BaseModel, acompute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return a cached result for the request or await acompute() exactly once for concurrent identical requests
+
+        In-flight calls are shared across threads and event loops. Only list results are stored, error strings and
+        None are returned to the caller but never cached.
+        """
+        key = normalize_request(tool_name, validation)
+        hit, result, in_flight, owner = self._claim(tool_name, key)
+        if hit:
+            return result
+        if not owner:
+            # Shielded: a waiter giving up (timeout) must not cancel the call the owner is still running
+            return await asyncio.shield(asyncio.wrap_future(in_flight))
+
+        try:
+            result = await acompute()
+        except asyncio.CancelledError:
+            # The owner's timeout is not the waiters' timeout, they get an ordinary error instead of a cancellation
+            self._release(tool_name, key, in_flight, error=RuntimeError(f"Identical in-flight {tool_name} call was cancelled"))
+            raise
+        except BaseException as e:
+            self._release(tool_name, key, in_flight, error=e)
+            raise
+
+        self._release(tool_name, key, in_flight, result=result)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache, shared by every agent instance (and therefore every Streamlit session)
+shared_tool_cache = ToolResultCache(
+    ttls={
+        'search_guardian_articles': settings.GUARDIAN_CACHE_TTL,
+        'tavily_web_search': settings.TAVILY_CACHE_TTL,
+    },
+    max_entries=settings.TOOL_CACHE_MAX_ENTRIES,
+)
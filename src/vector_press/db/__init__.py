@@ -1,6 +1,25 @@
 # Import classes and functions that are actually needed
 from .supabase_db import SupabaseVectorStore
+from .ingestion_queue import BackgroundIngestionQueue
+from .answer_cache import SemanticAnswerCache
+from .bulk_loader import PostgresBulkLoader
+from .embedding_codec import encode_embedding, decode_embedding
+from .embedded_chunks import EmbeddedChunks
+from .backfill import BackfillPlanner, plan_windows
+from .embedding_versions import EmbeddingVersion, EmbeddingVersionRegistry
+from .reembedding import ReEmbedder
 
 __all__ = [
     'SupabaseVectorStore',
+    'BackgroundIngestionQueue',
+    'SemanticAnswerCache',
+    'PostgresBulkLoader',
+    'encode_embedding',
+    'decode_embedding',
+    'EmbeddedChunks',
+    'BackfillPlanner',
+    'plan_windows',
+    'EmbeddingVersion',
+    'EmbeddingVersionRegistry',
+    'ReEmbedder',
 ]
\ No newline at end of file
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+import threading
+
+from config import settings
+
+from vector_press.event_loop import run_sync
+
+
+class SemanticAnswerCache:
+    """
+    Semantic cache of final agent answers stored in Supabase (answer_cache table)
+
+    A new query is embedded with EmbeddingGemma and matched against earlier queries through the match_answer_cache RPC.
+    Entries expire after a TTL, and the guardian_articles insert trigger deletes every entry citing a section that
+    just received a new article.
+    """
+
+    def __init__(self, vector_store,
+                 similarity_threshold: float = settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+                 ttl_seconds: float = settings.ANSWER_CACHE_TTL):
+        """
+        Args:
+            vector_store: SupabaseVectorStore providing the Supabase clients and the embedding model
+            similarity_threshold: Minimum query-to-query cosine similarity for a hit (0.0 to 1.0)
+            ttl_seconds: Maximum age of a reusable answer
+        """
+        self.vector_store = vector_store
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+
+        # Query embeddings from lookup(), reused by store() so a miss costs a single embedding call
+        self._embeddings: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        print(f"🔧 [DEBUG] Semantic answer cache initialized")
+
+    def _format_query(self, query: str) -> str:
+        # EmbeddingGemma prompt for symmetric query-to-query similarity
+        return f"task: sentence similarity | query: {query}"
+
+    def _remember_embedding(self, query: str, embedding: list[float]) -> None:
+        with self._lock:
+            self._embeddings[query] = embedding
+            self._embeddings.move_to_end(query)
+            while len(self._embeddings) > 256:
+                self._embeddings.popitem(last=False)
+
+    def _pop_embedding(self, query: str) -> list[float] | None:
+        with self._lock:
+            return self._embeddings.pop(query, None)
+
+    def _lookup_params(self, embedding: list[float]) -> dict:
+        return {
+            'query_embedding': embedding,
+            'match_count': 1,
+            'max_age_seconds': int(self.ttl_seconds),
+        }
+
+    def _pick_hit(self, query: str, rows: list[dict]) -> dict | None:
+        if rows and rows[0]['similarity'] >= self.similarity_threshold:
+            print(f"⚡ [DEBUG] Answer cache hit ({rows[0]['similarity']:.4f}) for: {query}")
+            return {'answer': rows[0]['answer'], 'sources': rows[0]['sources'] or []}
+        return None
+
+    def _store_row(self, query: str, answer: str, sources: list[dict], embedding: list[float]) -> dict:
+        return {
+            'query': query,
+            'answer': answer,
+            'sources': sources,
+            'sections': sorted({source['section'] for source in sources if source.get('section')}),
+            'embedding': embedding,
+        }
+
+    async def alookup(self, query: str) -> dict | None:
+        """
+        Find a fresh cached answer for a semantically equivalent query
+
+        Returns:
+            {'answer': str, 'sources': list[dict]} on a hit, None otherwise
+        """
+        try:
+            embedding = await self.vector_store.embedding_model.aembed_query(self._format_query(query))
+            self._remember_embedding(query, embedding)
+
+            supabase = await self.vector_store._get_async_supabase()
+            result = await supabase.rpc('match_answer_cache', self._lookup_params(embedding)).execute()
+            return self._pick_hit(query, result.data)
+
+        except Exception as e:
+            print(f"⚠️ [DEBUG] Answer cache lookup failed: {e}")
+            return None
+
+    def lookup(self, query: str) -> dict | None:
+        """Sync wrapper of alookup()"""
+        return run_sync(self.alookup(query))
+
+    async def astore(self, query: str, answer: str, sources: list[dict]) -> bool:
+        """
+        Store a final answer with the sources it was built from
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            embedding = self._pop_embedding(query) or await self.vector_store.embedding_model.aembed_query(self._format_query(query))
+            supabase = await self.vector_store._get_async_supabase()
+            result = await supabase.table('answer_cache').insert(
+                self._store_row(query, answer, sources, embedding)).execute()
+            return bool(result.data)
+
+        except Exception as e:
+            print(f"⚠️ [DEBUG] Answer cache store failed: {e}")
+            return False
+
+    def store(self, query: str, answer: str, sources: list[dict]) -> bool:
+        """Sync wrapper of astore()"""
+        return run_sync(self.astore(query, answer, sources))
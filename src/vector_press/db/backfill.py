@@ -0,0 +1,240 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+import hashlib
+import shutil
+import math
+import json
+import os
+import re
+import sys
+
+from config import settings
+
+from vector_press.db.ingestion_checkpoint import _read_jsonl_repairing, _write_json_atomic
+
+STAT_KEYS = ('total_fetched', 'total_processed', 'successful', 'failed', 'skipped')
+
+
+def _window(section: str | None, from_date: date, to_date: date) -> Dict:
+    return {
+        'window_id': f"{section or 'all'}_{from_date.isoformat()}_{to_date.isoformat()}",
+        'section': section,
+        'from_date': from_date.isoformat(),
+        'to_date': to_date.isoformat(),
+    }
+
+
+def plan_windows(from_date: str, to_date: str, sections: List[str] = None, window_days: int = 30) -> List[Dict]:
+    """
+    Split an inclusive date range (and optionally a set of sections) into non-overlapping windows
+
+    Args:
+        from_date: First day (YYYY-MM-DD format)
+        to_date: Last day, inclusive (YYYY-MM-DD format)
+        sections: Guardian section ids, None for a single window set over every section
+        window_days: Days per window
+
+    Returns:
+        Windows as {'window_id', 'section', 'from_date', 'to_date'} dicts
+    """
+    start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+    if end < start:
+        raise ValueError(f"to_date {to_date} is before from_date {from_date}")
+
+    windows = []
+    for section in sections or [None]:
+        window_start = start
+        while window_start <= end:
+            window_end = min(end, window_start + timedelta(days=window_days - 1))
+            windows.append(_window(section, window_start, window_end))
+            window_start = window_end + timedelta(days=1)
+    return windows
+
+
+def split_window(window: Dict) -> List[Dict] | None:
+    """Halve a window by date, None for a single-day window"""
+    start, end = date.fromisoformat(window['from_date']), date.fromisoformat(window['to_date'])
+    if start == end:
+        return None
+    middle = start + timedelta(days=(end - start).days // 2)
+    return [_window(window['section'], start, middle), _window(window['section'], middle + timedelta(days=1), end)]
+
+
+class BackfillPlanner:
+    """
+    Historical backfill sharded into from-date/to-date windows that are ingested concurrently
+
+    Every window runs as its own database_uploading() call with its own checkpoint. Before a window is fetched, a
+    one-result request counts its results; windows with more than max_pages_per_window pages are halved by date
+    instead of being paginated deeply. Window splits and completions are recorded under
+    settings.OUTPUT/backfills/<backfill_id>, so an interrupted backfill resumes with only the unfinished windows.
+    """
+
+    def __init__(self, vector_store,
+                 max_workers: int = settings.BACKFILL_MAX_WORKERS,
+                 window_days: int = settings.BACKFILL_WINDOW_DAYS,
+                 max_pages_per_window: int = settings.BACKFILL_MAX_PAGES_PER_WINDOW,
+                 page_size: int = 200,
+                 root_dir: str = None):
+        """
+        Args:
+            vector_store: SupabaseVectorStore that ingests the windows
+            max_workers: Windows ingested at once
+            window_days: Initial window length in days
+            max_pages_per_window: Windows with more result pages are split
+            page_size: Articles per Guardian request (200 is the API maximum)
+            root_dir: Base directory, defaults to settings.OUTPUT/backfills
+        """
+        self.vector_store = vector_store
+        self.max_workers = max_workers
+        self.window_days = window_days
+        self.max_pages_per_window = max_pages_per_window
+        self.page_size = page_size
+        self.root_dir = root_dir or os.path.join(settings.OUTPUT, 'backfills')
+
+    def _run_window(self, window: Dict, query: str, backfill_id: str, resume: bool) -> tuple[str, object]:
+        """
+        Count, split or ingest one window
+
+        Returns:
+            ('split', child windows), ('done', database_uploading stats) or ('failed', reason)
+        """
+        guardian_client = self.vector_store.guardian_client
+        base_params = guardian_client._build_search_params(query=query, section=window['section'],
+                                                           page_size=self.page_size, from_date=window['from_date'],
+                                                           to_date=window['to_date'])
+        total = guardian_client.count_results(base_params)
+        if total is None:
+            return 'failed', "result count failed"
+
+        pages = math.ceil(total / self.page_size)
+        if pages > self.max_pages_per_window:
+            children = split_window(window)
+            if children:
+                return 'split', children
+            print(f"⚠️ [BACKFILL] Single-day window {window['window_id']} has {pages} pages, paginating all of them")
+
+        if total == 0:
+            return 'done', {**{key: 0 for key in STAT_KEYS}, 'completed': True}
+
+        print(f"🧩 [BACKFILL] Window {window['window_id']}: {total} articles in {pages} page(s)")
+        run_id = f"{backfill_id}-{re.sub(r'[^A-Za-z0-9_.-]', '_', window['window_id'])}"
+        stats = self.vector_store.database_uploading(query=query, section=window['section'],
+                                                     from_date=window['from_date'], to_date=window['to_date'],
+                                                     page_size=self.page_size, order_by='oldest', max_pages=pages,
+                                                     resume=resume, run_id=run_id)
+        return 'done', stats
+
+    def run(self, from_date: str, to_date: str, query: str = None, sections: List[str] = None,
+            resume: bool = False, backfill_id: str = None) -> Dict:
+        """
+        Backfill every article of the date range (and sections)
+
+        Args:
+            from_date: First day (YYYY-MM-DD format)
+            to_date: Last day, inclusive (YYYY-MM-DD format)
+            query: Optional search query
+            sections: Guardian section ids, None for every section
+            resume: Continue the unfinished windows of the same backfill instead of starting over
+            backfill_id: Explicit backfill name, defaults to a hash of the parameters
+
+        Returns:
+            Summed window statistics plus window counts
+        """
+        params = {'from_date': from_date, 'to_date': to_date, 'query': query, 'sections': sections,
+                  'window_days': self.window_days, 'max_pages_per_window': self.max_pages_per_window,
+                  'page_size': self.page_size}
+        backfill_id = backfill_id or hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        run_dir = os.path.join(self.root_dir, backfill_id)
+        progress_path = os.path.join(run_dir, 'progress.jsonl')
+
+        if not resume and os.path.isdir(run_dir):
+            shutil.rmtree(run_dir)
+        os.makedirs(run_dir, exist_ok=True)
+
+        windows = {window['window_id']: window for window in plan_windows(from_date, to_date, sections, self.window_days)}
+        finished: set[str] = set()  # completed or split
+        completed_count = 0
+
+        if resume:
+            for event in _read_jsonl_repairing(progress_path):
+                finished.add(event['window_id'])
+                if event.get('into'):
+                    windows.update({child['window_id']: child for child in event['into']})
+                else:
+                    completed_count += 1
+        _write_json_atomic(os.path.join(run_dir, 'backfill.json'), params)
+
+        stats = {key: 0 for key in STAT_KEYS}
+        stats.update({'backfill_id': backfill_id, 'windows_completed': completed_count, 'windows_split': 0,
+                      'windows_failed': 0, 'start_time': datetime.now(), 'end_time': None})
+
+        pending = [window for window_id, window in windows.items() if window_id not in finished]
+        print(f"🧩 [BACKFILL] {backfill_id}: {len(pending)} window(s) to run, {completed_count} already completed, "
+              f"{self.max_workers} worker(s)")
+
+        with open(progress_path, 'a', encoding='utf-8') as progress_file, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='vector-press-backfill') as executor:
+
+            def record(event: Dict) -> None:
+                progress_file.write(json.dumps(event) + '\n')
+                progress_file.flush()
+                os.fsync(progress_file.fileno())
+
+            futures = {executor.submit(self._run_window, window, query, backfill_id, resume): window for window in pending}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window = futures.pop(future)
+                    try:
+                        outcome, result = future.result()
+                    except Exception as e:
+                        outcome, result = 'failed', str(e)
+
+                    if outcome == 'split':
+                        print(f"✂️ [BACKFILL] Split {window['window_id']} into {[child['window_id'] for child in result]}")
+                        record({'window_id': window['window_id'], 'into': result})
+                        stats['windows_split'] += 1
+                        for child in result:
+                            futures[executor.submit(self._run_window, child, query, backfill_id, resume)] = child
+                        continue
+
+                    if outcome == 'done':
+                        for key in STAT_KEYS:
+                            stats[key] += result.get(key, 0)
+                        if result.get('completed'):
+                            record({'window_id': window['window_id'], 'completed': True})
+                            stats['windows_completed'] += 1
+                            continue
+                        result = "window finished with failures"
+
+                    print(f"❌ [BACKFILL] Window {window['window_id']} incomplete ({result}), rerun with resume=True")
+                    stats['windows_failed'] += 1
+
+        stats['end_time'] = datetime.now()
+        duration = (stats['end_time'] - stats['start_time']).total_seconds()
+        print(f"\n📊 [BACKFILL] {backfill_id} finished in {duration:.1f} seconds: {stats['windows_completed']} window(s) "
+              f"completed, {stats['windows_split']} split, {stats['windows_failed']} incomplete, "
+              f"{stats['successful']} article(s) stored")
+        return stats
+
+
+def main():
+    """Usage: python backfill.py FROM_DATE TO_DATE [section,section,...] [--resume]"""
+    from vector_press.llm_embedding_initializer import LLMManager
+    from vector_press.db.supabase_db import SupabaseVectorStore
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) < 2:
+        print(main.__doc__)
+        return
+
+    sections = args[2].split(',') if len(args) > 2 else None
+    planner = BackfillPlanner(SupabaseVectorStore(LLMManager()))
+    stats = planner.run(from_date=args[0], to_date=args[1], sections=sections, resume="--resume" in sys.argv)
+    print(f"📊 Backfill stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from typing import Iterator
+import tracemalloc
+import random
+import sys
+
+import numpy as np
+
+CHUNK_SIZE = 1750
+CHUNK_OVERLAP = 275
+
+
+def chunk_offsets(text_length: int, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> np.ndarray:
+    """
+    (start, end) character offsets of the overlapping chunks of a text
+
+    Returns:
+        int32 array of shape (chunk_count, 2)
+    """
+    starts = np.arange(0, text_length, chunk_size - chunk_overlap, dtype=np.int32)
+    return np.stack([starts, np.minimum(starts + chunk_size, text_length)], axis=1)
+
+
+class EmbeddedChunks:
+    """
+    Chunks of one article with their embeddings, without a Python object per chunk
+
+    Chunk texts are (start, end) offsets into the article text and embeddings are rows of a float32 matrix, usually
+    a view into the matrix of a whole embedding mega-batch. Strings and wire encodings are only produced by
+    content() / iteration at the I/O edge.
+    """
+
+    __slots__ = ('text', 'offsets', 'embeddings')
+
+    def __init__(self, text: str, offsets: np.ndarray, embeddings: np.ndarray):
+        """
+        Args:
+            text: Article text the offsets point into
+            offsets: int32 array of shape (chunk_count, 2)
+            embeddings: float32 array of shape (chunk_count, dimensions)
+        """
+        if len(offsets) != len(embeddings):
+            raise ValueError(f"{len(offsets)} chunk offsets but {len(embeddings)} embeddings")
+
+        self.text = text
+        self.offsets = offsets
+        self.embeddings = embeddings
+
+    @classmethod
+    def empty(cls, text: str = '') -> 'EmbeddedChunks':
+        return cls(text, np.empty((0, 2), dtype=np.int32), np.empty((0, 0), dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def content(self, chunk_number: int) -> str:
+        start, end = self.offsets[chunk_number]
+        return self.text[start:end]
+
+    def __iter__(self) -> Iterator[tuple[str, np.ndarray]]:
+        """Yield (content, embedding) per chunk, embedding being a float32 row view"""
+        for chunk_number in range(len(self.offsets)):
+            yield self.content(chunk_number), self.embeddings[chunk_number]
+
+    def rows(self, store_text: bool = True) -> Iterator[tuple[str | None, int, int, np.ndarray]]:
+        """Yield (content or None, start, end, embedding) per chunk for storage, content only with store_text"""
+        for chunk_number, (start, end) in enumerate(self.offsets.tolist()):
+            yield self.text[start:end] if store_text else None, start, end, self.embeddings[chunk_number]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by offsets and embeddings (the article text is shared with the caller)"""
+        return self.offsets.nbytes + self.embeddings.nbytes
+
+
+def main():
+    """Peak memory of list-of-dicts chunks vs EmbeddedChunks. Usage: python embedded_chunks.py [articles]"""
+    article_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    texts = [" ".join(random.choice(("news", "market", "policy", "climate", "league")) for _ in range(1_400))
+             for _ in range(article_count)]
+
+    tracemalloc.start()
+    as_dicts = []
+    for text in texts:
+        for start, end in chunk_offsets(len(text)).tolist():
+            as_dicts.append({'content': text[start:end], 'embedding': [random.random() for _ in range(768)]})
+    dict_peak = tracemalloc.get_traced_memory()[1]
+    chunk_count = len(as_dicts)
+    del as_dicts
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    offsets = [chunk_offsets(len(text)) for text in texts]
+    matrix = np.random.default_rng().random((sum(len(o) for o in offsets), 768), dtype=np.float32)
+    as_records, row = [], 0
+    for text, article_offsets in zip(texts, offsets):
+        as_records.append(EmbeddedChunks(text, article_offsets, matrix[row:row + len(article_offsets)]))
+        row += len(article_offsets)
+    record_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"🏁 Benchmark: {article_count} articles / {chunk_count:,} chunks x 768 dims")
+    print(f"📊 list of dicts : {dict_peak / 1024**2:>8.1f} MB ({dict_peak / chunk_count / 1024:.1f} KB/chunk)")
+    print(f"📊 EmbeddedChunks: {record_peak / 1024**2:>8.1f} MB ({record_peak / chunk_count / 1024:.1f} KB/chunk)")
+
+
+if __name__ == "__main__":
+    main()
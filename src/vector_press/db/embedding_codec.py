@@ -0,0 +1,90 @@
+from typing import Sequence
+import base64
+import random
+import json
+import time
+import sys
+
+import numpy as np
+
+# Packed little-endian dtypes per binary encoding
+_WIRE_DTYPES = {'float32': '<f4', 'float16': '<f2'}
+
+# Wire encodings understood by the decode_embedding() SQL helper
+#   json    - decimal JSON list (PostgREST default, ~12-15 KB per 768-dim vector)
+#   float32 - little-endian float32 bytes as base64 (~4 KB, lossless for Ollama's float32 output)
+#   float16 - little-endian float16 bytes as base64 (~2 KB, ~1e-3 relative error, fine for cosine ranking)
+EMBEDDING_ENCODINGS = ('json', 'float32', 'float16')
+
+
+def encode_embedding(embedding: Sequence[float] | np.ndarray, encoding: str = 'float32') -> list[float] | str:
+    """
+    Encode an embedding for transport to the database
+
+    Args:
+        embedding: Embedding values, a list or a float32 row of an EmbeddedChunks matrix
+        encoding: One of EMBEDDING_ENCODINGS
+
+    Returns:
+        A list of floats for 'json', otherwise a base64 string of packed little-endian floats
+    """
+    if encoding == 'json':
+        return embedding.tolist() if isinstance(embedding, np.ndarray) else list(embedding)
+
+    if encoding in _WIRE_DTYPES:
+        # No copy for a float32 row on a little-endian host, a single vectorized cast otherwise
+        return base64.b64encode(np.asarray(embedding, dtype=_WIRE_DTYPES[encoding]).tobytes()).decode('ascii')
+
+    raise ValueError(f"Unknown embedding encoding: {encoding}")
+
+
+def decode_embedding(encoded: list[float] | str, encoding: str = 'float32') -> list[float]:
+    """Inverse of encode_embedding(), the Python twin of the decode_embedding() SQL function"""
+    if encoding == 'json':
+        return list(encoded)
+
+    if encoding in _WIRE_DTYPES:
+        return np.frombuffer(base64.b64decode(encoded), dtype=_WIRE_DTYPES[encoding]).tolist()
+
+    raise ValueError(f"Unknown embedding encoding: {encoding}")
+
+
+def main():
+    """Benchmark payload size and encode/decode time of every encoding. Usage: python embedding_codec.py [vectors]"""
+    vector_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+
+    # Unit-normalized random vectors look like EmbeddingGemma output (values around +-0.05)
+    embeddings = []
+    for _ in range(vector_count):
+        vector = [random.gauss(0, 1) for _ in range(768)]
+        norm = sum(value * value for value in vector) ** 0.5
+        embeddings.append([value / norm for value in vector])
+
+    print(f"🏁 Benchmark: {vector_count:,} x 768-dim embeddings")
+    print(f"{'encoding':>8} | {'bytes/vector':>12} | {'encode µs':>9} | {'decode µs':>9} | {'max abs error':>13}")
+
+    for encoding in EMBEDDING_ENCODINGS:
+        start_time = time.perf_counter()
+        if encoding == 'json':
+            # What supabase-py actually sends: json.dumps of the float list
+            encoded = [json.dumps(embedding) for embedding in embeddings]
+        else:
+            encoded = [json.dumps(encode_embedding(embedding, encoding)) for embedding in embeddings]
+        encode_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        if encoding == 'json':
+            decoded = [json.loads(payload) for payload in encoded]
+        else:
+            decoded = [decode_embedding(json.loads(payload), encoding) for payload in encoded]
+        decode_time = time.perf_counter() - start_time
+
+        size = sum(len(payload) for payload in encoded) / vector_count
+        max_error = max(abs(a - b) for original, restored in zip(embeddings, decoded) for a, b in zip(original, restored))
+
+        print(f"{encoding:>8} | {size:>12,.0f} | {encode_time / vector_count * 1e6:>9.1f} | "
+              f"{decode_time / vector_count * 1e6:>9.1f} | {max_error:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+from typing import Dict, List
+import threading
+import asyncio
+import time
+
+from config import settings
+
+BASELINE_STORAGE = 'article_chunks'  # embeddings in article_chunks.embedding, every other version in article_chunk_embeddings
+
+
+class EmbeddingVersion:
+    """
+    One row of embedding_versions: the model and prompt format a set of chunk embeddings was built with
+
+    Prompts are templates with a {text} placeholder, e.g. EmbeddingGemma's 'title: none | text: {text}'.
+    """
+
+    __slots__ = ('version', 'model', 'document_prompt', 'query_prompt', 'dimensions', 'status', 'storage', 'registered')
+
+    def __init__(self, version: str, model: str, document_prompt: str, query_prompt: str, dimensions: int,
+                 status: str = 'building', storage: str = 'article_chunk_embeddings', registered: bool = True):
+        """
+        Args:
+            version: Version name (e.g. embeddinggemma-v1)
+            model: Ollama embedding model
+            document_prompt: Template for chunk texts
+            query_prompt: Template for search queries
+            dimensions: Embedding dimensions
+            status: 'building', 'active' or 'retired'
+            storage: Table holding the embeddings
+            registered: False for the built-in fallback of a database without embedding_versions
+        """
+        self.version = version
+        self.model = model
+        self.document_prompt = document_prompt
+        self.query_prompt = query_prompt
+        self.dimensions = dimensions
+        self.status = status
+        self.storage = storage
+        self.registered = registered
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'EmbeddingVersion':
+        return cls(row['version'], row['model'], row['document_prompt'], row['query_prompt'], row['dimensions'],
+                   row['status'], row['storage'])
+
+    def format_document(self, text: str) -> str:
+        return self.document_prompt.replace('{text}', text)
+
+    def format_query(self, text: str) -> str:
+        return self.query_prompt.replace('{text}', text)
+
+    def __repr__(self) -> str:
+        return f"EmbeddingVersion({self.version!r}, model={self.model!r}, status={self.status!r})"
+
+
+# What every database held before embedding_versions existed, also seeded by supabase_setup.sql
+BASELINE_VERSION = EmbeddingVersion('embeddinggemma-v1', 'embeddinggemma', 'title: none | text: {text}',
+                                    'task: search result | query: {text}', 768, status='active',
+                                    storage=BASELINE_STORAGE, registered=False)
+
+
+class EmbeddingVersionRegistry:
+    """
+    Reads and switches embedding versions
+
+    The active version is cached for refresh_seconds, so long-running processes pick up a switch within that time.
+    Callers pass the version they embedded with to the RPCs, which keeps a query or an upsert consistent even when
+    the switch happens in between.
+    """
+
+    def __init__(self, supabase, refresh_seconds: float = settings.EMBEDDING_VERSION_REFRESH_SECONDS):
+        """
+        Args:
+            supabase: Supabase client
+            refresh_seconds: How long the active version is cached
+        """
+        self.supabase = supabase
+        self.refresh_seconds = refresh_seconds
+        self._active: EmbeddingVersion | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _cached(self) -> EmbeddingVersion | None:
+        if self._active is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return self._active
+        return None
+
+    def _remember(self, rows: List[Dict]) -> EmbeddingVersion:
+        active = EmbeddingVersion.from_row(rows[0]) if rows else BASELINE_VERSION
+        if self._active is not None and active.version != self._active.version:
+            print(f"🔀 [EMBEDDING] Active embedding version switched from {self._active.version} to {active.version}")
+        self._active, self._loaded_at = active, time.monotonic()
+        return active
+
+    def active(self) -> EmbeddingVersion:
+        """The active embedding version, BASELINE_VERSION when the database has no embedding_versions table"""
+        with self._lock:
+            cached = self._cached()
+            if cached is not None:
+                return cached
+            try:
+                result = self.supabase.table('embedding_versions').select('*').eq('status', 'active').execute()
+                return self._remember(result.data)
+            except Exception as e:
+                print(f"⚠️ [EMBEDDING] Could not read embedding_versions, using {BASELINE_VERSION.version}: {e}")
+                return self._remember([])
+
+    async def aactive(self) -> EmbeddingVersion:
+        """Async wrapper of active(), only a cache refresh leaves the event loop (on a worker thread)"""
+        cached = self._cached()
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.active)
+
+    def invalidate(self) -> None:
+        """Forget the cached active version, e.g. after an RPC reported it is no longer active"""
+        with self._lock:
+            self._active = None
+
+    def get(self, version: str) -> EmbeddingVersion:
+        """Any registered version by name"""
+        result = self.supabase.table('embedding_versions').select('*').eq('version', version).execute()
+        if not result.data:
+            raise ValueError(f"Unknown embedding version {version}")
+        return EmbeddingVersion.from_row(result.data[0])
+
+    def create(self, version: str, model: str, dimensions: int,
+               document_prompt: str = BASELINE_VERSION.document_prompt,
+               query_prompt: str = BASELINE_VERSION.query_prompt) -> EmbeddingVersion:
+        """Register a new version in 'building' state, with its own vector index"""
+        self.supabase.rpc('create_embedding_version', {
+            'new_version': version, 'model': model, 'dimensions': dimensions,
+            'document_prompt': document_prompt, 'query_prompt': query_prompt,
+        }).execute()
+        print(f"🆕 [EMBEDDING] Created embedding version {version} ({model}, {dimensions} dimensions)")
+        return self.get(version)
+
+    def activate(self, version: str) -> None:
+        """Switch retrieval and ingestion to version in one transaction; fails while any chunk lacks its embedding"""
+        self.supabase.rpc('activate_embedding_version', {'target_version': version}).execute()
+        self.invalidate()
+        print(f"✅ [EMBEDDING] Activated embedding version {version}")
+
+    def status(self) -> List[Dict]:
+        """Every version with its embedded / total chunk counts"""
+        return self.supabase.rpc('embedding_version_status', {}).execute().data or []
@@ -0,0 +1,194 @@
+from typing import Dict, List
+import hashlib
+import shutil
+import json
+import os
+
+import numpy as np
+
+from config import settings
+
+from vector_press.db.embedded_chunks import EmbeddedChunks
+
+
+def _article_file_name(article_id: str) -> str:
+    # Guardian ids contain slashes, hash them into safe file names
+    return hashlib.sha1(article_id.encode('utf-8')).hexdigest() + '.npz'
+
+
+def _write_json_atomic(path: str, data) -> None:
+    """Write JSON to a temp file, fsync it and rename it over path, so a crash never leaves half a file behind"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_jsonl_repairing(path: str) -> List[Dict]:
+    """
+    Read the events of an append-only JSONL file and cut off a torn last line left by a crash
+
+    Everything after the first line that does not parse is truncated, so events appended afterwards start on a line
+    of their own instead of being glued onto the fragment (and lost on the next read).
+
+    Returns:
+        Decoded events up to the first invalid line, an empty list if the file does not exist
+    """
+    if not os.path.exists(path):
+        return []
+
+    events, valid_end, newline_missing = [], 0, False
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # torn last line from a crash, everything before it is valid
+            valid_end += len(line)
+            newline_missing = not line.endswith(b'\n')
+
+    with open(path, 'r+b') as f:
+        if f.seek(0, os.SEEK_END) != valid_end:
+            print(f"💾 [CHECKPOINT] Dropping torn last line of {os.path.basename(path)}")
+            f.truncate(valid_end)
+        if newline_missing:
+            f.seek(valid_end)
+            f.write(b'\n')
+        f.flush()
+        os.fsync(f.fileno())
+    return events
+
+
+class IngestionCheckpoint:
+    """
+    Durable progress of one database_uploading run under settings.OUTPUT/ingestion_runs/<run_id>
+
+    Layout:
+        run.json          - run parameters
+        progress.jsonl    - append-only events: {"page": n}, {"exhausted": n}, {"stored": article_id}, {"completed": true}
+        pages/page_N.json - extracted articles of every fetched page, so a resume never refetches them
+        pending/<id>.npz  - chunk offsets + float32 embeddings (and their embedding version) computed but not inserted yet
+    """
+
+    def __init__(self, run_params: Dict, run_id: str = None, resume: bool = False, root_dir: str = None):
+        """
+        Args:
+            run_params: database_uploading arguments, also used to derive the default run_id
+            run_id: Explicit run identifier, defaults to a hash of run_params
+            resume: Continue an existing run; otherwise any previous progress of the run is discarded
+            root_dir: Base directory, defaults to settings.OUTPUT/ingestion_runs
+        """
+        self.run_id = run_id or hashlib.sha1(json.dumps(run_params, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+        self.run_dir = os.path.join(root_dir or os.path.join(settings.OUTPUT, 'ingestion_runs'), self.run_id)
+        self.pages_dir = os.path.join(self.run_dir, 'pages')
+        self.pending_dir = os.path.join(self.run_dir, 'pending')
+        self.progress_path = os.path.join(self.run_dir, 'progress.jsonl')
+
+        self.fetched_pages: set[int] = set()
+        self.stored_article_ids: set[str] = set()
+        self.exhausted_at_page: int | None = None
+        self.completed = False
+
+        if not resume and os.path.isdir(self.run_dir):
+            shutil.rmtree(self.run_dir)
+
+        os.makedirs(self.pages_dir, exist_ok=True)
+        os.makedirs(self.pending_dir, exist_ok=True)
+
+        if resume:
+            self._load_progress()
+        _write_json_atomic(os.path.join(self.run_dir, 'run.json'), run_params)
+
+        self._progress_file = open(self.progress_path, 'a', encoding='utf-8')
+
+        print(f"💾 [CHECKPOINT] Run {self.run_id}: {len(self.fetched_pages)} page(s) fetched, "
+              f"{len(self.stored_article_ids)} article(s) stored, {len(os.listdir(self.pending_dir))} pending")
+
+    def _load_progress(self) -> None:
+        for event in _read_jsonl_repairing(self.progress_path):
+            if 'page' in event:
+                self.fetched_pages.add(event['page'])
+            elif 'stored' in event:
+                self.stored_article_ids.add(event['stored'])
+            elif 'exhausted' in event:
+                self.exhausted_at_page = event['exhausted']
+            elif event.get('completed'):
+                self.completed = True
+
+    def _append_event(self, event: Dict) -> None:
+        self._progress_file.write(json.dumps(event) + '\n')
+        self._progress_file.flush()
+        os.fsync(self._progress_file.fileno())
+
+    def _page_path(self, page: int) -> str:
+        return os.path.join(self.pages_dir, f'page_{page}.json')
+
+    def load_page(self, page: int) -> List[Dict] | None:
+        """Extracted articles of an already fetched page, None if the page still has to be fetched"""
+        if page not in self.fetched_pages or not os.path.exists(self._page_path(page)):
+            return None
+        with open(self._page_path(page), encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_page(self, page: int, extracted_articles: List[Dict]) -> None:
+        _write_json_atomic(self._page_path(page), extracted_articles)
+        self.fetched_pages.add(page)
+        self._append_event({'page': page})
+
+    def mark_exhausted(self, page: int) -> None:
+        """Record that pagination ended at page (no results or API error past the first page)"""
+        self.exhausted_at_page = page
+        self._append_event({'exhausted': page})
+
+    def _pending_path(self, article_id: str) -> str:
+        return os.path.join(self.pending_dir, _article_file_name(article_id))
+
+    def load_pending(self, article_id: str, text: str, embedding_version: str = None) -> EmbeddedChunks | None:
+        """
+        Chunks with embeddings computed by a previous attempt, None if there are none
+
+        Args:
+            article_id: Guardian article ID
+            text: Article text the saved chunk offsets point into
+            embedding_version: Only reuse embeddings of this version (they are stale after a version switch)
+        """
+        path = self._pending_path(article_id)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as pending:
+            saved_version = str(pending['embedding_version']) if 'embedding_version' in pending else None
+            if embedding_version is not None and saved_version != embedding_version:
+                print(f"💾 [CHECKPOINT] Pending embeddings of {article_id} are for {saved_version}, re-embedding")
+                return None
+            return EmbeddedChunks(text, pending['offsets'], pending['embeddings'])
+
+    def save_pending(self, article_id: str, embedded_chunks: EmbeddedChunks, embedding_version: str = None) -> None:
+        """Persist offsets and the raw float32 matrix (the text is already saved with its page)"""
+        path = self._pending_path(article_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, offsets=embedded_chunks.offsets, embeddings=embedded_chunks.embeddings,
+                     embedding_version=np.array(embedding_version or ''))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def mark_stored(self, article_id: str) -> None:
+        """Record a fully stored article (metadata and chunks) and drop its pending embeddings"""
+        self.stored_article_ids.add(article_id)
+        self._append_event({'stored': article_id})
+
+        path = self._pending_path(article_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def mark_completed(self) -> None:
+        """Record the end of the run and free the cached page payloads"""
+        self.completed = True
+        self._append_event({'completed': True})
+        shutil.rmtree(self.pages_dir, ignore_errors=True)
+
+    def close(self) -> None:
+        self._progress_file.close()
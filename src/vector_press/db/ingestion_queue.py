@@ -0,0 +1,68 @@
+from typing import Dict
+import threading
+import queue
+
+from config import settings
+
+
+class BackgroundIngestionQueue:
+    """Chunks, embeds and stores extracted Guardian articles on a background thread"""
+
+    def __init__(self, vector_store, max_queue_size: int = settings.INGESTION_QUEUE_SIZE):
+        """
+        Args:
+            vector_store: SupabaseVectorStore used to process articles
+            max_queue_size: Upper bound on pending articles, new articles are dropped when the queue is full
+        """
+        self.vector_store = vector_store
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._pending_ids: set[str] = set()
+        self._lock = threading.Lock()
+
+        self._worker = threading.Thread(target=self._run, name='vector-press-ingestion', daemon=True)
+        self._worker.start()
+
+        print(f"🔧 [DEBUG] Background ingestion queue initialized")
+
+    def submit(self, extracted_article: Dict) -> bool:
+        """
+        Queue an article returned by extract_article_text() for storage without blocking the caller
+
+        Returns:
+            True if the article was queued, False if it is already pending or the queue is full
+        """
+        article_id = extracted_article['metadata']['article_id']
+
+        with self._lock:
+            if article_id in self._pending_ids:
+                return False
+            self._pending_ids.add(article_id)
+
+        try:
+            self._queue.put_nowait(extracted_article)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._pending_ids.discard(article_id)
+            print(f"⚠️ [DEBUG] Ingestion queue full, skipping article {article_id}")
+            return False
+
+    def join(self) -> None:
+        """Block until every queued article has been processed"""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            extracted_article = self._queue.get()
+            article_id = extracted_article['metadata']['article_id']
+            try:
+                if self.vector_store.check_article_exists(article_id):
+                    print(f"⏭️ [DEBUG] Article {article_id} already stored, skipping ingestion")
+                else:
+                    self.vector_store._process_extracted_article(extracted_article)
+            except Exception as e:
+                print(f"🔥 [DEBUG] Background ingestion failed for {article_id}: {e}")
+            finally:
+                with self._lock:
+                    self._pending_ids.discard(article_id)
+                self._queue.task_done()
@@ -0,0 +1,77 @@
+  -- Migrate a flat article_chunks table to the monthly partitioned layout of supabase_setup.sql
+  -- Run once in the SQL editor, first of the migrations: 001, 002, 003, then (re)create the functions of
+  -- supabase_setup.sql. The functions this migration needs are defined here. The copy runs in a single transaction;
+  -- the old table is kept as article_chunks_flat until you drop it.
+
+  begin;
+
+  -- Create the monthly partition holding ts (article_chunks_yYYYYmMM) unless it exists; indexes are inherited
+  create or replace function ensure_article_chunk_partition (ts timestamp with time zone)
+  returns text
+  language plpgsql
+  as $$
+  declare
+    month_start date := date_trunc('month', ts at time zone 'utc')::date;
+    partition_name text := format('article_chunks_y%sm%s', to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+  begin
+    if to_regclass(partition_name) is null then
+      begin
+        execute format(
+          'create table %I partition of article_chunks for values from (%L) to (%L)',
+          partition_name, month_start::timestamp at time zone 'utc', (month_start + interval '1 month')::timestamp at time zone 'utc'
+        );
+      exception when duplicate_table then
+        null;  -- created by a concurrent writer
+      end;
+    end if;
+    return partition_name;
+  end;
+  $$;
+
+  alter table article_chunks rename to article_chunks_flat;
+  alter index if exists article_chunks_embedding_idx rename to article_chunks_flat_embedding_idx;
+  alter table article_chunks_flat rename constraint article_chunks_pkey to article_chunks_flat_pkey;
+
+  create table article_chunks (
+      id bigserial,
+      article_id varchar not null references guardian_articles(article_id) on delete cascade,
+      chunk_number integer not null,
+      publication_date timestamp with time zone not null,
+      section varchar not null,
+      content text not null,
+      embedding vector(768) not null,
+      created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+
+      primary key (id, publication_date),
+      unique(article_id, chunk_number, publication_date)
+  ) partition by range (publication_date);
+
+  create table article_chunks_default partition of article_chunks default;
+
+  -- One partition per month that has articles, created before any row arrives so the default partition stays empty
+  select ensure_article_chunk_partition(month)
+  from (select distinct date_trunc('month', publication_date) as month from guardian_articles) m;
+
+  insert into article_chunks (id, article_id, chunk_number, publication_date, section, content, embedding, created_at)
+  select f.id, f.article_id, f.chunk_number, ga.publication_date, ga.section, f.content, f.embedding, f.created_at
+  from article_chunks_flat f
+  join guardian_articles ga on ga.article_id = f.article_id;
+
+  select setval(pg_get_serial_sequence('article_chunks', 'id'), coalesce((select max(id) from article_chunks), 1));
+
+  -- Building the HNSW indexes after the copy is much faster than maintaining them row by row
+  set local maintenance_work_mem = '1GB';
+  create index article_chunks_embedding_idx on article_chunks using hnsw (embedding vector_cosine_ops);
+
+  alter table article_chunks enable row level security;
+
+  create policy "Allow public read access on chunks"
+    on article_chunks for select to public using (true);
+
+  create policy "Allow public insert on chunks"
+    on article_chunks for insert to public with check (true);
+
+  commit;
+
+  -- After checking the row counts match:
+  -- drop table article_chunks_flat;
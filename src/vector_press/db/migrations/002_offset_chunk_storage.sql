@@ -0,0 +1,38 @@
+  -- Store article_chunks as (start_offset, end_offset) into the article text instead of a copy of the text
+  -- Run after 001_partition_article_chunks.sql and before 003_embedding_versions.sql; the function it needs is
+  -- defined here, the rest of supabase_setup.sql's functions are (re)created after 003.
+  -- Chunks were cut every 1475 characters (1750 chunk size - 275 overlap), so chunk n starts at n * 1475. A chunk
+  -- only drops its text when the text at those offsets matches exactly; any other chunk keeps its stored content.
+
+  begin;
+
+  -- Text the chunk offsets point into, the same title + body join as extract_article_text() in api_clients.py
+  create or replace function article_full_text (title varchar, body_text text)
+  returns text
+  language sql immutable parallel safe
+  as $$
+    select concat_ws(E'\n\n', nullif(title, ''), nullif(body_text, ''));
+  $$;
+
+  alter table article_chunks add column if not exists start_offset integer;
+  alter table article_chunks add column if not exists end_offset integer;
+  alter table article_chunks alter column content drop not null;
+
+  update article_chunks ac
+  set start_offset = ac.chunk_number * 1475,
+      end_offset = ac.chunk_number * 1475 + length(ac.content),
+      content = null
+  from guardian_articles ga
+  where ga.article_id = ac.article_id
+    and ac.content is not null
+    and substring(article_full_text(ga.title, ga.body_text) from ac.chunk_number * 1475 + 1 for length(ac.content)) = ac.content;
+
+  alter table article_chunks add constraint article_chunks_content_or_offsets
+    check (content is not null or (start_offset is not null and end_offset is not null));
+
+  commit;
+
+  -- Chunks that kept their text (should be none for articles ingested by this project):
+  --   select count(*) from article_chunks where content is not null;
+  -- The freed TOAST space is only returned to the OS by rewriting the partitions:
+  --   vacuum (full, analyze) article_chunks;
@@ -0,0 +1,55 @@
+  -- Add embedding versions to an existing database; the current article_chunks.embedding column becomes the
+  -- baseline version embeddinggemma-v1, so nothing is re-embedded and retrieval is unchanged.
+  -- Run after 002_offset_chunk_storage.sql, then (re)create the functions of supabase_setup.sql. Not before:
+  -- reembedding_batch() and embedding_version_status() are language sql, so their bodies are checked on creation
+  -- against the tables and columns added by 001-003.
+
+  begin;
+
+  create table embedding_versions (
+      version varchar primary key,
+      model varchar not null,
+      document_prompt text not null,
+      query_prompt text not null,
+      dimensions integer not null,
+      status varchar not null default 'building' check (status in ('building', 'active', 'retired')),
+      storage varchar not null default 'article_chunk_embeddings',
+      created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+      activated_at timestamp with time zone
+  );
+
+  create unique index embedding_versions_one_active on embedding_versions ((true)) where status = 'active';
+
+  insert into embedding_versions (version, model, document_prompt, query_prompt, dimensions, status, storage, activated_at)
+  values ('embeddinggemma-v1', 'embeddinggemma', 'title: none | text: {text}', 'task: search result | query: {text}',
+          768, 'active', 'article_chunks', now());
+
+  create table article_chunk_embeddings (
+      chunk_id bigint not null,
+      publication_date timestamp with time zone not null,
+      version varchar not null references embedding_versions(version) on delete cascade,
+      embedding vector not null,
+      created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+
+      primary key (chunk_id, publication_date, version),
+      foreign key (chunk_id, publication_date) references article_chunks(id, publication_date) on delete cascade
+  );
+
+  create index article_chunk_embeddings_version_idx on article_chunk_embeddings (version, chunk_id);
+
+  -- Chunks written while a newer version is active only have an embedding of that version
+  alter table article_chunks alter column embedding drop not null;
+
+  alter table embedding_versions enable row level security;
+  alter table article_chunk_embeddings enable row level security;
+
+  create policy "Allow public read access on embedding versions"
+    on embedding_versions for select to public using (true);
+
+  create policy "Allow public read access on chunk embeddings"
+    on article_chunk_embeddings for select to public using (true);
+
+  create policy "Allow public insert on chunk embeddings"
+    on article_chunk_embeddings for insert to public with check (true);
+
+  commit;
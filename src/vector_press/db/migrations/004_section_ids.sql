@@ -0,0 +1,19 @@
+  -- Store Guardian section ids (e.g. 'world') instead of section names (e.g. 'World news'), so the section filters of
+  -- GuardianSearchRequest match articles stored before extract_article_text switched to sectionId.
+  -- Run after 001_partition_article_chunks.sql. The section id is the first segment of the Guardian content id
+  -- ('world/2022/oct/21/...'), which is the article_id; rows that already hold it are left untouched.
+
+  begin;
+
+  update guardian_articles
+  set section = split_part(article_id, '/', 1)
+  where position('/' in article_id) > 0
+    and section is distinct from split_part(article_id, '/', 1);
+
+  update article_chunks ac
+  set section = ga.section
+  from guardian_articles ga
+  where ga.article_id = ac.article_id
+    and ac.section is distinct from ga.section;
+
+  commit;
@@ -0,0 +1,75 @@
+  -- Add the semantic answer cache (final agent answers keyed by query embedding) to an existing database
+  -- Run after 004_section_ids.sql: the invalidation trigger compares new articles' section ids with the sections of
+  -- cached answers. Defines its own functions, so it also works after the functions of supabase_setup.sql were created.
+
+  begin;
+
+  create table answer_cache (
+      id bigserial primary key,
+      query text not null,
+      answer text not null,
+      sources jsonb not null default '[]'::jsonb,  -- [{title, section, url, publication_date}]
+      sections varchar[] not null default '{}',    -- Guardian sections the answer was built from
+      embedding vector(768) not null,              -- EmbeddingGemma "sentence similarity" query embedding
+      created_at timestamp with time zone default timezone('utc'::text, now()) not null
+  );
+
+  create index answer_cache_embedding_idx on answer_cache using hnsw (embedding vector_cosine_ops);
+  create index answer_cache_sections_idx on answer_cache using gin (sections);
+
+  -- Function to find a fresh cached answer for a similar query
+  create or replace function match_answer_cache (
+    query_embedding vector(768),
+    match_count int default 1,
+    max_age_seconds int default 3600
+  ) returns table (
+    id bigint,
+    query text,
+    answer text,
+    sources jsonb,
+    created_at timestamp with time zone,
+    similarity float
+  )
+  language plpgsql
+  as $$
+  begin
+    return query
+    select
+      c.id,
+      c.query,
+      c.answer,
+      c.sources,
+      c.created_at,
+      1 - (c.embedding <=> query_embedding) as similarity
+    from answer_cache c
+    where c.created_at > now() - make_interval(secs => max_age_seconds)
+    order by c.embedding <=> query_embedding
+    limit match_count;
+  end;
+  $$;
+
+  -- New articles invalidate every cached answer built from the same section. Runs as the function owner, so the
+  -- delete works without a public delete policy on answer_cache
+  create or replace function invalidate_answer_cache()
+  returns trigger
+  language plpgsql
+  security definer
+  set search_path = public
+  as $$
+  begin
+    delete from answer_cache where new.section = any(sections);
+    return new;
+  end;
+  $$;
+
+  create trigger guardian_articles_invalidate_answer_cache
+    after insert on guardian_articles
+    for each row execute function invalidate_answer_cache();
+
+  alter table answer_cache enable row level security;
+
+  -- Read-only for the public key: entries are written with the service key and invalidated by the trigger above
+  create policy "Allow public read access on answer cache"
+    on answer_cache for select to public using (true);
+
+  commit;
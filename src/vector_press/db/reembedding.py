@@ -0,0 +1,190 @@
+from datetime import datetime
+from typing import Dict
+import threading
+import json
+import os
+import sys
+
+from config import settings
+
+from vector_press.db.embedding_codec import encode_embedding
+from vector_press.db.embedding_versions import EmbeddingVersion
+from vector_press.db.ingestion_checkpoint import _write_json_atomic
+
+
+class ReEmbedder:
+    """
+    Builds a new embedding version from the chunk text already in the database, while retrieval keeps using the
+    active version
+
+    Chunks without an embedding of the target version are read in id order, embedded with the version's model and
+    document prompt, and stored in throttled batches. The last chunk id is saved under
+    settings.OUTPUT/reembedding/<version>.json, so an interrupted run continues where it stopped. Once a full pass
+    finds nothing left (chunks ingested or rewritten during the build are caught by a final pass from the start),
+    the version is activated in one transaction.
+    """
+
+    def __init__(self, vector_store,
+                 batch_size: int = settings.REEMBED_BATCH_SIZE,
+                 pause_seconds: float = settings.REEMBED_PAUSE_SECONDS,
+                 root_dir: str = None):
+        """
+        Args:
+            vector_store: SupabaseVectorStore with the embedding models and the version registry
+            batch_size: Chunks per embedding request and store RPC
+            pause_seconds: Sleep between batches, keeps the embedding server free for queries and ingestion
+            root_dir: Base directory for the progress files, defaults to settings.OUTPUT/reembedding
+        """
+        self.vector_store = vector_store
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.root_dir = root_dir or os.path.join(settings.OUTPUT, 'reembedding')
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _progress_path(self, version: str) -> str:
+        return os.path.join(self.root_dir, f"{version}.json")
+
+    def _load_cursor(self, version: str) -> int:
+        path = self._progress_path(version)
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get('after_chunk_id', 0)
+
+    def _save_cursor(self, version: str, after_chunk_id: int) -> None:
+        _write_json_atomic(self._progress_path(version), {'after_chunk_id': after_chunk_id})
+
+    def _run_batch(self, version: EmbeddingVersion, after_chunk_id: int) -> tuple[int, int, int | None]:
+        """
+        Re-embed the next batch after after_chunk_id
+
+        Returns:
+            (chunks read, embeddings stored, last chunk id or None when nothing is left)
+        """
+        supabase = self.vector_store.supabase
+        rows = supabase.rpc('reembedding_batch', {'target_version': version.version, 'after_chunk_id': after_chunk_id,
+                                                  'batch_size': self.batch_size}).execute().data or []
+        if not rows:
+            return 0, 0, None
+
+        embeddings = self.vector_store._create_mega_batch_embeddings([row['content'] for row in rows], version)
+        if embeddings.shape[1] != version.dimensions:
+            raise ValueError(f"{version.model} returned {embeddings.shape[1]} dimensions, "
+                             f"{version.version} expects {version.dimensions}")
+
+        encoding = settings.EMBEDDING_WIRE_ENCODING
+        payload = [
+            {'chunk_id': row['chunk_id'], 'publication_date': row['publication_date'],
+             'content_md5': row['content_md5'], 'embedding': encode_embedding(embedding, encoding)}
+            for row, embedding in zip(rows, embeddings)
+        ]
+        stored = supabase.rpc('store_chunk_embeddings', {'target_version': version.version, 'embeddings': payload,
+                                                         'embedding_encoding': encoding}).execute().data
+        return len(rows), stored or 0, rows[-1]['chunk_id']
+
+    def run(self, version: str, activate: bool = True) -> Dict:
+        """
+        Re-embed every chunk for version, then optionally switch to it
+
+        Args:
+            version: Registered embedding version in 'building' state
+            activate: Activate the version once every chunk has its embedding
+
+        Returns:
+            Statistics, 'completed' is True once nothing is left to embed
+        """
+        embedding_version = self.vector_store.embedding_versions.get(version)
+        if embedding_version.status == 'retired':
+            raise ValueError(f"Embedding version {version} is retired")
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        after_chunk_id = self._load_cursor(version)
+        stats = {'version': version, 'read': 0, 'stored': 0, 'passes': 1, 'completed': False, 'activated': False,
+                 'start_time': datetime.now(), 'end_time': None}
+        print(f"🔁 [REEMBED] Building {version} ({embedding_version.model}) from chunk id {after_chunk_id}, "
+              f"{self.batch_size} chunks per batch")
+
+        pass_read = 0
+        while not self._stop_event.is_set():
+            read, stored, last_chunk_id = self._run_batch(embedding_version, after_chunk_id)
+            if last_chunk_id is None:
+                if after_chunk_id == 0 and pass_read == 0:
+                    stats['completed'] = True
+                    break
+                # Chunks ingested or rewritten behind the cursor during this pass
+                after_chunk_id, pass_read = 0, 0
+                stats['passes'] += 1
+                self._save_cursor(version, after_chunk_id)
+                continue
+
+            after_chunk_id = last_chunk_id
+            pass_read += read
+            stats['read'] += read
+            stats['stored'] += stored
+            self._save_cursor(version, after_chunk_id)
+            print(f"🔁 [REEMBED] {version}: {stats['stored']:,} chunks stored (up to chunk id {after_chunk_id})")
+            self._stop_event.wait(self.pause_seconds)
+
+        if stats['completed'] and activate:
+            self.vector_store.embedding_versions.activate(version)
+            stats['activated'] = True
+            if os.path.exists(self._progress_path(version)):
+                os.remove(self._progress_path(version))
+
+        stats['end_time'] = datetime.now()
+        duration = (stats['end_time'] - stats['start_time']).total_seconds()
+        state = 'activated' if stats['activated'] else 'complete' if stats['completed'] else 'stopped, resumable'
+        print(f"📊 [REEMBED] {version} {state} after {duration:.1f} seconds: {stats['stored']:,} chunk(s) stored "
+              f"in {stats['passes']} pass(es)")
+        return stats
+
+    def start(self, version: str, activate: bool = True) -> threading.Thread:
+        """Run run() in a daemon thread, stop it with stop()"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, args=(version, activate), name='vector-press-reembed',
+                                        daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop after the current batch; the saved cursor lets the next run continue"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def main():
+    """
+    Usage:
+        python reembedding.py status
+        python reembedding.py create VERSION MODEL DIMENSIONS [DOCUMENT_PROMPT QUERY_PROMPT]
+        python reembedding.py run VERSION [--no-activate]
+        python reembedding.py activate VERSION
+    """
+    from vector_press.llm_embedding_initializer import LLMManager
+    from vector_press.db.supabase_db import SupabaseVectorStore
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args or args[0] not in ('status', 'create', 'run', 'activate') or (args[0] != 'status' and len(args) < 2):
+        print(main.__doc__)
+        return
+
+    vector_store = SupabaseVectorStore(LLMManager())
+    registry = vector_store.embedding_versions
+
+    if args[0] == 'create':
+        prompts = {'document_prompt': args[4], 'query_prompt': args[5]} if len(args) > 5 else {}
+        registry.create(args[1], model=args[2], dimensions=int(args[3]), **prompts)
+    elif args[0] == 'run':
+        ReEmbedder(vector_store).run(args[1], activate="--no-activate" not in sys.argv)
+    elif args[0] == 'activate':
+        registry.activate(args[1])
+
+    for row in registry.status():
+        print(f"📊 {row['version']:<24} {row['status']:<9} {row['model']:<20} "
+              f"{row['embedded_chunks']:,}/{row['total_chunks']:,} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
-from supabase import create_client, Client
-from typing import List, Dict
+from supabase import create_client, Client, acreate_client, AsyncClient
+from typing import List, Dict, Sequence
 from datetime import datetime
+import asyncio
+import json
 import time
+import sys
+import numpy as np
 import torch
 
 from config import settings
 
 from vector_press.llm_embedding_initializer import LLMManager
+from vector_press.profiling import profiled
+from vector_press.event_loop import run_sync
 from vector_press.agent.api_clients import GuardianAPIClient
+from vector_press.agent.request_scheduler import Priority
+from vector_press.db.ingestion_checkpoint import IngestionCheckpoint
+from vector_press.db.bulk_loader import PostgresBulkLoader
+from vector_press.db.embedding_codec import encode_embedding
+from vector_press.db.embedded_chunks import EmbeddedChunks, chunk_offsets
+from vector_press.db.embedding_versions import EmbeddingVersion, EmbeddingVersionRegistry
 
 #TODO explore the pytest
 
@@ -65,73 +77,72 @@ class SupabaseVectorStore:
         self.SUPABASE_URL = settings.SUPABASE_URL
         self.SUPABASE_KEY = settings.SUPABASE_SERVICE_KEY
         self.supabase: Client = create_client(self.SUPABASE_URL, self.SUPABASE_KEY)
-        self.embedding_model = llm_manager.get_embedding_model()
-        self.guardian_client = GuardianAPIClient(self)
+        self._async_supabase: AsyncClient | None = None  # created lazily, bound to the event loop that created it
+        self._async_supabase_loop = None
+        self.llm_manager = llm_manager
+        self.embedding_model = llm_manager.get_embedding_model()  # EmbeddingGemma, also used by the answer cache
+        self.embedding_versions = EmbeddingVersionRegistry(self.supabase)
+        self.guardian_client = GuardianAPIClient(priority=Priority.BATCH)  # agent tool calls go first
         
         print(f"✅ [DEBUG] Supabase Vector Store initialized")
 
-    def _insert_guardian_article_metadata(self, metadata: Dict) -> bool:
+    def _upsert_articles(self, articles: List[tuple[Dict, EmbeddedChunks]],
+                         embedding_version: EmbeddingVersion = None) -> Dict[str, str]:
         """
-        Insert article metadata into guardian_articles table
-        
-        Args:
-            metadata: Article metadata dictionary
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            result = self.supabase.table('guardian_articles').insert(metadata).execute()
-            
-            if result.data:
-                print(f"✅ [DEBUG] Inserted article metadata: {metadata['article_id']}")
-                return True
-            else:
-                print(f"❌ [DEBUG] Failed to insert article metadata")
-                return False
-                
-        except Exception as e:
-            print(f"🔥 [DEBUG] Error inserting article metadata: {e}")
-            return False
+        Upsert articles together with their chunks through the upsert_articles_with_chunks RPC
+
+        Each RPC call stores up to settings.BULK_UPSERT_BATCH_SIZE articles in one transaction; an article and its
+        chunks are written all-or-nothing and retries are idempotent (on conflict do update).
 
-    def _insert_article_chunks(self, article_id: str, chunks: List[Dict]) -> bool:
-        """
-        Insert article chunks with embeddings into article_chunks table
-        
         Args:
-            article_id: Guardian article ID
-            chunks: List of chunk dictionaries with content and embeddings
-            
+            articles: (metadata, embedded_chunks) pairs
+            embedding_version: Version the embeddings were created with, the RPC rejects it once it is not active
+
         Returns:
-            True if successful, False otherwise
+            Status per article_id: 'inserted', 'updated' or 'error: <reason>'
         """
-        try:
-            # Prepare chunks for insertion
-            chunk_data = []
-            for i, chunk in enumerate(chunks):
-                chunk_data.append({
-                    'article_id': article_id,
-                    'chunk_number': i,
-                    'content': chunk['content'],
-                    'embedding': chunk['embedding']
-                })
-            
-            # Insert chunks in batches
-            batch_size = 500
-            for i in range(0, len(chunk_data), batch_size):
-                batch = chunk_data[i:i + batch_size]
-                result = self.supabase.table('article_chunks').insert(batch).execute()
-                
-                if not result.data:
-                    print(f"❌ [DEBUG] Failed to insert chunk batch {i//batch_size + 1}")
-                    return False
-            
-            print(f"✅ [DEBUG] Inserted {len(chunks)} chunks for article {article_id}")
-            return True
-            
-        except Exception as e:
-            print(f"🔥 [DEBUG] Error inserting article chunks: {e}")
-            return False
+        statuses = {}
+        batch_size = settings.BULK_UPSERT_BATCH_SIZE
+        encoding = settings.EMBEDDING_WIRE_ENCODING
+        store_text = settings.CHUNK_STORAGE_MODE == 'text'
+
+        for i in range(0, len(articles), batch_size):
+            batch = articles[i:i + batch_size]
+            payload = [
+                {
+                    **metadata,
+                    'chunks': [
+                        {'chunk_number': chunk_number, 'content': content, 'start_offset': start, 'end_offset': end,
+                         'embedding': encode_embedding(embedding, encoding)}
+                        for chunk_number, (content, start, end, embedding) in enumerate(embedded_chunks.rows(store_text))
+                    ],
+                }
+                for metadata, embedded_chunks in batch
+            ]
+
+            params = {'articles': payload, 'embedding_encoding': encoding}
+            if embedding_version is not None and embedding_version.registered:
+                params['embedding_version'] = embedding_version.version
+
+            try:
+                start_time = time.time()
+                result = self.supabase.rpc('upsert_articles_with_chunks', params).execute()
+                for row in result.data or []:
+                    statuses[row['article_id']] = row['status']
+                print(f"✅ [DEBUG] Upserted batch of {len(batch)} articles in {time.time() - start_time:.2f} seconds")
+
+            except Exception as e:
+                print(f"🔥 [DEBUG] Error upserting article batch: {e}")
+                if 'is not active' in str(e):
+                    self.embedding_versions.invalidate()  # switched while embedding, the next attempt re-embeds
+                for metadata, _ in batch:
+                    statuses[metadata['article_id']] = f"error: {e}"
+
+        for article_id, status in statuses.items():
+            if status.startswith('error'):
+                print(f"❌ [DEBUG] Failed to store article {article_id}: {status}")
+
+        return statuses
 
     def check_article_exists(self, article_id: str) -> bool:
         """
@@ -153,25 +164,35 @@ class SupabaseVectorStore:
             print(f"🔥 [DEBUG] Error checking article existence: {e}")
             return False
 
-    def _create_mega_batch_embeddings(self, chunks: List[str]) -> List[Dict]:
+    def _existing_article_ids(self, article_ids: List[str]) -> set[str]:
+        """Return which of the given articles already exist, with one query per 100 ids"""
+        existing = set()
+        for i in range(0, len(article_ids), 100):
+            result = self.supabase.table('guardian_articles').select('article_id').in_('article_id', article_ids[i:i + 100]).execute()
+            existing.update(row['article_id'] for row in result.data)
+        return existing
+
+    def _embedding_model_for(self, embedding_version: EmbeddingVersion):
+        return self.llm_manager.get_embedding_model(embedding_version.model)
+
+    def _create_mega_batch_embeddings(self, chunks: Sequence[str], embedding_version: EmbeddingVersion = None) -> np.ndarray:
         """
-        Create embeddings optimized batch processing with EmbeddingGemma formatting
+        Create embeddings optimized batch processing with the model and document prompt of an embedding version
 
         Args:
-            chunks: List of text chunks to embed
+            chunks: Text chunks to embed
+            embedding_version: Version to embed for, defaults to the active one
 
         Returns:
-            List of dictionaries with content and embeddings
+            float32 matrix of shape (len(chunks), dimensions), row i being the embedding of chunks[i]
         """
 
+        embedding_version = embedding_version or self.embedding_versions.active()
+        embedding_model = self._embedding_model_for(embedding_version)
         total_chunks = len(chunks)
-        print(f"🚀 [MEGA-BATCH] Processing {total_chunks:,} chunks with EmbeddingGemma A100 optimization")
-
-        # Format chunks with EmbeddingGemma document prompt
-        formatted_chunks = [f"title: none | text: {chunk}" for chunk in chunks]
-        print(f"🚀 [MEGA-BATCH] Formatted {len(formatted_chunks)} chunks with EmbeddingGemma prompts")
+        print(f"🚀 [MEGA-BATCH] Processing {total_chunks:,} chunks with {embedding_version.model} A100 optimization")
 
-        all_embeddings = []
+        all_embeddings = None  # allocated once the first batch reveals the embedding dimensions
         total_start_time = time.time()
 
         # Calculate optimal batch size using dynamic VRAM formula
@@ -186,7 +207,8 @@ class SupabaseVectorStore:
             # Process in mega-batches
             total_batches = 0  # for mute the w
             for i in range(0, total_chunks, batch_size):
-                batch = formatted_chunks[i:i + batch_size]  # for ex. [0 : 8.000.000]
+                # Format with the version's document prompt, one batch at a time
+                batch = [embedding_version.format_document(chunk) for chunk in chunks[i:i + batch_size]]
                 current_batch_size = len(batch)
                 batch_num = i // batch_size + 1
                 total_batches = (total_chunks - 1) // batch_size + 1
@@ -204,7 +226,8 @@ class SupabaseVectorStore:
                         print(f"🔥 [MEGA-BATCH] GPU memory before batch: {initial_memory:.1f}GB")
 
                     # THE MEGA-BATCH EMBEDDING CALL - Single HTTP request for massive batch
-                    batch_embeddings = self.embedding_model.embed_documents(batch)
+                    batch_embeddings = np.asarray(embedding_model.embed_documents(batch), dtype=np.float32)
+                    del batch
 
                     batch_end_time = time.time()
                     batch_duration = batch_end_time - batch_start_time
@@ -220,13 +243,10 @@ class SupabaseVectorStore:
                     print(f"✅ [MEGA-BATCH] Throughput: {current_batch_size/batch_duration:.0f} chunks/second")
                     print(f"✅ [MEGA-BATCH] HTTP requests: 1 (for {current_batch_size:,} chunks)")
 
-                    # Combine with original chunk content (without EmbeddingGemma formatting)
-                    original_chunks = chunks[i:i + batch_size]
-                    for chunk, embedding in zip(original_chunks, batch_embeddings):
-                        all_embeddings.append({
-                            'content': chunk,  # Store original content without prompt formatting
-                            'embedding': embedding
-                        })
+                    # Copy into the contiguous matrix, the boxed floats of the response are freed right away
+                    if all_embeddings is None:
+                        all_embeddings = np.empty((total_chunks, batch_embeddings.shape[1]), dtype=np.float32)
+                    all_embeddings[i:i + current_batch_size] = batch_embeddings
 
                 except Exception as e:
                     print(f"Could not process batch: {e}")
@@ -236,95 +256,181 @@ class SupabaseVectorStore:
             print(f"❌ [MEGA-BATCH] Critical error: {e}")
             raise e
 
+        if all_embeddings is None:
+            all_embeddings = np.empty((0, 0), dtype=np.float32)
+
         total_end_time = time.time()
         total_duration = total_end_time - total_start_time
 
         # Final statistics
         print(f"\n🎉 [MEGA-BATCH] PROCESSING COMPLETE!")
-        print(f"🎉 [MEGA-BATCH] Total chunks: {len(all_embeddings):,}")
+        print(f"🎉 [MEGA-BATCH] Total chunks: {len(all_embeddings):,} ({all_embeddings.nbytes / 1024**2:.1f} MB float32 matrix)")
         print(f"🎉 [MEGA-BATCH] Total duration: {total_duration:.1f}s ({total_duration/60:.1f} minutes)")
-        print(f"🎉 [MEGA-BATCH] Average throughput: {len(all_embeddings)/total_duration:.0f} chunks/second")
+        print(f"🎉 [MEGA-BATCH] Average throughput: {len(all_embeddings)/max(total_duration, 1e-9):.0f} chunks/second")
         if total_batches != 0:
             print(f"🎉 [MEGA-BATCH] HTTP requests saved: ~{len(all_embeddings)-total_batches:,}")
             print(f"🎉 [MEGA-BATCH] Estimated cost savings: {((len(all_embeddings)-total_batches)/len(all_embeddings)*100):.1f}%")
 
         return all_embeddings
 
-    def retrieve_relevant_chunks(self, query: str, match_count: int = 10, section_filter: str = None, similarity_threshold: float = 0.6) -> list[dict]:
+    def _match_params(self, query_embedding: List[float], match_count: int, section_filter: str = None,
+                      include_embeddings: bool = False, from_date: str = None, to_date: str = None,
+                      embedding_version: EmbeddingVersion = None) -> Dict:
+        """match_article_chunks RPC parameters, with the query vector in settings.EMBEDDING_WIRE_ENCODING"""
+        encoding = settings.EMBEDDING_WIRE_ENCODING
+        params = {'match_count': match_count}
+        if embedding_version is not None and embedding_version.registered:
+            params['embedding_version'] = embedding_version.version  # the version the query was embedded for
+        if include_embeddings:
+            params['include_embeddings'] = True
+        if from_date:
+            params['from_date'] = from_date
+        if to_date:
+            params['to_date'] = to_date
+
+        if encoding == 'json':
+            params['query_embedding'] = query_embedding
+        else:
+            params['encoded_query_embedding'] = encode_embedding(query_embedding, encoding)
+            params['embedding_encoding'] = encoding
+
+        if section_filter:
+            params['section_filter'] = section_filter
+
+        return params
+
+    def _filter_matches(self, matches: list[dict], similarity_threshold: float) -> tuple[list[dict], list[str]]:
         """
-        Retrieve relevant chunks from Supabase using semantic search
-        
+        Keep match_article_chunks rows above the similarity threshold
+
+        Returns:
+            (chunks with content and metadata, article id of each of those chunks)
+        """
+        filtered_chunks = []
+        for item in matches:
+            if item['similarity'] >= similarity_threshold:
+                chunk = {
+                    'article_id': item['article_id'],
+                    'chunk_number': item['chunk_number'],
+                    'content': item['content'],
+                    'title': item['title'],
+                    'url': item['url'],
+                    'section': item['section'],
+                    'publication_date': item['publication_date'],
+                    'similarity': item['similarity']
+                }
+                if item.get('embedding') is not None:
+                    # pgvector arrives as its text form '[0.1,0.2,...]'
+                    embedding = item['embedding']
+                    chunk['embedding'] = np.array(json.loads(embedding) if isinstance(embedding, str) else embedding,
+                                                  dtype=np.float32)
+                filtered_chunks.append(chunk)
+
+        print(f"🔍 [DEBUG] Retrieved {len(matches)} total chunks, {len(filtered_chunks)} above threshold {similarity_threshold}")
+
+        # Print similarity scores for all chunks
+        for i, item in enumerate(matches):
+            above_threshold = "✅" if item['similarity'] >= similarity_threshold else "❌"
+            print(f"🔍 [DEBUG] Chunk {i+1} similarity: {item['similarity']:.4f} {above_threshold}")
+
+        return filtered_chunks, [item['article_id'] for item in matches if item['similarity'] >= similarity_threshold]
+
+    async def _get_async_supabase(self) -> AsyncClient:
+        """Return the async Supabase client for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        if self._async_supabase is None or self._async_supabase_loop is not loop:
+            self._async_supabase = await acreate_client(self.SUPABASE_URL, self.SUPABASE_KEY)
+            self._async_supabase_loop = loop
+        return self._async_supabase
+
+    async def aembed_query(self, query: str) -> tuple[EmbeddingVersion, List[float]]:
+        """
+        Embed a search query with the active version's model and query prompt
+
+        Returns:
+            (version, embedding), pass it as embedded_query to search several windows with a single embedding call
+        """
+        embedding_version = await self.embedding_versions.aactive()
+        formatted_query = embedding_version.format_query(query)
+        query_embedding = await self._embedding_model_for(embedding_version).aembed_query(formatted_query)
+        print(f"🔍 [DEBUG] Generated query embedding with {len(query_embedding)} dimensions ({embedding_version.version})")
+        return embedding_version, query_embedding
+
+    @profiled('aretrieve_relevant_chunks')
+    async def aretrieve_relevant_chunks(self, query: str, match_count: int = 10, section_filter: str = None, similarity_threshold: float = 0.6,
+                                        include_embeddings: bool = False, from_date: str = None, to_date: str = None,
+                                        embedded_query: tuple[EmbeddingVersion, List[float]] = None) -> list[dict]:
+        """
+        Retrieve relevant chunks from Supabase using semantic search, without blocking the event loop
+
         Args:
             query: Search query
             match_count: Number of chunks to retrieve
             section_filter: Optional section filter
             similarity_threshold: Minimum similarity score to include chunk (0.0 to 1.0)
-            
+            include_embeddings: Also return each chunk's embedding as a float32 array (for ContextPacker)
+            from_date: Optional inclusive lower publication bound (ISO date/timestamp), prunes older partitions
+            to_date: Optional exclusive upper publication bound (ISO date/timestamp)
+            embedded_query: (version, embedding) of the query from aembed_query(), embedded here when not given
+
         Returns:
             List of dictionaries containing chunk content and metadata above the similarity threshold
-            Each dict has: {'content': str, 'title': str, 'section': str, 'publication_date': str, 'similarity': float}
+            Each dict has: {'article_id': str, 'chunk_number': int, 'content': str, 'title': str, 'url': str, 'section': str,
+            'publication_date': str, 'similarity': float} and 'embedding' with include_embeddings
         """
         try:
-            # Generate embedding for the query with EmbeddingGemma format
-            formatted_query = f"task: search result | query: {query}"
-            query_embedding = self.embedding_model.embed_query(formatted_query)
-            print(f"🔍 [DEBUG] Generated query embedding with {len(query_embedding)} dimensions")
-            
-            # Call the match_article_chunks function
-            params = {
-                'query_embedding': query_embedding,
-                'match_count': match_count
-            }
-            
-            if section_filter:
-                params['section_filter'] = section_filter
-            
-            result = self.supabase.rpc('match_article_chunks', params).execute()
-            
-            if result.data:
-                # Filter chunks by similarity threshold and include metadata
-                filtered_chunks = []
-                for item in result.data:
-                    if item['similarity'] >= similarity_threshold:
-                        filtered_chunks.append({
-                            'content': item['content'],
-                            'title': item['title'],
-                            'section': item['section'],
-                            'publication_date': item['publication_date'],
-                            'similarity': item['similarity']
-                        })
-                
-                # Track retrieved articles - increment search_metadata counter
-                for item in result.data:
-                    if item['similarity'] >= similarity_threshold:
-                        try:
-                            # Increment the counter in search_metadata
-                            self.supabase.rpc('increment_search_count', {'target_article_id': item['article_id']}).execute()
-                        except Exception as e:
-                            print(f"⚠️ [DEBUG] Failed to update search counter for article {item['article_id']}: {e}")
-                
-                print(f"🔍 [DEBUG] Retrieved {len(result.data)} total chunks, {len(filtered_chunks)} above threshold {similarity_threshold}")
-                
-                # Print similarity scores for all chunks
-                for i, item in enumerate(result.data):
-                    above_threshold = "✅" if item['similarity'] >= similarity_threshold else "❌"
-                    print(f"🔍 [DEBUG] Chunk {i+1} similarity: {item['similarity']:.4f} {above_threshold}")
-                
-                return filtered_chunks
-            else:
+            supabase = await self._get_async_supabase()
+            # Search the vectors of the version the query was embedded with
+            embedding_version, query_embedding = embedded_query or await self.aembed_query(query)
+
+            params = self._match_params(query_embedding, match_count, section_filter, include_embeddings,
+                                        from_date, to_date, embedding_version)
+
+            result = await supabase.rpc('match_article_chunks', params).execute()
+
+            if not result.data:
                 print(f"⚠️ [DEBUG] No relevant chunks found for query")
                 return []
-                
+
+            filtered_chunks, retrieved_article_ids = self._filter_matches(result.data, similarity_threshold)
+
+            # Track retrieved articles - increment search_metadata counter for every chunk above the threshold
+            counters = await asyncio.gather(
+                *(supabase.rpc('increment_search_count', {'target_article_id': article_id}).execute()
+                  for article_id in retrieved_article_ids),
+                return_exceptions=True,
+            )
+            for article_id, counter in zip(retrieved_article_ids, counters):
+                if isinstance(counter, Exception):
+                    print(f"⚠️ [DEBUG] Failed to update search counter for article {article_id}: {counter}")
+
+            return filtered_chunks
+
         except Exception as e:
             print(f"🔥 [DEBUG] Error retrieving chunks: {e}")
             return []
 
-    def _process_extracted_article(self, extracted_data: Dict) -> bool:
+    def retrieve_relevant_chunks(self, query: str, match_count: int = 10, section_filter: str = None, similarity_threshold: float = 0.6,
+                                 include_embeddings: bool = False, from_date: str = None, to_date: str = None) -> list[dict]:
+        """Sync wrapper of aretrieve_relevant_chunks(), runs it on the shared event loop"""
+        return run_sync(self.aretrieve_relevant_chunks(query, match_count, section_filter, similarity_threshold,
+                                                       include_embeddings, from_date, to_date))
+
+    def _split_into_chunks(self, content: str) -> np.ndarray:
+        """Split content into overlapping chunks, returned as (start, end) offsets into content"""
+        return chunk_offsets(len(content))
+
+    @profiled('process_extracted_article')
+    def _process_extracted_article(self, extracted_data: Dict, checkpoint: IngestionCheckpoint = None) -> bool:
         """
-        Process extracted article: chunk, embed, and store
+        Process extracted article: chunk, embed, and store atomically with its chunks
+
+        With a checkpoint the embeddings are persisted before the upsert, and an article interrupted
+        by a crash is finished from its pending embeddings instead of being embedded again.
 
         Args:
             extracted_data: Dictionary with 'metadata' and 'content' from extract_article_text()
+            checkpoint: Optional run checkpoint
 
         Returns:
             True if successful, False otherwise
@@ -332,75 +438,170 @@ class SupabaseVectorStore:
         try:
             metadata = extracted_data['metadata']
             content = extracted_data['content']
+            article_id = metadata['article_id']
 
-            print(f"\n📰 [DEBUG] Processing article: {metadata.get('article_id', 'unknown')}")
+            print(f"\n📰 [DEBUG] Processing article: {article_id}")
 
             if not content:
                 print(f"❌ [DEBUG] No content to process")
                 return False
 
-            # Insert article metadata first
-            if not self._insert_guardian_article_metadata(metadata):
-                print(f"❌ [DEBUG] Failed to insert article metadata")
+            embedding_version = self.embedding_versions.active()
+            embedded_chunks = checkpoint.load_pending(article_id, content, embedding_version.version) if checkpoint else None
+            if embedded_chunks is None:
+                embedded_chunks = self._embed_chunks(content, self._split_into_chunks(content), embedding_version)
+                if embedded_chunks is None:
+                    return False
+                if checkpoint:
+                    checkpoint.save_pending(article_id, embedded_chunks, embedding_version.version)
+            else:
+                print(f"💾 [CHECKPOINT] Reusing {len(embedded_chunks)} pending embeddings for {article_id}")
+
+            status = self._upsert_articles([(metadata, embedded_chunks)],
+                                           embedding_version).get(article_id, 'error: no status returned')
+            if status.startswith('error'):
                 return False
 
-            # Split content into chunks
-            chunk_size = 1750
-            chunk_overlap = 275
-            chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size - chunk_overlap)]
-            print(f"🔧 [DEBUG] Split content into {len(chunks)} chunks")
+            if checkpoint:
+                checkpoint.mark_stored(article_id)
+            print(f"✅ [DEBUG] Successfully processed article {article_id} ({status})")
+            return True
 
-            if not chunks:
-                print(f"⚠️ [DEBUG] No chunks created from content")
-                return True
+        except Exception as e:
+            print(f"🔥 [DEBUG] Error processing extracted article: {e}")
+            return False
 
-            # Create embeddings for chunks
-            print(f"🚀 [DEBUG] Creating embeddings for {len(chunks)} chunks...")
-            embedded_chunks = self._create_mega_batch_embeddings(chunks)
+    def _store_page(self, extracted_articles: List[Dict], checkpoint: IngestionCheckpoint, stats: Dict,
+                    bulk_loader: PostgresBulkLoader = None) -> None:
+        """
+        Embed every new article of a page in one mega-batch and store them with bulk upserts
 
-            if not embedded_chunks:
-                print(f"❌ [DEBUG] Failed to create embeddings")
-                return False
+        Args:
+            extracted_articles: Articles of one page from extract_article_text()
+            checkpoint: Run checkpoint
+            stats: database_uploading statistics, updated in place
+            bulk_loader: Store through binary COPY instead of the REST upsert RPC
+        """
+        candidates = []
+        for extracted_article in extracted_articles:
+            if extracted_article['metadata']['article_id'] in checkpoint.stored_article_ids:
+                stats['skipped'] += 1
+            elif extracted_article['content']:
+                candidates.append(extracted_article)
+            else:
+                stats['failed'] += 1
+
+        # Every article of the page is embedded for (and stored as) the version that is active now
+        embedding_version = self.embedding_versions.active()
+
+        # Articles without pending embeddings that already exist were fully stored by another run
+        pending = {a['metadata']['article_id']: checkpoint.load_pending(a['metadata']['article_id'], a['content'],
+                                                                        embedding_version.version)
+                   for a in candidates}
+        existing = self._existing_article_ids([article_id for article_id, chunks in pending.items() if chunks is None])
+        for article_id in existing:
+            checkpoint.mark_stored(article_id)
+        stats['skipped'] += len(existing)
+        candidates = [a for a in candidates if a['metadata']['article_id'] not in existing]
+
+        # One embedding mega-batch (one float32 matrix) for every article that still needs embeddings
+        to_embed = [a for a in candidates if pending[a['metadata']['article_id']] is None]
+        article_offsets = [self._split_into_chunks(a['content']) for a in to_embed]
+        all_chunks = [a['content'][start:end] for a, offsets in zip(to_embed, article_offsets) for start, end in offsets.tolist()]
+
+        if all_chunks:
+            try:
+                page_embeddings = self._create_mega_batch_embeddings(all_chunks, embedding_version)
+            except Exception as e:
+                print(f"🔥 [DEBUG] Error embedding page: {e}")
+                stats['total_processed'] += len(candidates)
+                stats['failed'] += len(candidates)
+                return
+            del all_chunks  # the chunk strings are only needed for the embedding request
+
+            # Every article gets a view into the page matrix, rows are never copied
+            row = 0
+            for extracted_article, offsets in zip(to_embed, article_offsets):
+                article_id = extracted_article['metadata']['article_id']
+                pending[article_id] = EmbeddedChunks(extracted_article['content'], offsets,
+                                                     page_embeddings[row:row + len(offsets)])
+                row += len(offsets)
+                checkpoint.save_pending(article_id, pending[article_id], embedding_version.version)
+
+        stats['total_processed'] += len(candidates)
+        articles = [(a['metadata'], pending[a['metadata']['article_id']] or EmbeddedChunks.empty(a['content']))
+                    for a in candidates]
+        if bulk_loader:
+            statuses = bulk_loader.load(articles, embedding_version.version if embedding_version.registered else None)
+        else:
+            statuses = self._upsert_articles(articles, embedding_version)
+
+        for extracted_article in candidates:
+            article_id = extracted_article['metadata']['article_id']
+            if statuses.get(article_id, 'error').startswith('error'):
+                stats['failed'] += 1
+            else:
+                stats['successful'] += 1
+                checkpoint.mark_stored(article_id)
 
-            print(f"✅ [DEBUG] Created {len(embedded_chunks)} embeddings")
+    def _embed_chunks(self, content: str, offsets: np.ndarray,
+                      embedding_version: EmbeddingVersion = None) -> EmbeddedChunks | None:
+        """Embed the chunks at offsets of content, returns no chunks for empty offsets and None if embedding failed"""
+        print(f"🔧 [DEBUG] Split content into {len(offsets)} chunks")
 
-            # Insert chunks into database
-            if not self._insert_article_chunks(metadata['article_id'], embedded_chunks):
-                print(f"❌ [DEBUG] Failed to insert article chunks")
-                return False
+        if not len(offsets):
+            print(f"⚠️ [DEBUG] No chunks created from content")
+            return EmbeddedChunks.empty(content)
 
-            print(f"✅ [DEBUG] Successfully processed article {metadata['article_id']}")
-            return True
+        # Create embeddings for chunks
+        print(f"🚀 [DEBUG] Creating embeddings for {len(offsets)} chunks...")
+        embeddings = self._create_mega_batch_embeddings([content[start:end] for start, end in offsets.tolist()],
+                                                        embedding_version)
 
-        except Exception as e:
-            print(f"🔥 [DEBUG] Error processing extracted article: {e}")
-            return False
+        if len(embeddings) != len(offsets):
+            print(f"❌ [DEBUG] Failed to create embeddings")
+            return None
 
+        print(f"✅ [DEBUG] Created {len(embeddings)} embeddings")
+        return EmbeddedChunks(content, offsets, embeddings)
+
+    @profiled('database_uploading')
     def database_uploading(self,
                            query: str = None,
                            section: str = None,
                            from_date: str = None,
+                           to_date: str = None,
                            page_size: int = 200,
                            order_by: str = None,
-                           max_pages: int = 20) -> Dict:
+                           max_pages: int = 20,
+                           resume: bool = False,
+                           run_id: str = None,
+                           use_copy: bool = False,
+                           defer_index: bool = False) -> Dict:
         """
-        Fetch articles from Guardian API and process them
+        Fetch articles from Guardian API page by page and process them, checkpointing progress under settings.OUTPUT
 
         Args:
             query: Search query
             section: Guardian section (e.g. technology)
             from_date: Date filter (YYYY-MM-DD format)
+            to_date: Inclusive upper date filter (YYYY-MM-DD format)
             page_size: Number of articles per request
             order_by: Sort order for articles (e.g. relevance, newest, oldest)
             max_pages: Upper limit for page number
+            resume: Continue the interrupted run with the same parameters (or run_id) instead of starting over
+            run_id: Explicit checkpoint name, defaults to a hash of the parameters above
+            use_copy: Store through a direct Postgres connection (settings.DATABASE_URL) with binary COPY
+            defer_index: With use_copy, drop the chunk vector index for the run and rebuild it once at the end
 
         Returns:
-            Processing statistics
+            Processing statistics, 'completed' is True once every page was stored without failures
         """
         print(f"\n🚀 [DEBUG] Starting article fetch and processing...")
         print(f"🚀 [DEBUG] Query: {query}")
         print(f"🚀 [DEBUG] Section: {section}")
         print(f"🚀 [DEBUG] From date: {from_date}")
+        print(f"🚀 [DEBUG] To date: {to_date}")
         print(f"🚀 [DEBUG] Page size: {page_size}")
         print(f"🚀 [DEBUG] Order by: {order_by}")
 
@@ -410,51 +611,68 @@ class SupabaseVectorStore:
             'successful': 0,
             'failed': 0,
             'skipped': 0,
+            'completed': False,
             'start_time': datetime.now(),
             'end_time': None
         }
 
-        try:
-            # Fetch articles from Guardian API
-            extracted_articles = self.guardian_client.search_articles(
-                query=query,
-                section=section,
-                from_date=from_date,
-                page_size=page_size,
-                order_by=order_by,
-                max_pages=max_pages,
-            )
+        run_params = {'query': query, 'section': section, 'from_date': from_date,
+                      'page_size': page_size, 'order_by': order_by, 'max_pages': max_pages}
+        if to_date:
+            run_params['to_date'] = to_date  # only when set, so run ids of earlier runs stay valid
+        checkpoint = IngestionCheckpoint(run_params, run_id=run_id, resume=resume)
+        bulk_loader = PostgresBulkLoader() if use_copy else None
+        index_dropped = False
 
-            if not extracted_articles:
-                print(f"❌ [DEBUG] Failed to fetch articles from API")
+        try:
+            if checkpoint.completed:
+                print(f"✅ [CHECKPOINT] Run {checkpoint.run_id} already completed, nothing to resume")
+                stats['completed'] = True
+                stats['end_time'] = datetime.now()
                 return stats
 
-            stats['total_fetched'] = len(extracted_articles)
-            print(f"📡 [DEBUG] Fetched {len(extracted_articles)} articles from API")
-
-            # Process each article individually
-            print(f"\n🚀 [DEBUG] Processing {len(extracted_articles)} articles...")
-
-            for i, extracted_article in enumerate(extracted_articles):
-                try:
-                    stats['total_processed'] += 1
-                    print(f"\n📰 [DEBUG] Processing article {i+1}/{len(extracted_articles)}")
-
-                    if self._process_extracted_article(extracted_article):
-                        stats['successful'] += 1
-                        print(f"✅ [DEBUG] Article {i+1} processed successfully")
-                    else:
-                        stats['failed'] += 1
-                        print(f"❌ [DEBUG] Article {i+1} processing failed")
-
-                except Exception as e:
-                    stats['failed'] += 1
-                    print(f"🔥 [DEBUG] Error processing article {i+1}: {e}")
+            base_params = self.guardian_client._build_search_params(query=query, section=section, page_size=page_size,
+                                                                    from_date=from_date, to_date=to_date,
+                                                                    order_by=order_by, max_pages=max_pages)
+            interrupted = False
+
+            if bulk_loader and defer_index:
+                bulk_loader.drop_vector_index()
+                index_dropped = True
+
+            for page in range(1, max_pages + 1):
+                if checkpoint.exhausted_at_page is not None and page >= checkpoint.exhausted_at_page:
+                    break
+
+                # Fetch the page from Guardian API unless a previous attempt already saved it
+                extracted_articles = checkpoint.load_page(page)
+                if extracted_articles is None:
+                    extracted_articles = self.guardian_client.fetch_page(page, base_params)
+                    if extracted_articles is None:
+                        print(f"❌ [DEBUG] Failed to fetch page {page}, rerun with resume=True to continue")
+                        interrupted = True
+                        break
+                    if not extracted_articles:
+                        checkpoint.mark_exhausted(page)
+                        break
+                    checkpoint.save_page(page, extracted_articles)
+                else:
+                    print(f"💾 [CHECKPOINT] Loaded page {page} ({len(extracted_articles)} articles) from checkpoint")
+
+                stats['total_fetched'] += len(extracted_articles)
+                print(f"📡 [DEBUG] Processing {len(extracted_articles)} articles from page {page}")
+
+                self._store_page(extracted_articles, checkpoint, stats, bulk_loader=bulk_loader)
+
+            if not interrupted and stats['failed'] == 0:
+                checkpoint.mark_completed()
+                stats['completed'] = True
 
             stats['end_time'] = datetime.now()
             duration = stats['end_time'] - stats['start_time']
 
             print(f"\n📊 [DEBUG] Processing completed!")
+            print(f"📊 [DEBUG] Run id: {checkpoint.run_id}")
             print(f"📊 [DEBUG] Total fetched: {stats['total_fetched']}")
             print(f"📊 [DEBUG] Total processed: {stats['total_processed']}")
             print(f"📊 [DEBUG] Successful: {stats['successful']}")
@@ -466,9 +684,15 @@ class SupabaseVectorStore:
 
         except Exception as e:
             print(f"🔥 [DEBUG] Error in fetch and process: {e}")
+            print(f"💾 [CHECKPOINT] Progress saved, rerun with resume=True to continue run {checkpoint.run_id}")
             stats['end_time'] = datetime.now()
             return stats
 
+        finally:
+            if index_dropped:
+                bulk_loader.build_vector_index()
+            checkpoint.close()
+
 
 def main():
     """Main execution flow"""
@@ -484,7 +708,8 @@ def main():
         stats = supabase_store.database_uploading(query="artificial intelligence",
                                                   page_size=200,
                                                   order_by="relevance",
-                                                  max_pages=5)
+                                                  max_pages=5,
+                                                  resume="--resume" in sys.argv)
 
 
         if stats:
@@ -18,25 +18,186 @@
       search_count integer default 0 not null,   -- Track how many times article was searched
       created_at timestamp with time zone default timezone('utc'::text, now()) not null
   );
-  -- Table 2: Article Chunks with Embeddings
+  -- Table 2: Article Chunks with Embeddings, range partitioned by publication month
+  -- Chunks carry their article's publication_date and section, so searches filter and prune partitions without
+  -- touching guardian_articles. Existing flat tables: see migrations/001_partition_article_chunks.sql
   create table article_chunks (
-      id serial primary key,                  -- Auto-incrementing primary key
+      id bigserial,                           -- Auto-incrementing id
       article_id varchar not null references guardian_articles(article_id) on delete cascade,  -- Custom article identifier (e.g., technology/2025/aug/05/google-step-artificial-general-intelligence-deepmind-agi)
       chunk_number integer not null,
-      content text not null,                     -- Chunk of full_text
-      embedding vector(768) not null,          -- Nomic embedding
+      publication_date timestamp with time zone not null,  -- Copy of guardian_articles.publication_date (partition key)
+      section varchar not null,                -- Copy of guardian_articles.section
+      content text,                              -- Chunk of full_text, null when stored as offsets
+      start_offset integer,                      -- [start_offset, end_offset) into article_full_text(title, body_text)
+      end_offset integer,
+      embedding vector(768),                   -- Embedding of the baseline version (embedding_versions.storage = 'article_chunks')
       created_at timestamp with time zone default timezone('utc'::text, now()) not null,
 
+      check (content is not null or (start_offset is not null and end_offset is not null)),
+      primary key (id, publication_date),
       -- Prevent duplicate chunks for same article
-      unique(article_id, chunk_number)
+      unique(article_id, chunk_number, publication_date)
+  ) partition by range (publication_date);
+
+  -- Catches rows of months without a partition, ensure_article_chunk_partition() keeps it empty
+  create table article_chunks_default partition of article_chunks default;
+
+  -- Vector index for similarity search, built per partition (PostgresBulkLoader can drop and rebuild it around large backfills)
+  create index article_chunks_embedding_idx on article_chunks using hnsw (embedding vector_cosine_ops);
+
+  -- Embedding versions: the model and prompt format a set of chunk embeddings was built with
+  -- Exactly one version is active; retrieval and ingestion use it. A new version is created in 'building' state,
+  -- filled by db/reembedding.py from the stored chunk text and switched to with activate_embedding_version().
+  -- Existing databases: see migrations/003_embedding_versions.sql
+  create table embedding_versions (
+      version varchar primary key,             -- e.g. embeddinggemma-v1
+      model varchar not null,                  -- Ollama embedding model
+      document_prompt text not null,           -- Template for chunk texts, {text} is replaced
+      query_prompt text not null,              -- Template for search queries
+      dimensions integer not null,
+      status varchar not null default 'building' check (status in ('building', 'active', 'retired')),
+      storage varchar not null default 'article_chunk_embeddings',  -- Table holding the embeddings
+      created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+      activated_at timestamp with time zone
   );
 
+  create unique index embedding_versions_one_active on embedding_versions ((true)) where status = 'active';
+
+  insert into embedding_versions (version, model, document_prompt, query_prompt, dimensions, status, storage, activated_at)
+  values ('embeddinggemma-v1', 'embeddinggemma', 'title: none | text: {text}', 'task: search result | query: {text}',
+          768, 'active', 'article_chunks', now());
+
+  -- Embeddings of every version except the baseline, one row per chunk and version
+  -- Vector indexes are partial per version (created by create_embedding_version), so versions may differ in dimensions
+  create table article_chunk_embeddings (
+      chunk_id bigint not null,
+      publication_date timestamp with time zone not null,  -- Copy of the chunk's partition key
+      version varchar not null references embedding_versions(version) on delete cascade,
+      embedding vector not null,
+      created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+
+      primary key (chunk_id, publication_date, version),
+      foreign key (chunk_id, publication_date) references article_chunks(id, publication_date) on delete cascade
+  );
+
+  create index article_chunk_embeddings_version_idx on article_chunk_embeddings (version, chunk_id);
+
+  -- Text the chunk offsets point into, the same title + body join as extract_article_text() in api_clients.py
+  create or replace function article_full_text (title varchar, body_text text)
+  returns text
+  language sql immutable parallel safe
+  as $$
+    select concat_ws(E'\n\n', nullif(title, ''), nullif(body_text, ''));
+  $$;
+
+  -- Create the monthly partition holding ts (article_chunks_yYYYYmMM) unless it exists; indexes are inherited
+  create or replace function ensure_article_chunk_partition (ts timestamp with time zone)
+  returns text
+  language plpgsql
+  as $$
+  declare
+    month_start date := date_trunc('month', ts at time zone 'utc')::date;
+    partition_name text := format('article_chunks_y%sm%s', to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+  begin
+    if to_regclass(partition_name) is null then
+      begin
+        execute format(
+          'create table %I partition of article_chunks for values from (%L) to (%L)',
+          partition_name, month_start::timestamp at time zone 'utc', (month_start + interval '1 month')::timestamp at time zone 'utc'
+        );
+      exception when duplicate_table then
+        null;  -- created by a concurrent writer
+      end;
+    end if;
+    return partition_name;
+  end;
+  $$;
+
+  -- Detach every monthly partition that ends on or before cutoff; the detached tables keep their rows and indexes
+  -- and can be dumped, moved to cheaper storage or dropped
+  create or replace function detach_article_chunk_partitions (cutoff timestamp with time zone)
+  returns setof text
+  language plpgsql
+  as $$
+  declare
+    part record;
+  begin
+    for part in
+      select c.relname, pg_get_expr(c.relpartbound, c.oid) as bound
+      from pg_inherits i
+      join pg_class c on c.oid = i.inhrelid
+      where i.inhparent = 'article_chunks'::regclass and c.relname ~ '^article_chunks_y[0-9]{4}m[0-9]{2}$'
+      order by c.relname
+    loop
+      if (to_date(substring(part.relname from 17), 'YYYY"m"MM') + interval '1 month') <= cutoff then
+        -- Versioned embeddings reference the partition's rows and would block the detach
+        execute format('delete from article_chunk_embeddings e using %I p where e.chunk_id = p.id '
+                       'and e.publication_date = p.publication_date', part.relname);
+        execute format('alter table article_chunks detach partition %I', part.relname);
+        return next part.relname;
+      end if;
+    end loop;
+  end;
+  $$;
+
+  -- Decode a compact embedding (base64 of little-endian float32 or float16 bytes, see embedding_codec.py)
+  -- Cast the result to halfvec where a halfvec column is wanted.
+  create or replace function decode_embedding (encoded text, encoding text default 'float32')
+  returns vector
+  language sql immutable parallel safe
+  as $$
+    with raw as (
+      select decode(encoded, 'base64') as b, case when encoding = 'float16' then 2 else 4 end as width
+    ), words as (
+      select
+        i,
+        case when width = 2
+          then get_byte(b, 2 * i)::bigint | (get_byte(b, 2 * i + 1)::bigint << 8)
+          else get_byte(b, 4 * i)::bigint | (get_byte(b, 4 * i + 1)::bigint << 8)
+             | (get_byte(b, 4 * i + 2)::bigint << 16) | (get_byte(b, 4 * i + 3)::bigint << 24)
+        end as bits
+      from raw, generate_series(0, length(b) / width - 1) as i
+    )
+    select array_agg(
+      case when encoding = 'float16' then
+        (case when (bits >> 15) & 1 = 1 then -1.0 else 1.0 end)::double precision *
+        (case when (bits >> 10) & 31 = 0
+              then ((bits & 1023)::double precision / 1024) * power(2::double precision, -14)
+              else (1 + (bits & 1023)::double precision / 1024) * power(2::double precision, ((bits >> 10) & 31) - 15)
+         end)
+      else
+        (case when (bits >> 31) & 1 = 1 then -1.0 else 1.0 end)::double precision *
+        (case when (bits >> 23) & 255 = 0
+              then ((bits & 8388607)::double precision / 8388608) * power(2::double precision, -126)
+              else (1 + (bits & 8388607)::double precision / 8388608) * power(2::double precision, ((bits >> 23) & 255) - 127)
+         end)
+      end order by i
+    )::real[]::vector
+    from words;
+  $$;
+
   -- Function to search chunks with metadata
-  -- or just create function
+  -- The query vector is passed either as query_embedding (JSON) or as encoded_query_embedding + embedding_encoding
+  -- include_embeddings returns the chunk vectors as well, for MMR diversification on the client
+  -- from_date / to_date limit the search to a publication window, only the partitions of that window are scanned:
+  --   the bounds are plain partition key comparisons (null = +-infinity), which Postgres also prunes with when the
+  --   function runs on a cached generic plan; "from_date is null or ..." would scan every partition there
+  -- embedding_version names the version the query was embedded for (default: the active one), so a query embedded
+  -- just before a version switch still searches vectors of its own model
+  drop function if exists match_article_chunks(vector, int, varchar);
+  drop function if exists match_article_chunks(vector, int, varchar, text, text);
+  drop function if exists match_article_chunks(vector, int, varchar, text, text, boolean);
+  drop function if exists match_article_chunks(vector, int, varchar, text, text, boolean, timestamp with time zone, timestamp with time zone);
   create or replace function match_article_chunks (
-    query_embedding vector(768),
+    query_embedding vector default null,
     match_count int default 3,
-    section_filter varchar default null
+    section_filter varchar default null,
+    encoded_query_embedding text default null,
+    embedding_encoding text default 'float32',
+    include_embeddings boolean default false,
+    from_date timestamp with time zone default null,
+    to_date timestamp with time zone default null,
+    embedding_version varchar default null
   ) returns table (
     chunk_id bigint,
     article_id varchar,
@@ -46,30 +207,391 @@
     section varchar,
     url varchar,
     publication_date timestamp with time zone,
-    similarity float
+    similarity float,
+    embedding vector
   )
   language plpgsql
   as $$
+  declare
+    q vector := coalesce(query_embedding, decode_embedding(encoded_query_embedding, embedding_encoding));
+    target record;
   begin
-    return query
-    select
-      ac.id as chunk_id,
-      ac.article_id,
-      ac.chunk_number,
-      ac.content,
-      ga.title,
-      ga.section,
-      ga.url,
-      ga.publication_date,
-      1 - (ac.embedding <=> query_embedding) as similarity
+    select ev.version, ev.storage, ev.dimensions into target
+    from embedding_versions ev
+    where case when match_article_chunks.embedding_version is null then ev.status = 'active'
+               else ev.version = match_article_chunks.embedding_version end;
+    if not found then
+      raise exception 'unknown embedding version %', coalesce(match_article_chunks.embedding_version, '(active)');
+    end if;
+
+    -- Rank inside the embedding table first, join guardian_articles only for the returned rows
+    -- Offset-stored chunks are cut out of the article text here, for the returned rows only
+    if target.storage = 'article_chunks' then
+      return query
+      with top_chunks as (
+        select ac.id, ac.article_id, ac.chunk_number, ac.content, ac.start_offset, ac.end_offset, ac.section,
+               ac.publication_date, ac.embedding,
+               ac.embedding <=> q as distance
+        from article_chunks ac
+        where (section_filter is null or ac.section = section_filter)
+          and ac.publication_date >= coalesce(from_date, '-infinity')
+          and ac.publication_date < coalesce(to_date, 'infinity')
+        order by ac.embedding <=> q
+        limit match_count
+      )
+      select
+        tc.id as chunk_id,
+        tc.article_id,
+        tc.chunk_number,
+        coalesce(tc.content, substring(article_full_text(ga.title, ga.body_text)
+                                       from tc.start_offset + 1 for tc.end_offset - tc.start_offset)) as content,
+        ga.title,
+        tc.section,
+        ga.url,
+        tc.publication_date,
+        1 - tc.distance as similarity,
+        case when include_embeddings then tc.embedding::vector end as embedding
+      from top_chunks tc
+      join guardian_articles ga on ga.article_id = tc.article_id
+      order by tc.distance;
+    else
+      -- The cast to the version's dimensions and the version predicate match its partial HNSW index
+      return query execute format($query$
+        with top_chunks as (
+          select ac.id, ac.article_id, ac.chunk_number, ac.content, ac.start_offset, ac.end_offset, ac.section,
+                 ac.publication_date, e.embedding,
+                 e.embedding::vector(%1$s) <=> $1::vector(%1$s) as distance
+          from article_chunk_embeddings e
+          join article_chunks ac on ac.id = e.chunk_id and ac.publication_date = e.publication_date
+          where e.version = %2$L
+            and ($2::varchar is null or ac.section = $2)
+            and ac.publication_date >= coalesce($3::timestamptz, '-infinity')
+            and ac.publication_date < coalesce($4::timestamptz, 'infinity')
+            and e.publication_date >= coalesce($3::timestamptz, '-infinity')
+            and e.publication_date < coalesce($4::timestamptz, 'infinity')
+          order by e.embedding::vector(%1$s) <=> $1::vector(%1$s)
+          limit $5
+        )
+        select
+          tc.id,
+          tc.article_id,
+          tc.chunk_number,
+          coalesce(tc.content, substring(article_full_text(ga.title, ga.body_text)
+                                         from tc.start_offset + 1 for tc.end_offset - tc.start_offset)),
+          ga.title,
+          tc.section,
+          ga.url,
+          tc.publication_date,
+          1 - tc.distance,
+          case when $6 then tc.embedding end
+        from top_chunks tc
+        join guardian_articles ga on ga.article_id = tc.article_id
+        order by tc.distance
+      $query$, target.dimensions, target.version)
+      using q, section_filter, from_date, to_date, match_count, include_embeddings;
+    end if;
+  end;
+  $$;
+
+  -- Function to upsert many articles with their chunks in one round trip
+  -- articles: [{article_id, title, section, publication_date, url, body_text, word_count, char_count, fetch_time,
+  --             chunks: [{chunk_number, content, start_offset, end_offset, embedding}]}]
+  --   content may be null when start_offset / end_offset are given (offset storage mode)
+  -- embedding_encoding: 'json' (float list) or 'float32'/'float16' (base64 strings, see decode_embedding)
+  -- embedding_version: version the embeddings were created with (default: the active one); the call fails when it
+  --   is not the active version, so embeddings of a model that was just switched away from are never stored
+  -- Every article runs in its own subtransaction: it is stored all-or-nothing with its chunks, a failing article
+  -- is reported without aborting the rest, and retries are idempotent.
+  drop function if exists upsert_articles_with_chunks(jsonb);
+  drop function if exists upsert_articles_with_chunks(jsonb, text);
+  create or replace function upsert_articles_with_chunks (articles jsonb, embedding_encoding text default 'json',
+                                                          embedding_version varchar default null)
+  returns table (
+    article_id varchar,
+    status text,
+    chunk_count integer
+  )
+  language plpgsql
+  as $$
+  #variable_conflict use_column
+  declare
+    a jsonb;
+    was_inserted boolean;
+    upserted_chunks integer;
+    target record;
+  begin
+    -- The share lock makes activate_embedding_version() wait for this call, and this call fail after a switch
+    select ev.version, ev.storage into target
+    from embedding_versions ev
+    where ev.status = 'active'
+      and (upsert_articles_with_chunks.embedding_version is null or ev.version = upsert_articles_with_chunks.embedding_version)
+    for share;
+    if not found then
+      raise exception 'embedding version % is not active', upsert_articles_with_chunks.embedding_version;
+    end if;
+
+    for a in select value from jsonb_array_elements(articles) loop
+      begin
+        insert into guardian_articles (article_id, title, section, publication_date, url, summary, body_text,
+                                       trail_text, word_count, char_count, fetch_time)
+        values (
+          a->>'article_id',
+          a->>'title',
+          a->>'section',
+          (a->>'publication_date')::timestamp with time zone,
+          a->>'url',
+          a->>'summary',
+          a->>'body_text',
+          a->>'trail_text',
+          coalesce((a->>'word_count')::integer, 0),
+          coalesce((a->>'char_count')::integer, 0),
+          coalesce((a->>'fetch_time')::timestamp with time zone, now())
+        )
+        on conflict (article_id) do update set
+          title = excluded.title,
+          section = excluded.section,
+          publication_date = excluded.publication_date,
+          url = excluded.url,
+          summary = excluded.summary,
+          body_text = excluded.body_text,
+          trail_text = excluded.trail_text,
+          word_count = excluded.word_count,
+          char_count = excluded.char_count,
+          fetch_time = excluded.fetch_time
+        returning (xmax = 0) into was_inserted;
+
+        -- Chunks live in the partition of the article's month; a corrected publication date moves them
+        perform ensure_article_chunk_partition((a->>'publication_date')::timestamp with time zone);
+        delete from article_chunks ac
+        where ac.article_id = a->>'article_id'
+          and ac.publication_date <> (a->>'publication_date')::timestamp with time zone;
+
+        insert into article_chunks (article_id, chunk_number, publication_date, section, content,
+                                    start_offset, end_offset, embedding)
+        select
+          a->>'article_id',
+          (c->>'chunk_number')::integer,
+          (a->>'publication_date')::timestamp with time zone,
+          a->>'section',
+          c->>'content',
+          (c->>'start_offset')::integer,
+          (c->>'end_offset')::integer,
+          case when target.storage <> 'article_chunks' then null
+               when embedding_encoding = 'json' then (c->'embedding')::text::vector(768)
+               else decode_embedding(c->>'embedding', embedding_encoding)::vector(768)
+          end
+        from jsonb_array_elements(coalesce(a->'chunks', '[]'::jsonb)) c
+        on conflict (article_id, chunk_number, publication_date) do update set
+          section = excluded.section,
+          content = excluded.content,
+          start_offset = excluded.start_offset,
+          end_offset = excluded.end_offset,
+          embedding = excluded.embedding;
+        get diagnostics upserted_chunks = row_count;
+
+        -- Rewritten chunks keep only the embedding of the version written now, other versions re-embed them
+        delete from article_chunk_embeddings e
+        using article_chunks ac
+        where ac.article_id = a->>'article_id'
+          and e.chunk_id = ac.id and e.publication_date = ac.publication_date
+          and e.version <> target.version;
+
+        if target.storage <> 'article_chunks' then
+          insert into article_chunk_embeddings (chunk_id, publication_date, version, embedding)
+          select
+            ac.id,
+            ac.publication_date,
+            target.version,
+            case when embedding_encoding = 'json'
+              then (c->'embedding')::text::vector
+              else decode_embedding(c->>'embedding', embedding_encoding)
+            end
+          from jsonb_array_elements(coalesce(a->'chunks', '[]'::jsonb)) c
+          join article_chunks ac
+            on ac.article_id = a->>'article_id'
+           and ac.chunk_number = (c->>'chunk_number')::integer
+           and ac.publication_date = (a->>'publication_date')::timestamp with time zone
+          on conflict (chunk_id, publication_date, version) do update set
+            embedding = excluded.embedding;
+        end if;
+
+        -- Drop chunks left over from a longer previous version of the article
+        delete from article_chunks ac
+        where ac.article_id = a->>'article_id'
+          and ac.chunk_number >= jsonb_array_length(coalesce(a->'chunks', '[]'::jsonb));
+
+        article_id := a->>'article_id';
+        status := case when was_inserted then 'inserted' else 'updated' end;
+        chunk_count := upserted_chunks;
+        return next;
+      exception when others then
+        article_id := a->>'article_id';
+        status := 'error: ' || sqlerrm;
+        chunk_count := 0;
+        return next;
+      end;
+    end loop;
+  end;
+  $$;
+
+  -- Register a new embedding version in 'building' state, with a partial HNSW index over its rows
+  create or replace function create_embedding_version (
+    new_version varchar,
+    model varchar,
+    dimensions integer,
+    document_prompt text,
+    query_prompt text
+  ) returns void
+  language plpgsql
+  as $$
+  begin
+    insert into embedding_versions (version, model, document_prompt, query_prompt, dimensions, status, storage)
+    values (new_version, model, document_prompt, query_prompt, dimensions, 'building', 'article_chunk_embeddings');
+
+    execute format(
+      'create index if not exists %I on article_chunk_embeddings using hnsw ((embedding::vector(%s)) vector_cosine_ops) where version = %L',
+      'article_chunk_embeddings_' || left(md5(new_version), 12) || '_idx', dimensions, new_version
+    );
+  end;
+  $$;
+
+  -- Next chunks (by id, after after_chunk_id) without an embedding of target_version, with their materialized text
+  -- content_md5 lets store_chunk_embeddings() drop embeddings of chunks rewritten in the meantime
+  create or replace function reembedding_batch (
+    target_version varchar,
+    after_chunk_id bigint default 0,
+    batch_size integer default 256
+  ) returns table (
+    chunk_id bigint,
+    publication_date timestamp with time zone,
+    content text,
+    content_md5 text
+  )
+  language sql stable
+  as $$
+    select ac.id, ac.publication_date, t.content, md5(t.content)
     from article_chunks ac
-    join guardian_articles ga on ac.article_id = ga.article_id
-    where (section_filter is null or ga.section = section_filter)
-    order by ac.embedding <=> query_embedding
-    limit match_count;
+    join guardian_articles ga on ga.article_id = ac.article_id
+    cross join lateral (
+      select coalesce(ac.content, substring(article_full_text(ga.title, ga.body_text)
+                                            from ac.start_offset + 1 for ac.end_offset - ac.start_offset)) as content
+    ) t
+    where ac.id > after_chunk_id
+      and not exists (
+        select 1 from article_chunk_embeddings e
+        where e.chunk_id = ac.id and e.publication_date = ac.publication_date and e.version = target_version
+      )
+    order by ac.id
+    limit batch_size;
+  $$;
+
+  -- Store re-embedded chunks of a version: [{chunk_id, publication_date, content_md5, embedding}]
+  -- Chunks that were deleted or whose text changed since reembedding_batch() are skipped
+  create or replace function store_chunk_embeddings (
+    target_version varchar,
+    embeddings jsonb,
+    embedding_encoding text default 'json'
+  ) returns integer
+  language plpgsql
+  as $$
+  declare
+    stored integer;
+  begin
+    if not exists (select 1 from embedding_versions ev
+                   where ev.version = target_version and ev.storage = 'article_chunk_embeddings' and ev.status <> 'retired') then
+      raise exception 'embedding version % cannot be re-embedded', target_version;
+    end if;
+
+    insert into article_chunk_embeddings (chunk_id, publication_date, version, embedding)
+    select
+      ac.id,
+      ac.publication_date,
+      target_version,
+      case when embedding_encoding = 'json'
+        then (e->'embedding')::text::vector
+        else decode_embedding(e->>'embedding', embedding_encoding)
+      end
+    from jsonb_array_elements(embeddings) e
+    join article_chunks ac
+      on ac.id = (e->>'chunk_id')::bigint
+     and ac.publication_date = (e->>'publication_date')::timestamp with time zone
+    join guardian_articles ga on ga.article_id = ac.article_id
+    where md5(coalesce(ac.content, substring(article_full_text(ga.title, ga.body_text)
+                                             from ac.start_offset + 1 for ac.end_offset - ac.start_offset))) = e->>'content_md5'
+    on conflict (chunk_id, publication_date, version) do update set
+      embedding = excluded.embedding;
+    get diagnostics stored = row_count;
+    return stored;
+  end;
+  $$;
+
+  -- Make target_version the active version in one transaction, retiring the previous one (its embeddings are kept)
+  -- Waits for running upserts (they hold a share lock on the active version) and refuses while any chunk lacks
+  -- an embedding of target_version
+  create or replace function activate_embedding_version (target_version varchar)
+  returns varchar
+  language plpgsql
+  as $$
+  declare
+    previous_version varchar;
+    missing bigint;
+  begin
+    perform 1 from embedding_versions ev where ev.status = 'active' or ev.version = target_version for update;
+    select ev.version into previous_version from embedding_versions ev where ev.status = 'active';
+
+    if not exists (select 1 from embedding_versions ev where ev.version = target_version) then
+      raise exception 'unknown embedding version %', target_version;
+    end if;
+    if previous_version = target_version then
+      return previous_version;
+    end if;
+
+    if exists (select 1 from embedding_versions ev where ev.version = target_version and ev.storage = 'article_chunks') then
+      select count(*) into missing from article_chunks ac where ac.embedding is null;
+    else
+      select count(*) into missing
+      from article_chunks ac
+      where not exists (
+        select 1 from article_chunk_embeddings e
+        where e.chunk_id = ac.id and e.publication_date = ac.publication_date and e.version = target_version
+      );
+    end if;
+    if missing > 0 then
+      raise exception 'embedding version % is missing % chunk embedding(s)', target_version, missing;
+    end if;
+
+    update embedding_versions set status = 'retired' where version = previous_version;
+    update embedding_versions set status = 'active', activated_at = now() where version = target_version;
+    return previous_version;
   end;
   $$;
 
+  -- Every embedding version with the number of chunks it has an embedding for
+  create or replace function embedding_version_status ()
+  returns table (
+    version varchar,
+    model varchar,
+    dimensions integer,
+    status varchar,
+    embedded_chunks bigint,
+    total_chunks bigint
+  )
+  language sql stable
+  as $$
+    select
+      ev.version,
+      ev.model,
+      ev.dimensions,
+      ev.status,
+      case when ev.storage = 'article_chunks'
+        then (select count(*) from article_chunks ac where ac.embedding is not null)
+        else (select count(*) from article_chunk_embeddings e where e.version = ev.version)
+      end,
+      (select count(*) from article_chunks)
+    from embedding_versions ev
+    order by ev.created_at;
+  $$;
+
   -- Function to increment search count
   CREATE OR REPLACE FUNCTION increment_search_count(target_article_id varchar)
   RETURNS void
@@ -82,9 +604,76 @@
   END;
   $$;
 
+  -- Table 3: Semantic answer cache (final agent answers keyed by query embedding)
+  -- Existing databases: see migrations/005_answer_cache.sql
+  create table answer_cache (
+      id bigserial primary key,
+      query text not null,
+      answer text not null,
+      sources jsonb not null default '[]'::jsonb,  -- [{title, section, url, publication_date}]
+      sections varchar[] not null default '{}',    -- Guardian sections the answer was built from
+      embedding vector(768) not null,              -- EmbeddingGemma "sentence similarity" query embedding
+      created_at timestamp with time zone default timezone('utc'::text, now()) not null
+  );
+
+  create index answer_cache_embedding_idx on answer_cache using hnsw (embedding vector_cosine_ops);
+  create index answer_cache_sections_idx on answer_cache using gin (sections);
+
+  -- Function to find a fresh cached answer for a similar query
+  create or replace function match_answer_cache (
+    query_embedding vector(768),
+    match_count int default 1,
+    max_age_seconds int default 3600
+  ) returns table (
+    id bigint,
+    query text,
+    answer text,
+    sources jsonb,
+    created_at timestamp with time zone,
+    similarity float
+  )
+  language plpgsql
+  as $$
+  begin
+    return query
+    select
+      c.id,
+      c.query,
+      c.answer,
+      c.sources,
+      c.created_at,
+      1 - (c.embedding <=> query_embedding) as similarity
+    from answer_cache c
+    where c.created_at > now() - make_interval(secs => max_age_seconds)
+    order by c.embedding <=> query_embedding
+    limit match_count;
+  end;
+  $$;
+
+  -- New articles invalidate every cached answer built from the same section. Runs as the function owner, so the
+  -- delete works without a public delete policy on answer_cache
+  create or replace function invalidate_answer_cache()
+  returns trigger
+  language plpgsql
+  security definer
+  set search_path = public
+  as $$
+  begin
+    delete from answer_cache where new.section = any(sections);
+    return new;
+  end;
+  $$;
+
+  create trigger guardian_articles_invalidate_answer_cache
+    after insert on guardian_articles
+    for each row execute function invalidate_answer_cache();
+
   -- Enable RLS
   alter table guardian_articles enable row level security;
   alter table article_chunks enable row level security;
+  alter table answer_cache enable row level security;
+  alter table embedding_versions enable row level security;
+  alter table article_chunk_embeddings enable row level security;
 
   -- Public read access policies
   create policy "Allow public read access on articles"
@@ -100,6 +689,19 @@
   create policy "Allow public insert on chunks"
     on article_chunks for insert to public with check (true);
 
+  -- Read-only for the public key: entries are written with the service key and invalidated by the trigger above
+  create policy "Allow public read access on answer cache"
+    on answer_cache for select to public using (true);
+
+  create policy "Allow public read access on embedding versions"
+    on embedding_versions for select to public using (true);
+
+  create policy "Allow public read access on chunk embeddings"
+    on article_chunk_embeddings for select to public using (true);
+
+  create policy "Allow public insert on chunk embeddings"
+    on article_chunk_embeddings for insert to public with check (true);
+
   -- UPDATE policy for search_count
   CREATE POLICY "Allow public update search_count on guardian_articles"
     ON guardian_articles FOR UPDATE TO public
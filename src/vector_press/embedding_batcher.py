@@ -0,0 +1,98 @@
+from concurrent.futures import Future
+from typing import List
+import threading
+import asyncio
+import queue
+import time
+
+from config import settings
+
+
+class QueryEmbeddingBatcher:
+    """
+    Thread- and asyncio-safe wrapper of an embedding model that coalesces concurrent embed_query calls
+
+    Queries arriving within window_seconds of the first waiting one are embedded together with a single
+    embed_documents request on a background thread, and every caller gets its own row back. While a request is in
+    flight the next queries queue up, so batches grow with load instead of each query paying the full round trip.
+    Document embedding (ingestion, re-embedding) and every other attribute go straight to the wrapped model.
+    """
+
+    def __init__(self, embedding_model,
+                 window_seconds: float = settings.QUERY_EMBED_BATCH_WINDOW,
+                 max_batch_size: int = settings.QUERY_EMBED_MAX_BATCH):
+        """
+        Args:
+            embedding_model: LangChain embeddings (e.g. OllamaEmbeddings) whose embed_query equals embed_documents
+                of a single text
+            window_seconds: How long the first query of a batch waits for others
+            max_batch_size: Texts per embed_documents request, a full batch is sent without waiting for the window
+        """
+        self.embedding_model = embedding_model
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.stats = {'queries': 0, 'batches': 0, 'largest_batch': 0}
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    def __getattr__(self, name):
+        # Only called for attributes the batcher doesn't have itself (model, base_url, ...)
+        return getattr(self.embedding_model, name)
+
+    def _submit(self, text: str) -> Future:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='vector-press-query-embeddings', daemon=True)
+                self._worker.start()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query as part of the next batch, blocks until its embedding is ready"""
+        return self._submit(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of embed_query(), cancelling the caller drops the query if its batch hasn't started"""
+        return await asyncio.wrap_future(self._submit(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_model.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embedding_model.aembed_documents(texts)
+
+    def _collect(self) -> list[tuple[str, Future]]:
+        """Block for the first query, then take more until the window closes or the batch is full"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # Queries whose caller gave up (cancelled future) are left out of the request
+            batch = [(text, future) for text, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            texts = list(dict.fromkeys(text for text, _ in batch))  # identical queries are embedded once
+            try:
+                embeddings = dict(zip(texts, self.embedding_model.embed_documents(texts)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for text, future in batch:
+                future.set_result(embeddings[text])
+
+            self.stats['queries'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(texts))
@@ -0,0 +1,74 @@
+from typing import Any, AsyncIterator, Coroutine, Iterator, TypeVar
+import threading
+import asyncio
+
+T = TypeVar('T')
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop running on a daemon thread, started on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='vector-press-event-loop', daemon=True).start()
+        return _loop
+
+
+def run_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the background loop and block the calling thread until it finishes
+
+    The async implementations are the only ones; sync entry points (app.invoke(), Streamlit script threads,
+    ingestion) go through this, so every caller in the process shares one event loop instead of its own threads.
+    Interrupting the caller (e.g. KeyboardInterrupt) cancels the coroutine.
+
+    Args:
+        coroutine: Coroutine to run
+
+    Returns:
+        The coroutine's result, its exception is raised in the caller
+
+    Raises:
+        RuntimeError: When called from a running event loop, which would block it; await the coroutine there instead
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coroutine.close()
+        raise RuntimeError("run_sync() called from a running event loop, await the async variant instead")
+
+    future = asyncio.run_coroutine_threadsafe(coroutine, background_loop())
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+async def _await(awaitable):
+    # run_coroutine_threadsafe() only takes coroutines, async generator steps are plain awaitables
+    return await awaitable
+
+
+def iterate_sync(iterator: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Sync iterator over an async iterator, each item is fetched with run_sync()
+
+    Stopping early (break, close()) closes the async generator on the background loop, releasing its resources.
+    """
+    try:
+        while True:
+            try:
+                yield run_sync(_await(anext(iterator)))
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            run_sync(_await(aclose()))
@@ -4,14 +4,17 @@ from langchain_core.messages import HumanMessage
 #from ai_common.llm import load_ollama_model
 from ollama import Client, ListResponse
 from tqdm import tqdm
+import threading
 
 #TODO
-# 1- we can change the embedding model to version 1.5 but we need to update with embedding every article again.
+# 1- we can change the embedding model to version 1.5, db/reembedding.py re-embeds the stored chunks as a new embedding version.
 # 2- we missed a big spot, which model wants like below:
 # text = "search_document: Your actual document content here"
 # embeddings = ollama_client.embeddings(model="nomic-embed-text", PROMPT=text)
 from config import settings
 
+from vector_press.embedding_batcher import QueryEmbeddingBatcher
+
 def check_and_pull_ollama_model(model_name: str, ollama_url: str) -> None:
     """Check if model exists, pull if not."""
     ollama_client = Client(host=ollama_url)
@@ -59,11 +62,19 @@ class LLMManager:
     # Embedding model option
     use_lightweight_embedding = False  # Set to True for low-resource systems
 
+    # Agent stage -> setting with the Ollama chat model of that stage (see agent/model_router.py)
+    STAGE_MODEL_SETTINGS = {
+        'tool_selection': 'TOOL_SELECTION_MODEL',
+        'synthesis': 'SYNTHESIS_MODEL',
+        'conversation': 'CONVERSATION_MODEL',
+    }
+
     def __init__(self):
         self._llm = None
-        self._embedding_model = None
+        self._chat_models = {}  # Ollama model name -> ChatOllama of a routed stage (None if it failed to load)
+        self._embedding_models = {}  # Ollama model name -> OllamaEmbeddings (None if it failed to load)
         self._llm_initialized = False
-        self._embedding_initialized = False
+        self._init_lock = threading.Lock()  # one shared manager serves every session/thread of the process
 
         print(f"🔧 [DEBUG] LLM Manager initialized")
 
@@ -102,44 +113,90 @@ class LLMManager:
             raise
 
 
-    def _initialize_embeddings(self):
-        """Initialize embedding model using LangChain's OllamaEmbeddings"""
+    def _initialize_chat_model(self, model_name: str):
+        """Initialize an Ollama chat model with the settings of the default LLM, None if it failed"""
+        try:
+            load_ollama_model(model_name=model_name, ollama_url=settings.OLLAMA_HOST)
+            chat_model = ChatOllama(
+                model=model_name,
+                base_url=settings.OLLAMA_HOST,
+                temperature=0,
+                num_ctx=8192,
+            )
+            print(f"✅ [DEBUG] {model_name} initialized successfully")
+            return chat_model
+        except Exception as e:
+            print(f"⚠️ [DEBUG] Failed to initialize {model_name}: {e}")
+            return None
+
+    def _initialize_embeddings(self, model_name: str = 'embeddinggemma'):
+        """Initialize an embedding model using LangChain's OllamaEmbeddings, None if it failed"""
 
         try:
-            print(f"🔄 [DEBUG] Initializing EmbeddingGemma model...")
+            print(f"🔄 [DEBUG] Initializing {model_name} model...")
 
             # Load/pull the embedding model first
-            load_ollama_model(model_name='embeddinggemma', ollama_url=settings.OLLAMA_HOST)
+            load_ollama_model(model_name=model_name, ollama_url=settings.OLLAMA_HOST)
 
             # Use LangChain's built-in OllamaEmbeddings
-            self._embedding_model = OllamaEmbeddings(
-                model="embeddinggemma",
+            embedding_model = OllamaEmbeddings(
+                model=model_name,
                 base_url=settings.OLLAMA_HOST
             )
 
             # Test the embedding model
-            print(f"✅ [DEBUG] EmbeddingGemma initialized successfully")
+            print(f"✅ [DEBUG] {model_name} initialized successfully")
+            return embedding_model
 
         except Exception as e:
             print(f"⚠️ [DEBUG] Failed to initialize embedding: {e}")
             print(f"💡 [DEBUG] Make sure Ollama is running and accessible")
-            self._embedding_model = None
+            return None
 
     def get_llm(self):
         """Get the LLM, initializing it if needed"""
-        if not self._llm_initialized:
-            print(f"🔄 [DEBUG] loading LLM...")
-            self._initialize_llm()
-            self._llm_initialized = True
+        with self._init_lock:
+            if not self._llm_initialized:
+                print(f"🔄 [DEBUG] loading LLM...")
+                self._initialize_llm()
+                self._llm_initialized = True
         return self._llm
 
-    def get_embedding_model(self):
-        """Get the embedding model, initializing it if needed"""
-        if not self._embedding_initialized:
-            print(f"🔄 [DEBUG] loading embedding model...")
-            self._initialize_embeddings()
-            self._embedding_initialized = True
-        return self._embedding_model
+    def get_stage_llm(self, stage: str):
+        """
+        Get the chat model configured for an agent stage, initializing it if needed
+
+        Stages whose model is not set, is the default LLM or fails to load use get_llm().
+
+        Args:
+            stage: 'tool_selection', 'synthesis' or 'conversation'
+        """
+        model_name = getattr(settings, self.STAGE_MODEL_SETTINGS[stage])
+        llm = self.get_llm()
+        if not model_name or model_name == getattr(llm, 'model', None):
+            return llm
+
+        with self._init_lock:
+            if model_name not in self._chat_models:
+                print(f"🔄 [DEBUG] loading {stage} model {model_name}...")
+                self._chat_models[model_name] = self._initialize_chat_model(model_name)
+        return self._chat_models[model_name] or llm
+
+    def get_embedding_model(self, model_name: str = 'embeddinggemma'):
+        """
+        Get an embedding model (EmbeddingGemma by default), initializing it if needed
+
+        Concurrent embed_query calls of every session are micro-batched by a QueryEmbeddingBatcher unless
+        settings.QUERY_EMBED_BATCH_WINDOW is 0.
+        """
+        with self._init_lock:
+            if model_name not in self._embedding_models:
+                print(f"🔄 [DEBUG] loading embedding model {model_name}...")
+                embedding_model = self._initialize_embeddings(model_name)
+                if embedding_model is not None and settings.QUERY_EMBED_BATCH_WINDOW > 0:
+                    embedding_model = QueryEmbeddingBatcher(embedding_model)
+                self._embedding_models[model_name] = embedding_model
+        return self._embedding_models[model_name]
 
 
 def main():
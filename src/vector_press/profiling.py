@@ -0,0 +1,196 @@
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+import functools
+import itertools
+import threading
+import cProfile
+import inspect
+import pstats
+import time
+import sys
+import os
+import re
+
+from config import settings
+
+PROFILING_MODES = ('off', 'cprofile', 'sampling')
+
+# Held while a run is active in any thread: cProfile allows a single active profiler per process (3.12+), and the
+# sampling profiler already records every thread, so overlapping and nested runs go unprofiled
+_active_run = threading.Lock()
+_run_counter = itertools.count(1)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background thread records the Python stack of every other thread at a fixed interval
+
+    Stacks are kept in the collapsed format of flamegraph.pl / speedscope / inferno ('thread;outer;...;inner count'),
+    so worker threads (tool calls, ingestion) show up next to the thread that started the run.
+    """
+
+    def __init__(self, interval: float = settings.PROFILING_SAMPLE_INTERVAL):
+        """
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(thread_names.get(ident, f"thread-{ident}"))
+            self.stacks[';'.join(reversed(labels))] += 1
+        self.sample_count += 1
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='vector-press-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def write(self, path_prefix: str) -> list[str]:
+        """Write <prefix>.folded (flamegraph input) and <prefix>.txt (functions by own and total samples)"""
+        with open(f"{path_prefix}.folded", 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')[1:]  # without the thread name
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+
+        with open(f"{path_prefix}.txt", 'w', encoding='utf-8') as f:
+            f.write(f"{self.sample_count} samples every {self.interval * 1000:.1f} ms\n\n")
+            f.write(f"{'own':>8} {'total':>8}  function\n")
+            for frame, count in total.most_common(60):
+                f.write(f"{own[frame]:>8} {count:>8}  {frame}\n")
+        return [f"{path_prefix}.folded", f"{path_prefix}.txt"]
+
+
+def _output_prefix(name: str) -> str:
+    directory = os.path.join(settings.OUTPUT, 'profiles')
+    os.makedirs(directory, exist_ok=True)
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+    return os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{next(_run_counter)}-{safe_name}")
+
+
+@contextmanager
+def profile_run(name: str, mode: str = None):
+    """
+    Profile the enclosed block and write the results under settings.OUTPUT/profiles
+
+    Only one run is active per process. Runs that start while another one is active, nested on the same thread
+    (e.g. retrieve_relevant_chunks inside a graph node) or on another thread (backfill workers, the ingestion queue),
+    run unprofiled and write nothing of their own.
+
+    Args:
+        name: Label for the output files
+        mode: 'cprofile' or 'sampling', defaults to settings.PROFILING_MODE
+    """
+    mode = mode or settings.PROFILING_MODE
+    if mode == 'off':
+        yield
+        return
+    if mode not in PROFILING_MODES:
+        raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {PROFILING_MODES}")
+    if not _active_run.acquire(blocking=False):
+        yield
+        return
+
+    profiler = cProfile.Profile() if mode == 'cprofile' else SamplingProfiler()
+    try:
+        if mode == 'cprofile':
+            profiler.enable()
+        else:
+            profiler.start()
+    except Exception as e:
+        # e.g. a debugger or coverage tool already holds the profiling hook
+        _active_run.release()
+        print(f"⚠️ [PROFILE] Could not start profiling {name}: {e}")
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        try:
+            if mode == 'cprofile':
+                profiler.disable()
+            else:
+                profiler.stop()
+        finally:
+            _active_run.release()
+        duration = time.perf_counter() - start_time
+
+        try:
+            prefix = _output_prefix(name)
+            if mode == 'cprofile':
+                profiler.dump_stats(f"{prefix}.prof")
+                with open(f"{prefix}.txt", 'w', encoding='utf-8') as f:
+                    pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(60)
+                paths = [f"{prefix}.prof", f"{prefix}.txt"]
+            else:
+                paths = profiler.write(prefix)
+            print(f"🔬 [PROFILE] {name} took {duration:.3f}s, wrote {', '.join(os.path.basename(p) for p in paths)}")
+        except Exception as e:
+            print(f"⚠️ [PROFILE] Could not write profile of {name}: {e}")
+
+
+def profiled(name: str = None):
+    """
+    Decorator that profiles every call of a sync or async function when settings.PROFILING_MODE is not 'off'
+
+    The mode is read when the function is decorated; with profiling off the function is returned unchanged, so
+    there is no per-call overhead. Async functions are profiled from start to finish on the event loop thread, so
+    the profile also contains whatever other tasks ran in between.
+
+    Args:
+        name: Label for the output files, defaults to the function's qualified name
+    """
+    def decorator(func):
+        if settings.PROFILING_MODE == 'off':
+            return func
+        label = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with profile_run(label):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_run(label):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
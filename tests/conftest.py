@@ -0,0 +1,54 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from vector_press.agent.agent import VectorPressAgent
+from vector_press.agent.load_test import StubAsyncTavilyClient, StubChatModel, StubGuardianClient, StubLLMManager
+from vector_press.agent.request_scheduler import RequestScheduler
+from vector_press.agent.tool_cache import ToolResultCache
+
+
+@pytest.fixture
+def make_agent():
+    """Build a VectorPressAgent on the load-test stubs (no network, no Ollama), keyword arguments override them"""
+    def build(llm_latency: float = 0.0, tavily_latency: float = 0.0, guardian_latency: float = 0.0, **overrides):
+        llm = StubChatModel(llm_latency, 0.0, 0)
+        kwargs = {
+            'tool_cache': ToolResultCache(ttls={}),
+            'async_tavily_client': StubAsyncTavilyClient(tavily_latency, 0.0, 1),
+            'tavily_scheduler': RequestScheduler('tavily-test', rate_per_second=1e9, burst=1_000_000),
+            'guardian_client': StubGuardianClient(guardian_latency, 0.0, 2),
+        }
+        kwargs.update(overrides)
+        return VectorPressAgent(StubLLMManager(llm), **kwargs)
+    return build
+
+
+class FakeVectorStore:
+    """SupabaseVectorStore stand-in for the agent: async retrieval with a fixed latency and recorded calls"""
+
+    def __init__(self, latency: float = 0.0, hit: bool = True):
+        self.latency = latency
+        self.hit = hit
+        self.calls = []
+        self.embedded = []
+
+    async def aembed_query(self, query: str) -> tuple[str, list[float]]:
+        self.embedded.append(query)
+        return 'test-version', [0.5] * 4
+
+    async def aretrieve_relevant_chunks(self, query: str, **kwargs) -> list[dict]:
+        self.calls.append({'query': query, **kwargs})
+        await asyncio.sleep(self.latency)
+        if not self.hit:
+            return []
+        return [{'article_id': 'world/1', 'chunk_number': 0, 'content': f"Stored chunk about {query}", 'title': query,
+                 'url': 'https://www.theguardian.com/world/1', 'section': 'world',
+                 'publication_date': '2026-10-01T00:00:00Z', 'similarity': 0.9,
+                 'embedding': np.ones(4, dtype=np.float32)}]
+
+
+@pytest.fixture
+def fake_vector_store():
+    return FakeVectorStore
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+from vector_press.agent.agent import build_graph, create_initial_state
+from vector_press.db.answer_cache import SemanticAnswerCache
+
+
+class FakeAnswerCache:
+    """SemanticAnswerCache stand-in keeping answers in a dict by exact query"""
+
+    def __init__(self):
+        self.answers = {}
+
+    async def alookup(self, query: str) -> dict | None:
+        return self.answers.get(query)
+
+    async def astore(self, query: str, answer: str, sources: list[dict]) -> bool:
+        self.answers[query] = {'answer': answer, 'sources': sources}
+        return True
+
+
+def _ask(app, query: str) -> dict:
+    async def turn():
+        state = create_initial_state()
+        state['query'] = query
+        result = await app.ainvoke(state)
+        await asyncio.sleep(0.01)  # let the background store finish
+        return result
+    return asyncio.run(turn())
+
+
+def test_repeated_question_is_answered_from_the_cache(make_agent):
+    agent = make_agent(answer_cache=FakeAnswerCache())
+    app = build_graph(agent)
+
+    first = _ask(app, "latest news on elections")
+    llm_calls = agent.llm.calls
+    second = _ask(app, "latest news on elections")
+
+    assert not first['cache_hit'] and second['cache_hit']
+    assert agent.llm.calls == llm_calls
+    assert second['messages'][-1].content.startswith(first['messages'][-1].content)
+    assert "Sources:\n- Latest News On Elections report 0" in second['messages'][-1].content
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+    async def execute(self):
+        return self
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.inserted = []
+
+    def rpc(self, name, params):
+        return _Result(self.rows)
+
+    def table(self, name):
+        return SimpleNamespace(insert=lambda row: self.inserted.append(row) or _Result([row]))
+
+
+def _semantic_cache(rows: list[dict]) -> tuple[SemanticAnswerCache, list[str], FakeSupabase]:
+    embedded, supabase = [], FakeSupabase(rows)
+
+    async def aembed_query(text):
+        embedded.append(text)
+        return [0.1] * 4
+
+    async def get_async_supabase():
+        return supabase
+
+    vector_store = SimpleNamespace(embedding_model=SimpleNamespace(aembed_query=aembed_query),
+                                   _get_async_supabase=get_async_supabase)
+    return SemanticAnswerCache(vector_store, similarity_threshold=0.9, ttl_seconds=60), embedded, supabase
+
+
+def test_a_miss_and_its_store_embed_the_query_once():
+    cache, embedded, supabase = _semantic_cache([{'similarity': 0.5, 'answer': "old", 'sources': []}])
+    sources = [{'title': "T", 'section': 'world', 'url': "u", 'publication_date': "d"}]
+
+    async def miss_then_store():
+        return await cache.alookup("q"), await cache.astore("q", "answer", sources)
+
+    assert asyncio.run(miss_then_store()) == (None, True)
+    assert embedded == ["task: sentence similarity | query: q"]
+    assert supabase.inserted[0]['sections'] == ['world']
+
+
+def test_a_similar_enough_query_is_a_hit():
+    cache, _, _ = _semantic_cache([{'similarity': 0.95, 'answer': "cached", 'sources': None}])
+
+    assert asyncio.run(cache.alookup("q")) == {'answer': "cached", 'sources': []}
@@ -0,0 +1,38 @@
+import re
+from pathlib import Path
+
+from vector_press.agent.api_clients import extract_article_text
+from vector_press.db.supabase_db import SupabaseVectorStore
+
+MIGRATION = Path(__file__).parents[1] / 'src/vector_press/db/migrations/004_section_ids.sql'
+
+
+def _article(article_id: str, section_id: str, section_name: str) -> dict:
+    return {'id': article_id, 'sectionId': section_id, 'sectionName': section_name, 'webTitle': "Title",
+            'webUrl': f"https://www.theguardian.com/{article_id}", 'webPublicationDate': '2026-10-01T00:00:00Z',
+            'fields': {'bodyText': "Body text"}}
+
+
+def test_extracted_section_is_the_id_the_search_filter_uses():
+    extracted = extract_article_text(_article('us-news/2026/oct/01/budget', 'us-news', 'US news'))
+
+    assert extracted['metadata']['section'] == 'us-news'
+
+
+def test_section_migration_derives_the_id_from_the_article_id():
+    # 004_section_ids.sql rewrites stored section names to split_part(article_id, '/', 1)
+    assert re.search(r"set section = split_part\(article_id, '/', 1\)", MIGRATION.read_text())
+    for article_id, section_id in (('world/2022/oct/21/russia-ukraine', 'world'),
+                                   ('commentisfree/2026/jan/02/opinion', 'commentisfree')):
+        assert extract_article_text(_article(article_id, section_id, "Name"))['metadata']['section'] == article_id.split('/')[0]
+
+
+def test_search_counter_is_bumped_for_every_matching_chunk():
+    matches = [{'article_id': article_id, 'chunk_number': number, 'content': "text", 'title': "Title", 'url': "url",
+                'section': 'world', 'publication_date': '2026-10-01', 'similarity': similarity}
+               for article_id, number, similarity in (('world/1', 0, 0.9), ('world/1', 1, 0.8), ('world/2', 0, 0.2))]
+
+    chunks, counted_article_ids = SupabaseVectorStore._filter_matches(object.__new__(SupabaseVectorStore), matches, 0.6)
+
+    assert len(chunks) == 2
+    assert counted_article_ids == ['world/1', 'world/1']
@@ -0,0 +1,88 @@
+import threading
+from datetime import date
+
+import pytest
+
+from vector_press.db.backfill import BackfillPlanner, plan_windows, split_window
+
+
+class FakeBackfillStore:
+    """Vector store stand-in: one article per day of a window, database_uploading records the ingested windows"""
+
+    def __init__(self, fail_window: str = None):
+        self.guardian_client = self
+        self.fail_window = fail_window
+        self.uploads = []
+        self._lock = threading.Lock()
+
+    def _build_search_params(self, from_date, to_date, **params):
+        return {'from-date': from_date, 'to-date': to_date}
+
+    def count_results(self, base_params):
+        days = (date.fromisoformat(base_params['to-date']) - date.fromisoformat(base_params['from-date'])).days + 1
+        return days
+
+    def database_uploading(self, from_date, to_date, max_pages, **kwargs):
+        with self._lock:
+            self.uploads.append((from_date, to_date, max_pages))
+        days = (date.fromisoformat(to_date) - date.fromisoformat(from_date)).days + 1
+        completed = f"{from_date}_{to_date}" != self.fail_window
+        return {'total_fetched': days, 'total_processed': days, 'successful': days if completed else 0,
+                'failed': 0 if completed else days, 'skipped': 0, 'completed': completed}
+
+
+def test_windows_cover_the_range_without_overlap():
+    windows = plan_windows('2024-01-01', '2024-03-10', sections=['world', 'business'], window_days=30)
+
+    assert [(w['from_date'], w['to_date']) for w in windows if w['section'] == 'world'] == [
+        ('2024-01-01', '2024-01-30'), ('2024-01-31', '2024-02-29'), ('2024-03-01', '2024-03-10')]
+    assert len(windows) == 6
+    assert split_window(windows[0]) == [plan_windows('2024-01-01', '2024-01-15', ['world'], 30)[0],
+                                        plan_windows('2024-01-16', '2024-01-30', ['world'], 30)[0]]
+    assert split_window(plan_windows('2024-01-01', '2024-01-01')[0]) is None
+    with pytest.raises(ValueError):
+        plan_windows('2024-02-01', '2024-01-01')
+
+
+def test_dense_windows_are_split_until_they_fit(tmp_path):
+    store = FakeBackfillStore()
+    planner = BackfillPlanner(store, max_workers=3, window_days=8, max_pages_per_window=2, page_size=2,
+                              root_dir=str(tmp_path))
+
+    stats = planner.run('2024-01-01', '2024-01-08', backfill_id='dense')
+
+    assert stats['windows_split'] == 1 and stats['windows_completed'] == 2
+    assert sorted(store.uploads) == [('2024-01-01', '2024-01-04', 2), ('2024-01-05', '2024-01-08', 2)]
+    assert stats['successful'] == 8
+
+
+def test_resume_runs_only_unfinished_windows(tmp_path):
+    failing = FakeBackfillStore(fail_window='2024-01-05_2024-01-08')
+    planner = BackfillPlanner(failing, max_workers=2, window_days=4, max_pages_per_window=10, root_dir=str(tmp_path))
+    assert planner.run('2024-01-01', '2024-01-08', backfill_id='resume')['windows_failed'] == 1
+
+    store = FakeBackfillStore()
+    planner.vector_store = store
+    stats = planner.run('2024-01-01', '2024-01-08', backfill_id='resume', resume=True)
+
+    assert store.uploads == [('2024-01-05', '2024-01-08', 1)]
+    assert stats['windows_completed'] == 2 and stats['windows_failed'] == 0
+
+
+def test_torn_progress_line_does_not_lose_later_windows(tmp_path):
+    failing = FakeBackfillStore(fail_window='2024-01-05_2024-01-08')
+    planner = BackfillPlanner(failing, max_workers=1, window_days=4, max_pages_per_window=10, root_dir=str(tmp_path))
+    planner.run('2024-01-01', '2024-01-08', backfill_id='torn')
+    with open(tmp_path / 'torn' / 'progress.jsonl', 'a', encoding='utf-8') as f:
+        f.write('{"window_id": "all_2024')  # crash in the middle of a write
+
+    planner.vector_store = FakeBackfillStore()
+    assert planner.run('2024-01-01', '2024-01-08', backfill_id='torn', resume=True)['windows_completed'] == 2
+
+    # Both windows are recorded as finished, a second resume has nothing left to run
+    store = FakeBackfillStore()
+    planner.vector_store = store
+    stats = planner.run('2024-01-01', '2024-01-08', backfill_id='torn', resume=True)
+
+    assert store.uploads == []
+    assert stats['windows_completed'] == 2
@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+
+from vector_press.db import bulk_loader
+from vector_press.db.embedded_chunks import EmbeddedChunks, chunk_offsets
+
+
+class FakeCursor:
+    """psycopg cursor stand-in recording COPY rows and answering the version check and article merge"""
+
+    def __init__(self, active_version):
+        self.active_version = active_version
+        self.copied = {}
+        self.statements = []
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @contextmanager
+    def copy(self, statement):
+        rows = self.copied.setdefault(statement.split()[1], [])
+        yield SimpleNamespace(set_types=lambda types: None, write_row=rows.append)
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+        if 'from embedding_versions' in statement:
+            self._result = [self.active_version] if self.active_version else []
+        elif 'insert into guardian_articles' in statement:
+            self._result = [(row[0], True) for row in self.copied['staging_articles']]
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self._cursor
+
+
+def _loader(monkeypatch, cursor) -> bulk_loader.PostgresBulkLoader:
+    monkeypatch.setattr(bulk_loader, 'psycopg', SimpleNamespace(connect=lambda url: FakeConnection(cursor)))
+    monkeypatch.setattr(bulk_loader, 'register_vector', lambda conn: None)
+    return bulk_loader.PostgresBulkLoader('postgresql://localhost/test')
+
+
+def _articles() -> list:
+    text = "news " * 700
+    offsets = chunk_offsets(len(text))
+    return [({'article_id': f"world/{i}", 'title': "Title", 'section': 'world', 'url': "url",
+              'publication_date': '2026-10-01T00:00:00+00:00', 'body_text': text},
+             EmbeddedChunks(text, offsets, np.full((len(offsets), 4), i, dtype=np.float32)))
+            for i in range(2)]
+
+
+def test_chunks_are_streamed_as_float32_rows(monkeypatch):
+    cursor = FakeCursor(active_version=('embeddinggemma-v1', 'article_chunks'))
+
+    statuses = _loader(monkeypatch, cursor).load(_articles())
+
+    assert statuses == {'world/0': 'inserted', 'world/1': 'inserted'}
+    chunk_rows = cursor.copied['staging_chunks']
+    assert [(row[0], row[1]) for row in chunk_rows] == [('world/0', 0), ('world/0', 1), ('world/0', 2),
+                                                        ('world/1', 0), ('world/1', 1), ('world/1', 2)]
+    assert all(row[5].dtype == np.float32 for row in chunk_rows)
+
+
+def test_an_inactive_embedding_version_fails_every_article(monkeypatch):
+    cursor = FakeCursor(active_version=None)
+
+    statuses = _loader(monkeypatch, cursor).load(_articles(), embedding_version='retired-v0')
+
+    assert set(statuses) == {'world/0', 'world/1'}
+    assert all(status == "error: embedding version retired-v0 is not active" for status in statuses.values())
+    assert not any('insert into guardian_articles' in statement for statement in cursor.statements)
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from config import settings
+from vector_press.db.embedded_chunks import EmbeddedChunks, chunk_offsets
+from vector_press.db.supabase_db import SupabaseVectorStore
+
+
+class RecordingSupabase:
+    """Sync Supabase client stand-in answering upsert_articles_with_chunks, failing the batches listed in fail"""
+
+    def __init__(self, fail: set[int] = frozenset()):
+        self.calls = []
+        self.fail = fail
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        if len(self.calls) - 1 in self.fail:
+            raise ConnectionError("connection reset")
+        data = [{'article_id': article['article_id'], 'status': 'inserted'} for article in params['articles']]
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+
+def _store(supabase) -> SupabaseVectorStore:
+    store = object.__new__(SupabaseVectorStore)
+    store.supabase = supabase
+    store.embedding_versions = SimpleNamespace(invalidate=lambda: None)
+    return store
+
+
+def _articles(count: int) -> list:
+    text = "news " * 500
+    offsets = chunk_offsets(len(text))
+    return [({'article_id': f"world/{i}", 'title': f"Title {i}"},
+             EmbeddedChunks(text, offsets, np.full((len(offsets), 4), i, dtype=np.float32)))
+            for i in range(count)]
+
+
+def test_articles_are_sent_in_batches_with_their_chunks(monkeypatch):
+    monkeypatch.setattr(settings, 'BULK_UPSERT_BATCH_SIZE', 2)
+    monkeypatch.setattr(settings, 'EMBEDDING_WIRE_ENCODING', 'json')
+    supabase = RecordingSupabase()
+
+    statuses = _store(supabase)._upsert_articles(_articles(5))
+
+    assert [len(params['articles']) for _, params in supabase.calls] == [2, 2, 1]
+    assert statuses == {f"world/{i}": 'inserted' for i in range(5)}
+    first_chunks = supabase.calls[0][1]['articles'][1]['chunks']
+    assert [chunk['chunk_number'] for chunk in first_chunks] == [0, 1]
+    assert first_chunks[0]['embedding'] == [1.0] * 4
+
+
+def test_a_failed_batch_marks_only_its_articles(monkeypatch):
+    monkeypatch.setattr(settings, 'BULK_UPSERT_BATCH_SIZE', 2)
+
+    statuses = _store(RecordingSupabase(fail={1}))._upsert_articles(_articles(4))
+
+    assert [statuses[f"world/{i}"] for i in (0, 1)] == ['inserted', 'inserted']
+    assert all(statuses[f"world/{i}"].startswith("error: connection reset") for i in (2, 3))
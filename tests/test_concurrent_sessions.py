@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from vector_press.agent.agent import build_graph, create_initial_state
+from vector_press.agent.load_test import AgentLoadTest
+from vector_press.event_loop import run_sync
+
+
+def test_threaded_sessions_do_not_queue_behind_each_other():
+    # 12 sessions x 2 tool calls would wait for each other on a shared 4-worker pool (~0.6 s of tool time)
+    report = AgentLoadTest(sessions=12, turns=1, mode='threads', llm_latency=0.1, tavily_latency=0.2,
+                           guardian_latency=0.2, jitter=0.0, max_concurrent_runs=0).run()
+
+    assert report['turns_completed'] == 12
+    assert report['latency_seconds']['max'] < 0.55
+
+
+def test_sync_callers_share_one_event_loop(make_agent):
+    app = build_graph(make_agent(llm_latency=0.01))
+    loops = set()
+
+    async def turn(state):
+        loops.add(asyncio.get_running_loop())
+        return await app.ainvoke(state)
+
+    def session(index: int):
+        state = create_initial_state()
+        state['query'] = f"how does python asyncio work {index}"
+        run_sync(turn(state))
+
+    threads = [threading.Thread(target=session, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loops) == 1
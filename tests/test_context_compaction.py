@@ -0,0 +1,57 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.graph.message import add_messages
+
+from vector_press.agent.context_compaction import ContextCompactor, estimate_tokens
+
+
+def _tool_turn(index: int, output_chars: int) -> list:
+    calls = [{'name': 'search_guardian_articles', 'args': {'query': f"q{index}-{n}"}, 'id': f"call-{index}-{n}",
+              'type': 'tool_call'} for n in range(2)]
+    return [
+        HumanMessage(content=f"question {index}", id=f"human-{index}"),
+        AIMessage(content='', tool_calls=calls, id=f"ai-{index}"),
+        *(ToolMessage(content="x" * output_chars, name='search_guardian_articles', tool_call_id=call['id'],
+                      id=f"tool-{call['id']}", artifact=[{'url': f"https://example.com/{call['id']}"}])
+          for call in calls),
+    ]
+
+
+def _compact(compactor: ContextCompactor, messages: list) -> list:
+    update = compactor.compact_context({'messages': messages, 'query': ''})
+    return add_messages(messages, update.get('messages', []))
+
+
+def _total(compactor: ContextCompactor, messages: list) -> int:
+    return sum(estimate_tokens(message, compactor.chars_per_token) for message in messages)
+
+
+def test_old_turns_are_compacted_before_recent_ones():
+    compactor = ContextCompactor(token_budget=1500, keep_recent_turns=1, chars_per_token=4.0, tool_preview_chars=100)
+    messages = [SystemMessage(content="system", id="system"), *_tool_turn(0, 4000), *_tool_turn(1, 2000)]
+
+    compacted = _compact(compactor, messages)
+
+    assert _total(compactor, compacted) <= 1500
+    assert all(message.content == "x" * 2000 for message in compacted[-2:])
+
+
+def test_single_turn_over_budget_trims_its_tool_outputs():
+    compactor = ContextCompactor(token_budget=1000, keep_recent_turns=2, chars_per_token=4.0, tool_preview_chars=100)
+    messages = [SystemMessage(content="system", id="system"), *_tool_turn(0, 6000)]
+
+    compacted = _compact(compactor, messages)
+    tool_messages = [message for message in compacted if isinstance(message, ToolMessage)]
+
+    assert _total(compactor, compacted) <= 1000
+    assert [message.id for message in compacted] == [message.id for message in messages]
+    assert all(message.content.startswith("[trimmed search_guardian_articles output, 6000 chars] x")
+               for message in tool_messages)
+    # Both outputs of the turn keep a similar share, and their sources survive for the answer cache
+    assert abs(len(tool_messages[0].content) - len(tool_messages[1].content)) <= 1
+    assert all(message.artifact for message in tool_messages)
+
+
+def test_history_within_budget_is_untouched():
+    compactor = ContextCompactor(token_budget=10_000, keep_recent_turns=1)
+
+    assert compactor.compact_context({'messages': _tool_turn(0, 1000), 'query': ''}) == {}
@@ -0,0 +1,44 @@
+import numpy as np
+
+from vector_press.agent.context_packing import ContextPacker
+from vector_press.db.embedded_chunks import chunk_offsets
+
+
+def _article_chunks(article_id: str, text: str, similarities: list[float], embedding: list[float] = None) -> list[dict]:
+    return [{'article_id': article_id, 'chunk_number': number, 'content': text[start:end], 'title': article_id,
+             'url': f"https://example.com/{article_id}", 'section': 'world', 'publication_date': '2026-10-01',
+             'similarity': similarity, 'embedding': None if embedding is None else np.array(embedding, dtype=np.float32)}
+            for number, ((start, end), similarity) in enumerate(zip(chunk_offsets(len(text)).tolist(), similarities))]
+
+
+def test_consecutive_chunks_are_stitched_back_into_the_article_text():
+    text = "".join(chr(ord('a') + i % 26) for i in range(4000))
+    packer = ContextPacker(token_budget=10_000, chars_per_token=1.0)
+
+    passages = packer.pack(_article_chunks('world/1', text, [0.9, 0.8, 0.7]))
+
+    assert len(passages) == 1
+    assert passages[0]['chunk_numbers'] == [0, 1, 2]
+    assert passages[0]['content'] == text
+    assert passages[0]['similarity'] == 0.9
+
+
+def test_mmr_prefers_a_different_article_over_a_near_duplicate():
+    text = "x" * 1750
+    duplicate = _article_chunks('world/1', text, [0.95], [1.0, 0.0]) + _article_chunks('world/2', text, [0.94], [1.0, 0.0])
+    different = _article_chunks('world/3', text, [0.80], [0.0, 1.0])
+    packer = ContextPacker(token_budget=3500, mmr_lambda=0.5, chars_per_token=1.0)
+
+    passages = packer.pack(duplicate + different)
+
+    assert [passage['article_id'] for passage in passages] == ['world/1', 'world/3']
+
+
+def test_the_token_budget_counts_shared_overlap_once():
+    text = "y" * 3225  # two chunks sharing a 275 character overlap
+    packer = ContextPacker(token_budget=3225, chars_per_token=1.0)
+
+    passages = packer.pack(_article_chunks('world/1', text, [0.9, 0.8]))
+
+    assert passages[0]['chunk_numbers'] == [0, 1]
+    assert len(passages[0]['content']) == 3225
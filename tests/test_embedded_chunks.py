@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from vector_press.db.embedded_chunks import CHUNK_OVERLAP, CHUNK_SIZE, EmbeddedChunks, chunk_offsets
+
+
+def test_chunk_offsets_overlap_and_cover_the_text():
+    offsets = chunk_offsets(4000)
+
+    assert offsets.dtype == np.int32
+    assert offsets.tolist() == [[0, 1750], [1475, 3225], [2950, 4000]]
+    assert all(end - next_start == CHUNK_OVERLAP for (_, end), (next_start, _) in zip(offsets[:-1], offsets[1:]))
+    assert offsets[0][1] - offsets[0][0] == CHUNK_SIZE
+
+
+def test_rows_share_the_embedding_matrix_and_skip_text_when_asked():
+    text = "abcdefghij" * 400
+    embeddings = np.ones((3, 8), dtype=np.float32)
+    chunks = EmbeddedChunks(text, chunk_offsets(len(text)), embeddings)
+
+    with_text = list(chunks.rows())
+    offsets_only = list(chunks.rows(store_text=False))
+
+    assert with_text[1][0] == text[1475:3225] == chunks.content(1)
+    assert [row[0] for row in offsets_only] == [None, None, None]
+    assert np.shares_memory(offsets_only[2][3], embeddings)
+    assert chunks.nbytes == chunks.offsets.nbytes + embeddings.nbytes
+
+
+def test_mismatched_offsets_and_embeddings_are_rejected():
+    with pytest.raises(ValueError, match="2 chunk offsets but 1 embeddings"):
+        EmbeddedChunks("text", np.zeros((2, 2), dtype=np.int32), np.zeros((1, 4), dtype=np.float32))
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from vector_press.embedding_batcher import QueryEmbeddingBatcher
+
+
+class RecordingEmbeddings:
+    """Embedding model stand-in: one request takes latency seconds, each text maps to [len(text)]"""
+
+    def __init__(self, latency: float = 0.0, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+        self.requests = []
+        self.model = 'recording'
+
+    def embed_documents(self, texts):
+        self.requests.append(list(texts))
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("embedding server down")
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_queries_share_one_request():
+    model = RecordingEmbeddings()
+    batcher = QueryEmbeddingBatcher(model, window_seconds=0.05, max_batch_size=16)
+
+    async def embed_all():
+        return await asyncio.gather(*(batcher.aembed_query("q" * n) for n in range(1, 6)), batcher.aembed_query("q"))
+
+    assert asyncio.run(embed_all()) == [[1.0], [2.0], [3.0], [4.0], [5.0], [1.0]]
+    assert model.requests == [["q", "qq", "qqq", "qqqq", "qqqqq"]]
+    assert batcher.stats == {'queries': 6, 'batches': 1, 'largest_batch': 5}
+
+
+def test_threads_queue_behind_an_in_flight_request_and_batch_together():
+    model = RecordingEmbeddings(latency=0.1)
+    batcher = QueryEmbeddingBatcher(model, window_seconds=0.0, max_batch_size=8)
+    results = {}
+
+    def embed(text):
+        results[text] = batcher.embed_query(text)
+
+    first = threading.Thread(target=embed, args=("first",))
+    first.start()
+    time.sleep(0.03)  # the first request is now in flight
+    others = [threading.Thread(target=embed, args=(f"other {n}",)) for n in range(4)]
+    for thread in others:
+        thread.start()
+    for thread in [first, *others]:
+        thread.join()
+
+    assert len(model.requests) == 2 and sorted(model.requests[1]) == [f"other {n}" for n in range(4)]
+    assert results["other 0"] == [7.0]
+
+
+def test_failures_reach_every_caller_of_the_batch():
+    batcher = QueryEmbeddingBatcher(RecordingEmbeddings(fail=True), window_seconds=0.01)
+
+    with pytest.raises(ConnectionError, match="embedding server down"):
+        batcher.embed_query("query")
+    assert batcher.model == 'recording'
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from config import settings
+from vector_press.db.embedding_codec import decode_embedding, encode_embedding
+from vector_press.db.supabase_db import SupabaseVectorStore
+
+
+def _match_params(query_embedding: list[float]) -> dict:
+    return SupabaseVectorStore._match_params(object.__new__(SupabaseVectorStore), query_embedding, match_count=5)
+
+
+def test_queries_are_sent_as_json_by_default():
+    assert settings.EMBEDDING_WIRE_ENCODING == 'json'
+    assert _match_params([0.25, -0.5]) == {'match_count': 5, 'query_embedding': [0.25, -0.5]}
+
+
+def test_binary_encoding_is_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, 'EMBEDDING_WIRE_ENCODING', 'float32')
+
+    params = _match_params([0.25, -0.5])
+
+    assert params['embedding_encoding'] == 'float32'
+    assert decode_embedding(params['encoded_query_embedding'], 'float32') == [0.25, -0.5]
+
+
+@pytest.mark.parametrize('encoding, tolerance', [('json', 0), ('float32', 0), ('float16', 1e-3)])
+def test_encodings_round_trip(encoding, tolerance):
+    embedding = np.random.default_rng(0).normal(size=768).astype(np.float32) / 28
+
+    decoded = decode_embedding(encode_embedding(embedding, encoding), encoding)
+
+    assert np.allclose(decoded, embedding, rtol=tolerance, atol=tolerance)
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+import pytest
+
+from vector_press.event_loop import background_loop, iterate_sync, run_sync
+
+
+def test_run_sync_runs_on_the_shared_background_loop():
+    async def loop_thread():
+        return threading.current_thread().name, asyncio.get_running_loop()
+
+    thread_name, loop = run_sync(loop_thread())
+
+    assert thread_name == 'vector-press-event-loop'
+    assert loop is background_loop()
+
+
+def test_run_sync_raises_the_coroutine_exception():
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        run_sync(fail())
+
+
+def test_run_sync_refuses_to_block_a_running_loop():
+    async def nested():
+        return run_sync(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError, match="running event loop"):
+        asyncio.run(nested())
+
+
+def test_iterate_sync_closes_the_generator_when_stopped_early():
+    closed = []
+
+    async def numbers():
+        try:
+            for number in range(10):
+                yield number
+        finally:
+            closed.append(True)
+
+    iterator = iterate_sync(numbers())
+    assert [next(iterator), next(iterator)] == [0, 1]
+    iterator.close()
+
+    assert closed == [True]
+    assert list(iterate_sync(numbers())) == list(range(10))
@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from config import settings
+from vector_press.agent import api_clients
+from vector_press.agent.api_clients import GuardianAPIClient, extract_article_text
+from vector_press.agent.request_scheduler import RequestScheduler
+
+
+@pytest.fixture
+def guardian(monkeypatch):
+    """GuardianAPIClient whose HTTP requests are answered locally and recorded"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(dict(request.url.params))
+        results = [{'id': 'world/1', 'webTitle': "Title", 'sectionId': 'world',
+                    'fields': {'bodyText': "Body text here", 'wordcount': "3"}}]
+        return httpx.Response(200, content=json.dumps({'response': {'total': 7, 'pages': 1, 'results': results}}))
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(api_clients.httpx, 'AsyncClient',
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    client = GuardianAPIClient()
+    client.scheduler = RequestScheduler('guardian-test', rate_per_second=1e9, burst=100)
+    return client, requests
+
+
+def test_searches_request_only_the_stored_fields(guardian):
+    client, requests = guardian
+
+    articles = asyncio.run(client.asearch_articles(query="climate", max_pages=1))
+
+    assert requests[0]['show-fields'] == settings.GUARDIAN_SHOW_FIELDS == "bodyText,wordcount,charCount"
+    assert articles[0]['metadata']['word_count'] == 3
+    assert articles[0]['metadata']['char_count'] == len("Body text here")
+
+
+def test_result_counts_skip_fields_and_fetch_one_result(guardian):
+    client, requests = guardian
+
+    total = client.count_results(client._build_search_params(query="climate", page_size=200))
+
+    assert total == 7
+    assert 'show-fields' not in requests[0] and requests[0]['page-size'] == '1'
+
+
+def test_extraction_tolerates_missing_fields():
+    extracted = extract_article_text({'id': 'world/2', 'webTitle': "Only a title", 'fields': None})
+
+    assert extracted['content'] == "Only a title"
+    assert extracted['metadata']['word_count'] == 0 and extracted['metadata']['section'] == ''
@@ -0,0 +1,49 @@
+import asyncio
+
+from vector_press.agent.api_clients import GuardianAPIClient
+
+
+def _client(monkeypatch, pages: int, page_size: int = 2) -> tuple[GuardianAPIClient, list[int]]:
+    client = GuardianAPIClient()
+    fetched = []
+
+    async def afetch_page(page, base_params, http_client=None):
+        fetched.append(page)
+        return [{'metadata': {'article_id': f"world/{page}-{i}"}, 'content': "text"} for i in range(page_size)], pages
+
+    monkeypatch.setattr(client, '_afetch_page', afetch_page)
+    return client, fetched
+
+
+def test_pages_are_fetched_only_when_consumed(monkeypatch):
+    client, fetched = _client(monkeypatch, pages=5)
+    articles = client.iter_articles(query="climate", max_pages=5)
+
+    assert next(articles)['metadata']['article_id'] == 'world/1-0'
+    assert next(articles)['metadata']['article_id'] == 'world/1-1'
+    assert fetched == [1]
+    assert next(articles)['metadata']['article_id'] == 'world/2-0'
+    assert fetched == [1, 2]
+    articles.close()
+
+
+def test_pagination_stops_at_max_results_and_the_last_page(monkeypatch):
+    client, fetched = _client(monkeypatch, pages=2)
+
+    limited = asyncio.run(client.asearch_articles(query="climate", max_pages=5, max_results=3))
+    assert len(limited) == 3 and fetched == [1, 2]
+
+    fetched.clear()
+    everything = asyncio.run(client.asearch_articles(query="climate", max_pages=5))
+    assert len(everything) == 4 and fetched == [1, 2]
+
+
+def test_an_api_error_ends_the_iteration(monkeypatch):
+    client = GuardianAPIClient()
+
+    async def afetch_page(page, base_params, http_client=None):
+        return None
+
+    monkeypatch.setattr(client, '_afetch_page', afetch_page)
+
+    assert client.search_articles(query="climate", max_pages=3) is None
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+
+from vector_press.db.embedded_chunks import EmbeddedChunks, chunk_offsets
+from vector_press.db.ingestion_checkpoint import IngestionCheckpoint
+
+RUN_PARAMS = {'query': "climate", 'max_pages': 3}
+
+
+def _embedded(text: str) -> EmbeddedChunks:
+    offsets = chunk_offsets(len(text))
+    return EmbeddedChunks(text, offsets, np.arange(len(offsets) * 4, dtype=np.float32).reshape(-1, 4))
+
+
+def test_resume_restores_pages_stored_articles_and_pending_embeddings(tmp_path):
+    text = "word " * 1000
+    checkpoint = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path))
+    checkpoint.save_page(1, [{'metadata': {'article_id': 'world/1'}, 'content': text}])
+    checkpoint.mark_stored('world/0')
+    checkpoint.save_pending('world/1', _embedded(text), embedding_version='v1')
+    checkpoint.close()
+
+    resumed = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path), resume=True)
+
+    assert resumed.run_id == checkpoint.run_id
+    assert resumed.load_page(1)[0]['metadata']['article_id'] == 'world/1'
+    assert resumed.load_page(2) is None
+    assert resumed.stored_article_ids == {'world/0'}
+    pending = resumed.load_pending('world/1', text, embedding_version='v1')
+    assert np.array_equal(pending.embeddings, _embedded(text).embeddings)
+    assert resumed.load_pending('world/1', text, embedding_version='v2') is None
+    resumed.close()
+
+
+def test_torn_progress_line_keeps_earlier_events(tmp_path):
+    checkpoint = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path))
+    checkpoint.mark_stored('world/0')
+    checkpoint.close()
+    with open(checkpoint.progress_path, 'a', encoding='utf-8') as f:
+        f.write('{"stored": "world/1"')  # crash in the middle of a write
+
+    resumed = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path), resume=True)
+
+    assert resumed.stored_article_ids == {'world/0'}
+    resumed.mark_stored('world/2')
+    resumed.save_page(2, [])
+    resumed.close()
+
+    # The fragment was cut off, so events written after the first resume survive the next one
+    resumed_again = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path), resume=True)
+
+    assert resumed_again.stored_article_ids == {'world/0', 'world/2'}
+    assert resumed_again.fetched_pages == {2}
+    resumed_again.close()
+
+
+def test_last_event_without_newline_is_kept(tmp_path):
+    checkpoint = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path))
+    checkpoint.close()
+    with open(checkpoint.progress_path, 'a', encoding='utf-8') as f:
+        f.write('{"stored": "world/1"}')  # crash between the event and its newline
+
+    resumed = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path), resume=True)
+    resumed.mark_stored('world/2')
+    resumed.close()
+
+    resumed_again = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path), resume=True)
+
+    assert resumed_again.stored_article_ids == {'world/1', 'world/2'}
+    resumed_again.close()
+
+
+def test_a_fresh_run_discards_previous_progress(tmp_path):
+    checkpoint = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path))
+    checkpoint.mark_stored('world/0')
+    checkpoint.mark_completed()
+    checkpoint.close()
+
+    fresh = IngestionCheckpoint(RUN_PARAMS, root_dir=str(tmp_path))
+
+    assert not fresh.stored_article_ids and not fresh.completed
+    assert not os.listdir(fresh.pending_dir)
+    fresh.close()
@@ -0,0 +1,34 @@
+from collections import Counter
+
+import vector_press.agent as agent_package
+from vector_press.agent.load_test import AgentLoadTest, _query
+
+
+def _expected_tool_calls(sessions: int, turns: int) -> Counter:
+    expected = Counter()
+    for session_index in range(sessions):
+        for turn in range(turns):
+            query = _query(session_index, turn)
+            if 'news' in query:
+                expected['search_guardian_articles'] += 1
+            if 'news' not in query or ' and ' in query:
+                expected['tavily_web_search'] += 1
+    return expected
+
+
+def test_tool_calls_are_counted_when_compaction_drops_old_turns():
+    # Six turns of stub articles exceed the context budget, so early tool calls are gone from the final states
+    load_test = AgentLoadTest(sessions=3, turns=6, llm_latency=0.0, tavily_latency=0.0, guardian_latency=0.0,
+                              jitter=0.0, max_concurrent_runs=0)
+
+    report = load_test.run()
+
+    assert report['tool_calls'] == dict(_expected_tool_calls(3, 6))
+    cache = report['tool_cache']
+    assert cache['hits'] + cache['misses'] == sum(report['tool_calls'].values())
+    assert cache['misses'] == sum(report['backend_calls'].values())
+
+
+def test_load_test_is_not_imported_with_the_agent_package():
+    assert 'AgentLoadTest' not in agent_package.__all__
+    assert not hasattr(agent_package, 'AgentLoadTest')
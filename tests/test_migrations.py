@@ -0,0 +1,53 @@
+import re
+from pathlib import Path
+
+import pytest
+
+DB_DIR = Path(__file__).parents[1] / 'src/vector_press/db'
+SETUP = (DB_DIR / 'supabase_setup.sql').read_text()
+MIGRATIONS = sorted((DB_DIR / 'migrations').glob('*.sql'))
+
+
+def _defined_functions(sql: str) -> set[str]:
+    return set(re.findall(r"create or replace function (\w+)", sql, re.IGNORECASE))
+
+
+def test_migrations_define_the_setup_functions_they_call():
+    setup_functions = _defined_functions(SETUP)
+    for migration in MIGRATIONS:
+        sql = migration.read_text()
+        statements = "\n".join(line for line in sql.splitlines() if not line.lstrip().startswith('--'))
+        called = {name for name in setup_functions if re.search(rf"\b{name}\s*\(", statements)}
+
+        assert called <= _defined_functions(sql), f"{migration.name} calls functions defined only in supabase_setup.sql"
+
+
+def test_migration_headers_only_point_to_earlier_migrations():
+    for migration in MIGRATIONS:
+        header = migration.read_text().split('begin;')[0]
+        for referenced in re.findall(r"after (\d{3})_\w+\.sql", header):
+            assert int(referenced) < int(migration.name[:3])
+
+
+def _statement(sql: str, start: str, end: str) -> str:
+    begin = sql.index(start)
+    return sql[begin:sql.index(end, begin) + len(end)]
+
+
+def test_answer_cache_migration_matches_the_setup_schema():
+    migration = (DB_DIR / 'migrations/005_answer_cache.sql').read_text()
+
+    for start, end in (("create table answer_cache", ");"), ("create trigger guardian_articles_invalidate_answer_cache", ";"),
+                       ("create or replace function invalidate_answer_cache", "$$;"),
+                       ("create or replace function match_answer_cache", "$$;")):
+        assert _statement(migration, start, end) == _statement(SETUP, start, end)
+    assert "alter table answer_cache enable row level security" in migration
+
+
+@pytest.mark.parametrize('path', ['supabase_setup.sql', 'migrations/005_answer_cache.sql'])
+def test_public_key_can_only_read_the_answer_cache(path):
+    sql = (DB_DIR / path).read_text()
+    policies = re.findall(r"on answer_cache for (\w+) to public", sql)
+
+    assert policies == ['select']
+    assert "security definer" in _statement(sql, "create or replace function invalidate_answer_cache", "$$;")
@@ -0,0 +1,42 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from config import settings
+from vector_press.agent.load_test import StubChatModel, StubLLMManager
+from vector_press.agent.model_router import ModelRouter, is_conversational
+from vector_press.llm_embedding_initializer import LLMManager
+
+
+@pytest.fixture
+def router():
+    return ModelRouter(StubLLMManager(StubChatModel(0.0, 0.0, 0)), tools=[], short_circuit=True)
+
+
+@pytest.mark.parametrize('text', ["yes", "no", "ok", "okay", "sure", "Yes!"])
+def test_bare_replies_are_not_small_talk(text):
+    assert not is_conversational(text)
+
+
+@pytest.mark.parametrize('text', ["hi", "thanks so much!", "who are you?", "got it"])
+def test_greetings_and_thanks_are_small_talk(text):
+    assert is_conversational(text)
+
+
+def test_small_talk_after_a_question_goes_to_tool_selection(router):
+    question = [HumanMessage(content="news on elections"), AIMessage(content="Want the latest polls as well?"),
+                HumanMessage(content="great")]
+    statement = [HumanMessage(content="news on elections"), AIMessage(content="Here are the results."),
+                 HumanMessage(content="great")]
+
+    assert router.stage_for(question, "great") == 'tool_selection'
+    assert router.stage_for(statement, "great") == 'conversation'
+
+
+def test_stages_fall_back_to_the_default_llm():
+    assert not (settings.TOOL_SELECTION_MODEL or settings.SYNTHESIS_MODEL or settings.CONVERSATION_MODEL)
+
+    manager = object.__new__(LLMManager)
+    default_llm = StubChatModel(0.0, 0.0, 0)
+    manager.get_llm = lambda: default_llm
+
+    assert all(manager.get_stage_llm(stage) is default_llm for stage in ('tool_selection', 'synthesis', 'conversation'))
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+from vector_press.agent.tools_validation import GuardianSearchRequest
+from vector_press.db.ingestion_queue import BackgroundIngestionQueue
+
+
+class RecordingQueue:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, extracted_article):
+        self.submitted.append(extracted_article['metadata']['article_id'])
+        return True
+
+
+def _search(agent, query: str):
+    return asyncio.run(agent.asearch_guardian_articles(GuardianSearchRequest(query=query)))
+
+
+def test_stored_chunks_answer_without_calling_the_guardian_api(make_agent, fake_vector_store):
+    agent = make_agent(vector_store=fake_vector_store(hit=True))
+
+    result = _search(agent, "energy prices")
+
+    assert agent.guardian_client.calls == 0
+    assert "Stored chunk about energy prices" in result[0]
+    assert result.sources[0]['url'] == 'https://www.theguardian.com/world/1'
+
+
+def test_a_miss_fetches_from_the_api_and_queues_the_articles_for_ingestion(make_agent, fake_vector_store):
+    agent = make_agent(vector_store=fake_vector_store(hit=False))
+    agent.ingestion_queue = RecordingQueue()
+
+    result = _search(agent, "energy prices")
+
+    assert agent.guardian_client.calls == 1
+    assert len(agent.ingestion_queue.submitted) == len(result) == 2
+
+
+class SlowStore:
+    """Vector store stand-in whose article processing waits for release"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.stored = []
+
+    def check_article_exists(self, article_id):
+        return False
+
+    def _process_extracted_article(self, extracted_article):
+        self.release.wait(5)
+        self.stored.append(extracted_article['metadata']['article_id'])
+
+
+def test_ingestion_queue_skips_articles_that_are_already_pending():
+    store = SlowStore()
+    ingestion_queue = BackgroundIngestionQueue(store, max_queue_size=10)
+    article = {'metadata': {'article_id': 'world/1'}, 'content': "text"}
+
+    assert ingestion_queue.submit(article)
+    assert not ingestion_queue.submit(article)
+    store.release.set()
+    ingestion_queue.join()
+
+    assert store.stored == ['world/1']
+    assert ingestion_queue.submit(article)  # no longer pending
+    ingestion_queue.join()
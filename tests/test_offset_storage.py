@@ -0,0 +1,56 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from config import settings
+from vector_press.agent.api_clients import extract_article_text
+from vector_press.db.embedded_chunks import EmbeddedChunks, chunk_offsets
+from vector_press.db.supabase_db import SupabaseVectorStore
+
+SETUP = (Path(__file__).parents[1] / 'src/vector_press/db/supabase_setup.sql').read_text()
+
+
+def _stored_chunks(monkeypatch, mode: str, extracted: dict) -> list[dict]:
+    monkeypatch.setattr(settings, 'CHUNK_STORAGE_MODE', mode)
+    calls = []
+
+    def rpc(name, params):
+        calls.append(params)
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=[]))
+
+    store = object.__new__(SupabaseVectorStore)
+    store.supabase = SimpleNamespace(rpc=rpc)
+    text = extracted['content']
+    offsets = chunk_offsets(len(text))
+    store._upsert_articles([(extracted['metadata'], EmbeddedChunks(text, offsets, np.zeros((len(offsets), 4), np.float32)))])
+    return calls[0]['articles'][0]['chunks']
+
+
+@pytest.fixture
+def extracted():
+    return extract_article_text({'id': 'world/1', 'webTitle': "Headline", 'sectionId': 'world',
+                                 'fields': {'bodyText': "Body sentence. " * 300}})
+
+
+def test_offset_mode_sends_offsets_instead_of_text(monkeypatch, extracted):
+    chunks = _stored_chunks(monkeypatch, 'offsets', extracted)
+
+    assert all(chunk['content'] is None for chunk in chunks)
+    assert [(chunk['start_offset'], chunk['end_offset']) for chunk in chunks] == [(0, 1750), (1475, 3225), (2950, 4510),
+                                                                                        (4425, 4510)]
+
+
+def test_text_mode_keeps_a_copy_of_each_chunk(monkeypatch, extracted):
+    chunks = _stored_chunks(monkeypatch, 'text', extracted)
+
+    assert [chunk['content'] for chunk in chunks] == [extracted['content'][chunk['start_offset']:chunk['end_offset']]
+                                                      for chunk in chunks]
+
+
+def test_offsets_point_into_the_same_text_the_database_rebuilds(extracted):
+    # article_full_text() in SQL joins title and body the way extract_article_text() builds 'content'
+    assert "concat_ws(E'\\n\\n', nullif(title, ''), nullif(body_text, ''))" in SETUP
+    metadata = extracted['metadata']
+    assert extracted['content'] == "\n\n".join(part for part in (metadata['title'], metadata['body_text']) if part)
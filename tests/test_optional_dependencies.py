@@ -0,0 +1,38 @@
+import tomllib
+from pathlib import Path
+
+import pytest
+
+from vector_press.db import bulk_loader
+
+PYPROJECT = tomllib.loads((Path(__file__).parents[1] / 'pyproject.toml').read_text())
+
+
+def _extra(name: str) -> set[str]:
+    return {requirement.split('>')[0].split('[')[0] for requirement in PYPROJECT['project']['optional-dependencies'][name]}
+
+
+def test_bulk_loader_dependencies_are_an_extra():
+    assert _extra('bulk') == {'psycopg', 'pgvector'}
+
+
+def test_bulk_loader_names_the_extra_when_it_is_missing(monkeypatch):
+    monkeypatch.setattr(bulk_loader, 'psycopg', None)
+
+    with pytest.raises(ImportError, match=r"--extra bulk"):
+        bulk_loader.PostgresBulkLoader('postgresql://localhost/test')
+
+
+def test_response_decoding_works_without_orjson(monkeypatch):
+    from vector_press.agent import api_clients
+
+    assert _extra('fast-json') == {'orjson'}
+    monkeypatch.setattr(api_clients, 'orjson', None)
+
+    assert api_clients._decode_json(b'{"response": {"pages": 2}}') == {'response': {'pages': 2}}
+
+
+def test_httpx_is_a_declared_dependency():
+    dependencies = {requirement.split('>')[0] for requirement in PYPROJECT['project']['dependencies']}
+
+    assert 'httpx' in dependencies and 'requests' not in dependencies
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from config import settings
+from vector_press import profiling
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'OUTPUT', str(tmp_path))
+    return tmp_path / 'profiles'
+
+
+def _busy(seconds: float) -> int:
+    end, total = time.perf_counter() + seconds, 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def test_profiling_off_returns_the_function_unchanged(monkeypatch):
+    monkeypatch.setattr(settings, 'PROFILING_MODE', 'off')
+
+    assert profiling.profiled()(_busy) is _busy
+
+
+def test_cprofile_run_writes_stats_once_for_nested_runs(profile_dir):
+    with profiling.profile_run('outer', mode='cprofile'):
+        with profiling.profile_run('inner', mode='cprofile'):
+            _busy(0.01)
+
+    assert sorted(path.suffix for path in profile_dir.iterdir()) == ['.prof', '.txt']
+    assert all('outer' in path.name for path in profile_dir.iterdir())
+
+
+def test_sampling_profiler_writes_collapsed_stacks(profile_dir):
+    with profiling.profile_run('busy loop', mode='sampling'):
+        _busy(0.1)
+
+    folded = next(profile_dir.glob('*busy_loop.folded')).read_text().splitlines()
+    assert folded and all(line.rsplit(' ', 1)[1].isdigit() for line in folded)
+    assert any('_busy (test_profiling.py' in line for line in folded)
+
+
+def test_async_functions_are_profiled_when_enabled(profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, 'PROFILING_MODE', 'cprofile')
+
+    @profiling.profiled('async node')
+    async def node():
+        await asyncio.sleep(0)
+        return 'done'
+
+    assert asyncio.run(node()) == 'done'
+    assert len(list(profile_dir.glob('*async_node.prof'))) == 1
+
+
+def test_unknown_modes_are_rejected():
+    with pytest.raises(ValueError, match="Unknown profiling mode"):
+        with profiling.profile_run('bad', mode='perf'):
+            pass
+
+
+def test_overlapping_runs_on_other_threads_run_unprofiled(profile_dir):
+    first_inside, second_done = threading.Event(), threading.Event()
+    results = []
+
+    def first():
+        with profiling.profile_run('first', mode='cprofile'):
+            first_inside.set()
+            second_done.wait(5)
+            results.append('first')
+
+    def second():
+        first_inside.wait(5)
+        with profiling.profile_run('second', mode='cprofile'):
+            results.append('second')
+        second_done.set()
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == ['first', 'second']
+    assert {path.name.rsplit('-', 1)[1] for path in profile_dir.iterdir()} == {'first.prof', 'first.txt'}
+
+    # The lock is released, so the next run is profiled again
+    with profiling.profile_run('third', mode='cprofile'):
+        _busy(0.01)
+    assert len(list(profile_dir.glob('*third.prof'))) == 1
+
+
+def test_profiler_that_cannot_start_leaves_the_block_running(profile_dir, monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, 'Profile', BusyProfile)
+
+    with profiling.profile_run('blocked', mode='cprofile'):
+        ran = True
+
+    assert ran
+    assert not profile_dir.exists() or not list(profile_dir.iterdir())
+    assert not profiling._active_run.locked()
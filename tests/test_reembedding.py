@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from vector_press.db.embedding_versions import EmbeddingVersion
+from vector_press.db.reembedding import ReEmbedder
+
+VERSION = EmbeddingVersion('gemma-v2', 'embeddinggemma', 'text: {text}', 'query: {text}', dimensions=4)
+
+
+class FakeChunkDatabase:
+    """reembedding_batch / store_chunk_embeddings over an in-memory chunk table"""
+
+    def __init__(self, chunk_count: int):
+        self.chunks = {chunk_id: f"chunk {chunk_id}" for chunk_id in range(1, chunk_count + 1)}
+        self.embedded: dict[int, list] = {}
+        self.on_batch = None
+
+    def rpc(self, name, params):
+        if name == 'reembedding_batch':
+            if self.on_batch:
+                self.on_batch(params)
+            data = [{'chunk_id': chunk_id, 'publication_date': '2026-10-01', 'content': content, 'content_md5': content}
+                    for chunk_id, content in sorted(self.chunks.items())
+                    if chunk_id > params['after_chunk_id'] and chunk_id not in self.embedded][:params['batch_size']]
+        else:
+            for row in params['embeddings']:
+                self.embedded[row['chunk_id']] = row['embedding']
+            data = len(params['embeddings'])
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+
+def _reembedder(database: FakeChunkDatabase, tmp_path) -> tuple[ReEmbedder, list[str]]:
+    activated = []
+    vector_store = SimpleNamespace(
+        supabase=database,
+        embedding_versions=SimpleNamespace(get=lambda version: VERSION, activate=activated.append),
+        _create_mega_batch_embeddings=lambda texts, version: np.ones((len(texts), version.dimensions), np.float32),
+    )
+    return ReEmbedder(vector_store, batch_size=2, pause_seconds=0, root_dir=str(tmp_path)), activated
+
+
+def test_every_chunk_is_embedded_before_the_version_is_activated(tmp_path):
+    database = FakeChunkDatabase(chunk_count=5)
+    reembedder, activated = _reembedder(database, tmp_path)
+
+    stats = reembedder.run('gemma-v2')
+
+    assert sorted(database.embedded) == [1, 2, 3, 4, 5]
+    assert stats['completed'] and stats['activated'] and activated == ['gemma-v2']
+    assert not (tmp_path / 'gemma-v2.json').exists()
+
+
+def test_chunks_written_behind_the_cursor_get_a_second_pass(tmp_path):
+    database = FakeChunkDatabase(chunk_count=4)
+
+    def rewrite_chunk_one(params):
+        if params['after_chunk_id'] == 4 and 1 in database.embedded and database.chunks[1] == "chunk 1":
+            database.chunks[1] = "chunk 1, rewritten"
+            del database.embedded[1]
+
+    database.on_batch = rewrite_chunk_one
+    reembedder, activated = _reembedder(database, tmp_path)
+
+    stats = reembedder.run('gemma-v2')
+
+    # First pass, catch-up pass for the rewritten chunk, and the empty pass that confirms nothing is left
+    assert stats['passes'] == 3 and stats['read'] == 5
+    assert sorted(database.embedded) == [1, 2, 3, 4] and activated == ['gemma-v2']
+
+
+def test_a_stopped_run_resumes_from_its_cursor(tmp_path):
+    database = FakeChunkDatabase(chunk_count=6)
+    reembedder, activated = _reembedder(database, tmp_path)
+    database.on_batch = lambda params: params['after_chunk_id'] == 2 and reembedder._stop_event.set()
+
+    stopped = reembedder.run('gemma-v2')
+    assert not stopped['completed'] and activated == []
+    assert reembedder._load_cursor('gemma-v2') == 4
+
+    database.on_batch = None
+    reembedder._stop_event.clear()
+    resumed = reembedder.run('gemma-v2')
+
+    assert resumed['read'] == 2 and resumed['activated']
+
+
+def test_retired_versions_are_not_rebuilt(tmp_path):
+    reembedder, _ = _reembedder(FakeChunkDatabase(chunk_count=1), tmp_path)
+    reembedder.vector_store.embedding_versions.get = lambda version: EmbeddingVersion(
+        'old', 'm', 'd', 'q', 4, status='retired')
+
+    with pytest.raises(ValueError, match="retired"):
+        reembedder.run('old')
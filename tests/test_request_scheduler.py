@@ -0,0 +1,48 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from vector_press.agent.request_scheduler import QuotaExceededError, RequestScheduler
+
+
+def _response(status_code: int, retry_after: str = None) -> SimpleNamespace:
+    return SimpleNamespace(status_code=status_code, headers={'Retry-After': retry_after} if retry_after else {})
+
+
+def test_retry_after_is_capped_at_backoff_max():
+    scheduler = RequestScheduler('test', rate_per_second=1e9, backoff_max=2.0)
+
+    assert scheduler._retry_delay(0, _response(429, '3600')) == 2.0
+    assert scheduler._paused_until <= time.monotonic() + 2.0
+    assert scheduler._retry_delay(0, _response(429, '0.5')) == 0.5
+
+
+def test_throttled_request_is_retried_after_the_capped_pause():
+    scheduler = RequestScheduler('test', rate_per_second=1e9, burst=10, max_retries=1, backoff_max=0.05)
+    responses = iter([_response(429, '86400'), _response(200)])
+
+    async def arequest():
+        return next(responses)
+
+    start_time = time.perf_counter()
+    response = asyncio.run(scheduler.acall(arequest))
+
+    assert response.status_code == 200
+    assert time.perf_counter() - start_time < 1.0
+    assert scheduler.stats['throttled'] == 1
+
+
+def test_daily_quota_stops_requests_once_used_up():
+    scheduler = RequestScheduler('test', rate_per_second=1e9, burst=10, daily_quota=2)
+
+    async def arequest():
+        return _response(200)
+
+    async def send(count: int):
+        return [await scheduler.acall(arequest) for _ in range(count)]
+
+    assert len(asyncio.run(send(2))) == 2
+    with pytest.raises(QuotaExceededError):
+        asyncio.run(send(1))
@@ -0,0 +1,56 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from vector_press.agent.agent import build_graph, create_initial_state
+from vector_press.agent.load_test import StubLLMManager
+
+
+class PlainChatModel:
+    """Chat model stand-in that answers every question directly, without tool calls"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def bind_tools(self, tools):
+        return self
+
+    async def ainvoke(self, messages) -> AIMessage:
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="Direct answer")
+
+
+def _run_turn(agent, query: str) -> dict:
+    state = create_initial_state()
+    state['query'] = query
+    return asyncio.run(build_graph(agent).ainvoke(state))
+
+
+def test_running_lookup_is_cancelled_and_counted(make_agent, fake_vector_store):
+    store = fake_vector_store(latency=1.0)
+    agent = make_agent(vector_store=store)
+    agent.router = type(agent.router)(StubLLMManager(PlainChatModel(latency=0.05)), [])
+
+    _run_turn(agent, "what happened in the elections")
+
+    assert agent.speculation_stats == {'started': 1, 'served': 0, 'unused': 1, 'cancelled': 1}
+
+
+def test_finished_lookup_is_unused_but_not_counted_as_cancelled(make_agent, fake_vector_store):
+    agent = make_agent(vector_store=fake_vector_store(latency=0.0))
+    agent.router = type(agent.router)(StubLLMManager(PlainChatModel(latency=0.1)), [])
+
+    _run_turn(agent, "what happened in the elections")
+
+    assert agent.speculation_stats == {'started': 1, 'served': 0, 'unused': 1, 'cancelled': 0}
+
+
+def test_matching_news_call_is_served_from_the_speculative_lookup(make_agent, fake_vector_store):
+    store = fake_vector_store(latency=0.05)
+    agent = make_agent(llm_latency=0.1, vector_store=store)
+
+    state = _run_turn(agent, "latest news on elections")
+
+    assert agent.speculation_stats == {'started': 1, 'served': 1, 'unused': 0, 'cancelled': 0}
+    assert len(store.calls) == 1
+    assert state['messages'][-2].artifact[0]['url'] == 'https://www.theguardian.com/world/1'
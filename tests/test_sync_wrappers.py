@@ -0,0 +1,57 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from vector_press.agent.agent import build_graph, create_initial_state
+from vector_press.agent.api_clients import GuardianAPIClient
+from vector_press.db.embedding_versions import BASELINE_VERSION, EmbeddingVersionRegistry
+
+
+def _turn(state: dict, query: str) -> dict:
+    state['query'] = query
+    return state
+
+
+def test_invoke_and_ainvoke_run_the_same_async_nodes(make_agent):
+    app = build_graph(make_agent())
+
+    sync_state = app.invoke(_turn(create_initial_state(), "latest news on elections"))
+    async_state = asyncio.run(app.ainvoke(_turn(create_initial_state(), "latest news on elections")))
+
+    for state in (sync_state, async_state):
+        assert [type(message) for message in state['messages'][-3:]] == [AIMessage, ToolMessage, AIMessage]
+        assert state['messages'][-2].name == 'search_guardian_articles'
+
+
+def test_guardian_search_articles_wraps_the_async_client(monkeypatch):
+    client = GuardianAPIClient()
+    calls = []
+
+    async def asearch_articles(**kwargs):
+        calls.append(kwargs)
+        return [{'content': 'article'}]
+
+    monkeypatch.setattr(client, 'asearch_articles', asearch_articles)
+
+    assert client.search_articles(query="budget", max_pages=1) == [{'content': 'article'}]
+    assert calls == [{'query': "budget", 'max_pages': 1}]
+
+
+def test_aactive_reads_the_registry_through_the_sync_client():
+    class FailingSupabase:
+        def table(self, name):
+            raise ConnectionError("offline")
+
+    registry = EmbeddingVersionRegistry(FailingSupabase())
+
+    assert asyncio.run(registry.aactive()) is BASELINE_VERSION
+
+
+def test_tool_definitions_keep_their_names_and_json_schemas(make_agent):
+    agent = make_agent()
+    schemas = {schema['function']['name']: schema['function']['parameters']['properties']
+               for schema in map(convert_to_openai_tool, (agent.tavily_web_search, agent.search_guardian_articles))}
+
+    assert schemas.keys() == {'tavily_web_search', 'search_guardian_articles'}
+    assert all(properties.keys() == {'validation'} for properties in schemas.values())
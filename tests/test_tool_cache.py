@@ -0,0 +1,54 @@
+import asyncio
+
+from vector_press.agent import tool_cache
+from vector_press.agent.tool_cache import ToolResultCache, normalize_request
+from vector_press.agent.tools_validation import GuardianSearchRequest, TavilySearchRequest
+
+
+def test_tavily_topics_produce_different_keys():
+    finance = normalize_request('tavily_web_search', TavilySearchRequest(query="index funds", topic='finance'))
+    general = normalize_request('tavily_web_search', TavilySearchRequest(query="index funds", topic='general'))
+
+    assert finance != general
+
+
+def test_query_casing_and_whitespace_share_a_key():
+    assert (normalize_request('search_guardian_articles', GuardianSearchRequest(query="Interest  Rates"))
+            == normalize_request('search_guardian_articles', GuardianSearchRequest(query="interest rates ")))
+
+
+def test_tools_do_not_share_keys():
+    validation = TavilySearchRequest(query="elections")
+
+    assert normalize_request('tavily_web_search', validation) != normalize_request('search_guardian_articles', validation)
+
+
+def _cached(cache: ToolResultCache, query: str, calls: list) -> list:
+    async def compute():
+        calls.append(query)
+        return [query]
+    return asyncio.run(cache.aget_or_compute('tavily_web_search', TavilySearchRequest(query=query), compute))
+
+
+def test_results_are_reused_until_their_ttl_expires(monkeypatch):
+    cache = ToolResultCache(ttls={'tavily_web_search': 60})
+    calls, now = [], [1000.0]
+    monkeypatch.setattr(tool_cache.time, 'monotonic', lambda: now[0])
+
+    _cached(cache, "elections", calls)
+    _cached(cache, "Elections", calls)
+    now[0] += 61
+    _cached(cache, "elections", calls)
+
+    assert calls == ["elections", "elections"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = ToolResultCache(ttls={}, max_entries=2)
+    calls = []
+
+    for query in ("a", "b", "a", "c", "a", "b"):
+        _cached(cache, query, calls)
+
+    assert calls == ["a", "b", "c", "b"]
@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+
+from config import settings
+from vector_press.agent.agent import create_initial_state
+from vector_press.agent.tool_cache import ToolResultCache
+from vector_press.agent.tools_validation import TavilySearchRequest
+
+
+class RecordingTavilyClient:
+    """AsyncTavilyClient stand-in that records timeouts and cancellations"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.timeouts = []
+        self.cancelled = 0
+
+    async def search(self, query: str, max_results: int = 5, topic: str = 'general', timeout: float = 60):
+        self.timeouts.append(timeout)
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {'results': [{'title': query, 'url': f"https://example.com/{query}", 'content': query}]}
+
+
+def _tools_state(*queries: str) -> dict:
+    state = create_initial_state()
+    state['messages'].append(AIMessage(content='', tool_calls=[
+        {'name': 'tavily_web_search', 'args': {'query': query}, 'id': f"call-{index}", 'type': 'tool_call'}
+        for index, query in enumerate(queries)]))
+    return state
+
+
+def test_deadline_starts_when_the_tool_starts_running(make_agent, monkeypatch):
+    monkeypatch.setattr(settings, 'TOOL_CALL_MAX_WORKERS', 1)
+    agent = make_agent(async_tavily_client=RecordingTavilyClient(latency=0.3))
+    agent._tool_timeouts['tavily_web_search'] = 0.5
+
+    # The second call waits 0.3 s for the only slot, which must not count against its 0.5 s timeout
+    state = asyncio.run(agent.atools_call(_tools_state("first", "second")))
+
+    assert [message.content for message in state['messages'][-2:]] == [["first"], ["second"]]
+
+
+def test_timed_out_tool_is_cancelled_and_reported_as_timed_out(make_agent):
+    tavily = RecordingTavilyClient(latency=5.0)
+    agent = make_agent(async_tavily_client=tavily)
+    agent._tool_timeouts['tavily_web_search'] = 0.1
+
+    start_time = time.perf_counter()
+    state = asyncio.run(agent.atools_call(_tools_state("slow")))
+
+    assert time.perf_counter() - start_time < 1.0
+    assert tavily.cancelled == 1
+    assert state['messages'][-1].content == "Tool tavily_web_search timed out after 0.1 seconds"
+    assert 'cancel' not in state['messages'][-1].content
+
+
+def test_tool_timeout_is_passed_to_the_http_client(make_agent):
+    tavily = RecordingTavilyClient(latency=0.0)
+    agent = make_agent(async_tavily_client=tavily)
+    agent._tool_timeouts['tavily_web_search'] = 7.0
+
+    asyncio.run(agent.atools_call(_tools_state("budget")))
+
+    assert tavily.timeouts == [7.0]
+
+
+def test_waiter_timeout_does_not_cancel_the_shared_in_flight_call():
+    cache = ToolResultCache(ttls={})
+    validation = TavilySearchRequest(query="shared")
+
+    async def compute():
+        await asyncio.sleep(0.2)
+        return ["result"]
+
+    async def scenario():
+        owner = asyncio.create_task(cache.aget_or_compute('tavily_web_search', validation, compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.wait_for(cache.aget_or_compute('tavily_web_search', validation, compute), timeout=0.05)
+        waiter_result = await asyncio.gather(waiter, return_exceptions=True)
+        return waiter_result[0], await owner
+
+    waiter_result, owner_result = asyncio.run(scenario())
+
+    assert isinstance(waiter_result, asyncio.TimeoutError)
+    assert owner_result == ["result"]
+    assert cache.hits == 0 and cache.misses == 1
+
+
+def test_cancelled_owner_fails_waiters_without_cancelling_them():
+    cache = ToolResultCache(ttls={})
+    validation = TavilySearchRequest(query="shared")
+
+    async def compute():
+        await asyncio.sleep(5)
+        return ["result"]
+
+    async def scenario():
+        owner = asyncio.create_task(cache.aget_or_compute('tavily_web_search', validation, compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.aget_or_compute('tavily_web_search', validation, compute))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await asyncio.gather(waiter, return_exceptions=True)
+
+    [waiter_result] = asyncio.run(scenario())
+
+    assert isinstance(waiter_result, RuntimeError)
+
+
+def test_tool_calls_of_one_message_run_concurrently(make_agent, monkeypatch):
+    monkeypatch.setattr(settings, 'TOOL_CALL_MAX_WORKERS', 4)
+    agent = make_agent(async_tavily_client=RecordingTavilyClient(latency=0.2))
+
+    start_time = time.perf_counter()
+    state = asyncio.run(agent.atools_call(_tools_state("one", "two", "three")))
+
+    # Three sequential calls would take 0.6 s; results keep the order of the tool calls
+    assert time.perf_counter() - start_time < 0.45
+    assert [message.content for message in state['messages'][-3:]] == [["one"], ["two"], ["three"]]
+    assert [message.tool_call_id for message in state['messages'][-3:]] == ["call-0", "call-1", "call-2"]
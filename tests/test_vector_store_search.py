@@ -0,0 +1,65 @@
+import asyncio
+import os
+import re
+from types import SimpleNamespace
+
+from config import settings
+from vector_press.db.embedding_versions import BASELINE_VERSION
+from vector_press.db.supabase_db import SupabaseVectorStore
+
+
+def test_retrieval_windows_share_one_query_embedding(make_agent, fake_vector_store, monkeypatch):
+    monkeypatch.setattr(settings, 'GUARDIAN_TOOL_RECENT_DAYS', 30)
+    store = fake_vector_store(hit=False)
+    agent = make_agent(vector_store=store)
+
+    assert asyncio.run(agent._avector_store_search("energy prices")) is None
+
+    assert store.embedded == ["energy prices"]
+    assert len(store.calls) == 2
+    assert store.calls[0]['from_date'] is not None and store.calls[1]['from_date'] is None
+    assert all(call['embedded_query'] == ('test-version', [0.5] * 4) for call in store.calls)
+
+
+class FakeAsyncSupabase:
+    def __init__(self):
+        self.rpcs = []
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+
+        async def execute():
+            return SimpleNamespace(data=[] if name == 'match_article_chunks' else None)
+        return SimpleNamespace(execute=execute)
+
+
+def test_aretrieve_relevant_chunks_skips_embedding_for_an_embedded_query(monkeypatch):
+    monkeypatch.setattr(settings, 'EMBEDDING_WIRE_ENCODING', 'json')
+    store = object.__new__(SupabaseVectorStore)
+    supabase = FakeAsyncSupabase()
+
+    async def get_async_supabase():
+        return supabase
+
+    async def aembed_query(query):
+        raise AssertionError("the query was embedded again")
+
+    store._get_async_supabase = get_async_supabase
+    store.aembed_query = aembed_query
+
+    result = asyncio.run(store.aretrieve_relevant_chunks("energy prices", from_date="2026-09-01",
+                                                         embedded_query=(BASELINE_VERSION, [0.5] * 4)))
+
+    assert result == []
+    assert supabase.rpcs == [('match_article_chunks', {'match_count': 10, 'from_date': "2026-09-01",
+                                                       'query_embedding': [0.5] * 4})]
+
+
+def test_match_article_chunks_date_bounds_stay_prunable():
+    path = os.path.join(os.path.dirname(__file__), os.pardir, 'src', 'vector_press', 'db', 'supabase_setup.sql')
+    with open(path, encoding='utf-8') as f:
+        setup_sql = f.read()
+
+    # "bound is null or ..." defeats partition pruning on a generic plan
+    assert not re.search(r"\((from_date|to_date|\$3|\$4)(::timestamptz)? is null or", setup_sql)
+    assert "ac.publication_date >= coalesce(from_date, '-infinity')" in setup_sql